@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+Scene Master benchmark - times the real GUI code paths on synthetic folders, headless.
+
+    python benchmarks/scene_benchmark.py --sizes 1000 10000 100000 --out results.json
+    python benchmarks/scene_benchmark.py --compare old.json new.json
+
+→ Folders are generated once per size (mixed JPG/PNG/BMP/GIF/TIFF/WEBP, several resolutions)
+  and reused from --workdir on later runs; the same --seed always gives the same folder
+→ Every size runs in its own process under QT_QPA_PLATFORM=offscreen, so peak RSS is per size
+→ Settings and caches are redirected to the work folder - the user's own setup is never touched
+→ Dialogs are answered automatically (Yes / OK); rename batches are timed until they finish
+→ Ends with a cold start in a fresh process: time to first interactive / first screen of
+  thumbnails with the last session restored, and until the background folder scan is applied
+→ Output is JSON: wall time (ms) and peak RSS (MB) after every step, plus machine info
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+MAIN_DIR = os.path.join(os.path.dirname(HERE), "main")
+sys.path.insert(0, MAIN_DIR)
+
+from profiler import process_memory_mb
+
+# (extension, Qt format, width, height) - every generated file is a copy of one of these templates
+TEMPLATES = [
+    (".jpg", "JPG", 1920, 1080), (".jpg", "JPG", 640, 480), (".jpg", "JPG", 1080, 1920),
+    (".png", "PNG", 1280, 720), (".png", "PNG", 256, 256),
+    (".bmp", "BMP", 800, 600),
+    (".gif", "GIF", 320, 240),
+    (".tif", "TIFF", 1024, 768),
+    (".webp", "WEBP", 1600, 900),
+]
+NEW_FILES = 25  # Files dropped into the folder before check_for_new_files / reload_folder
+SEARCH_QUERIES = ["take", "scene7", "_00", "zzz"]
+
+
+def make_templates(folder):
+    """Render one small scene per template; returns [(path, extension), ...] of the formats Qt can write"""
+    from PyQt5 import QtGui
+    os.makedirs(folder, exist_ok=True)
+    made = []
+    for i, (ext, fmt, width, height) in enumerate(TEMPLATES):
+        path = os.path.join(folder, f"template_{i}{ext}")
+        if not os.path.exists(path):
+            image = QtGui.QImage(width, height, QtGui.QImage.Format_RGB32)
+            gradient = QtGui.QLinearGradient(0, 0, width, height)
+            gradient.setColorAt(0, QtGui.QColor.fromHsv((i * 40) % 360, 180, 220))
+            gradient.setColorAt(1, QtGui.QColor.fromHsv((i * 40 + 150) % 360, 200, 60))
+            painter = QtGui.QPainter(image)
+            painter.fillRect(image.rect(), gradient)
+            painter.setPen(QtGui.QColor("white"))
+            painter.drawEllipse(width // 4, height // 4, width // 2, height // 2)
+            painter.end()
+            if not image.save(path, fmt):
+                continue  # Image format plugin missing in this Qt build
+        made.append((path, ext))
+    return made
+
+
+def file_names(count, seed):
+    """Shot-style names with mixed digit widths, in shuffled order (exercises natural ordering)"""
+    rng = random.Random(seed)
+    names = [f"scene{i % 97}_take{i}" if i % 3 else f"shot_{i:06d}" for i in range(count)]
+    rng.shuffle(names)
+    return names
+
+
+def generate_folder(folder, count, seed, template_dir):
+    """Fill folder with count images; an existing complete folder is reused as is"""
+    marker = os.path.join(folder, ".complete")
+    if os.path.exists(marker):
+        return
+    shutil.rmtree(folder, ignore_errors=True)
+    os.makedirs(folder)
+    templates = make_templates(template_dir)
+    rng = random.Random(seed)
+    for name in file_names(count, seed):
+        src, ext = templates[rng.randrange(len(templates))]
+        shutil.copyfile(src, os.path.join(folder, name + ext))
+    with open(marker, "w") as f:
+        f.write(str(count))
+
+
+class Runner:
+    """Drives one ImageOrganizer window through the benchmark steps"""
+
+    def __init__(self, app, window, timeout):
+        self.app = app
+        self.window = window
+        self.timeout = timeout
+        self.results = []
+
+    def pump(self, seconds=0.0, until=None):
+        """Process events for seconds, or until until() is true (bounded by the timeout)"""
+        end = time.perf_counter() + (self.timeout if until is not None else seconds)
+        while time.perf_counter() < end:
+            self.app.processEvents()
+            if until is not None and until():
+                return True
+            time.sleep(0.001)
+        return until is None
+
+    def record(self, step, started, **extra):
+        entry = {"step": step, "ms": round((time.perf_counter() - started) * 1000, 2), "peak_rss_mb": None}
+        rss = process_memory_mb(peak=True)
+        if rss is not None:
+            entry["peak_rss_mb"] = round(rss, 1)
+        entry.update(extra)
+        self.results.append(entry)
+        print(f"  {step:<34} {entry['ms']:>10.1f} ms", file=sys.stderr)
+
+    def time(self, step, action, until=None, **extra):
+        started = time.perf_counter()
+        action()
+        finished = self.pump(until=until) if until is not None else True
+        if not finished:
+            extra["timed_out"] = True
+        self.record(step, started, **extra)
+
+    def first_screen_loaded(self):
+        view = self.window.list
+        model = view.image_model
+        first, last = view.visible_row_range()
+        if last < first:
+            return False
+        return all(model.thumbnail_cache.peek(model.path(row)) is not None or model.path(row) in model.failed
+                   for row in range(first, last + 1))
+
+    def rename_finished(self):
+        return not self.window.renamer.is_running()
+
+
+def start_app(args):
+    """Offscreen QApplication with settings / caches in the work folder and dialogs auto-answered"""
+    os.environ["QT_QPA_PLATFORM"] = "offscreen"
+    from PyQt5 import QtCore, QtWidgets
+
+    settings_dir = os.path.join(args.workdir, "settings")
+    QtCore.QStandardPaths.setTestModeEnabled(True)  # Thumbnail cache + journal go to a throwaway location
+    for fmt in (QtCore.QSettings.NativeFormat, QtCore.QSettings.IniFormat):
+        QtCore.QSettings.setPath(fmt, QtCore.QSettings.UserScope, settings_dir)
+    app = QtWidgets.QApplication([sys.argv[0]])
+    boxes = QtWidgets.QMessageBox
+    boxes.question = staticmethod(lambda *a, **k: boxes.Yes)
+    boxes.information = boxes.warning = boxes.critical = staticmethod(lambda *a, **k: boxes.Ok)
+    boxes.exec_ = lambda self: boxes.Ok  # Rename reports with details
+    return app
+
+
+def run_cold_start(args):
+    """Launch the app as a user would (last session restored); returns the startup steps"""
+    app = start_app(args)
+    import main as scene_app
+    started = scene_app.LAUNCH_TIME
+    window = scene_app.ImageOrganizer()
+    runner = Runner(app, window, args.timeout)
+    try:
+        runner.pump(until=lambda: window.startup_ms is not None)
+        first_screen = window.list.count() > 0 and runner.pump(until=runner.first_screen_loaded)
+        steps = [{"step": "cold_start_first_interactive", "ms": round(window.startup_ms, 2),
+                  "restored_rows": window.list.count()},
+                 {"step": "cold_start_first_screen_thumbnails",
+                  "ms": round((time.perf_counter() - started) * 1000, 2)}]
+        if not first_screen:
+            steps[-1]["timed_out"] = True
+        reconciled = time.perf_counter()
+        runner.pump(until=lambda: not window.folder_watcher.suspended)
+        steps.append({"step": "cold_start_reconciled", "ms": round((time.perf_counter() - started) * 1000, 2),
+                      "background_scan_ms": round((time.perf_counter() - reconciled) * 1000, 2)})
+    finally:
+        window.close()
+    rss = process_memory_mb(peak=True)
+    for step in steps:
+        step["peak_rss_mb"] = round(rss, 1) if rss is not None else None
+    return steps
+
+
+def run_size(folder, args):
+    """Benchmark one folder inside this process; returns the JSON-ready result"""
+    app = start_app(args)
+    from PyQt5 import QtCore, QtGui
+
+    import main as scene_app
+    try:
+        os.remove(scene_app.default_snapshot_path())  # A previous run's session must not be restored
+    except OSError:
+        pass
+    baseline_rss = process_memory_mb(peak=True)
+    work = os.path.join(args.workdir, f"run_{os.path.basename(folder)}")
+    shutil.rmtree(work, ignore_errors=True)
+    shutil.copytree(folder, work)  # Renames must not change the reusable source folder
+    count = sum(1 for f in os.listdir(work) if not f.startswith("."))
+
+    window = scene_app.ImageOrganizer()
+    try:
+        window.resize(1600, 1000)
+        runner = Runner(app, window, args.timeout)
+        view = window.list
+        window.folder = work
+
+        runner.time("load_folder_contents", window.load_folder_contents)
+        runner.time("first_screen_thumbnails", lambda: None, until=runner.first_screen_loaded)
+
+        for size in (100, 250, 400):
+            runner.time(f"setThumbnailSize_{size}", lambda s=size: window.thumb_slider.setValue(s))
+        runner.time("resize_refined_thumbnails", lambda: None,
+                    until=lambda: not view.resize_timer.isActive() and runner.first_screen_loaded())
+
+        for query in SEARCH_QUERIES:
+            window.search_input1.setText(query)
+            runner.time(f"search_image[{query}]", lambda: window.search_image(1))
+            runner.time(f"search_image_next[{query}]", lambda: window.search_image(1))
+        window.search_input1.clear()
+        runner.pump(0.2)
+
+        rng = random.Random(args.seed)
+        scattered = sorted(rng.sample(range(count), max(1, count // 20)))
+        view.select_rows(scattered)
+        runner.time("move_to_top", window.move_to_top, rows=len(scattered))
+
+        drag_rows = list(range(min(10, count)))
+        target = view.visualRect(view.image_model.index(min(count - 1, 30))).center()
+        mime = QtCore.QMimeData()
+        mime.setData("application/x-drag-rows", scene_app.encode_row_payload(drag_rows))
+        drop = QtGui.QDropEvent(QtCore.QPointF(target), QtCore.Qt.MoveAction, mime,
+                                QtCore.Qt.LeftButton, QtCore.Qt.NoModifier)
+        runner.time("dropEvent", lambda: view.dropEvent(drop), rows=len(drag_rows))
+
+        runner.time("rename_ordered", window.rename_ordered, until=runner.rename_finished, files=count)
+
+        template_dir = os.path.join(args.workdir, "templates")
+        templates = make_templates(template_dir)
+        for i in range(NEW_FILES):
+            src, ext = templates[i % len(templates)]
+            shutil.copyfile(src, os.path.join(work, f"incoming_{i}{ext}"))
+        changes = []
+        window.folder_watcher.changed.connect(lambda *delta: changes.append(delta))
+        runner.time("check_for_new_files", window.check_for_new_files, until=lambda: bool(changes),
+                    added=NEW_FILES)
+
+        runner.time("reload_folder", window.reload_folder, until=runner.rename_finished, files=count + NEW_FILES)
+    finally:
+        window.close()  # Waits for worker threads; saves the session the cold start restores
+        window.settings.sync()  # The cold start runs while this process is still alive
+
+    cold = subprocess.run([sys.executable, os.path.abspath(__file__), "--cold-start", "--workdir", args.workdir,
+                           "--timeout", str(args.timeout)], stdout=subprocess.PIPE, text=True)
+    if cold.returncode == 0:
+        runner.results.extend(json.loads(cold.stdout.strip().splitlines()[-1]))
+        for step in runner.results[-3:]:
+            print(f"  {step['step']:<34} {step['ms']:>10.1f} ms", file=sys.stderr)
+    shutil.rmtree(work, ignore_errors=True)
+    return {
+        "images": count,
+        "baseline_rss_mb": round(baseline_rss, 1) if baseline_rss is not None else None,
+        "peak_rss_mb": round(process_memory_mb(peak=True) or 0, 1) or None,
+        "steps": runner.results,
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(old_path, new_path):
+    """Print the per-step change between two result files"""
+    with open(old_path, encoding="utf-8") as f:
+        old = json.load(f)
+    with open(new_path, encoding="utf-8") as f:
+        new = json.load(f)
+    for size, result in new["sizes"].items():
+        before = {s["step"]: s for s in old["sizes"].get(size, {}).get("steps", [])}
+        print(f"{size} images  ({old.get('revision')} → {new.get('revision')})")
+        for step in result.get("steps", []):
+            prev = before.get(step["step"])
+            if prev is None:
+                print(f"  {step['step']:<34} {step['ms']:>10.1f} ms")
+                continue
+            change = (step["ms"] - prev["ms"]) / prev["ms"] * 100 if prev["ms"] else 0.0
+            print(f"  {step['step']:<34} {prev['ms']:>10.1f} → {step['ms']:>10.1f} ms  ({change:+.0f}%)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless Scene Master benchmarks")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--workdir", default=os.path.join(HERE, ".bench"),
+                        help="Generated folders, settings and caches (reused between runs)")
+    parser.add_argument("--out", help="Write the JSON results here (default: stdout)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--timeout", type=float, default=600, help="Seconds to wait for a background step")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="Compare two result files and exit")
+    parser.add_argument("--child", help=argparse.SUPPRESS)  # Internal: benchmark one folder in this process
+    parser.add_argument("--cold-start", action="store_true", help=argparse.SUPPRESS)  # Internal: time a launch
+    args = parser.parse_args(argv)
+    args.workdir = os.path.abspath(args.workdir)
+
+    if args.compare:
+        compare(*args.compare)
+        return 0
+    if args.cold_start:
+        print(json.dumps(run_cold_start(args)))
+        return 0
+    if args.child:
+        print(json.dumps(run_size(args.child, args)))
+        return 0
+
+    # Generating needs Qt for the templates only; keep it in a child so the parent stays small
+    template_dir = os.path.join(args.workdir, "templates")
+    report = {"revision": git_revision(), "python": platform.python_version(), "platform": platform.platform(),
+              "cpus": os.cpu_count(), "seed": args.seed, "sizes": {}}
+    for size in args.sizes:
+        folder = os.path.join(args.workdir, f"images_{size}_{args.seed}")
+        print(f"{size} images", file=sys.stderr)
+        env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+        subprocess.run([sys.executable, "-c",
+                        "import sys; sys.path.insert(0, sys.argv[1]); from PyQt5 import QtWidgets; "
+                        "app = QtWidgets.QApplication([]); import scene_benchmark as b; "
+                        "b.generate_folder(sys.argv[2], int(sys.argv[3]), int(sys.argv[4]), sys.argv[5])",
+                        HERE, folder, str(size), str(args.seed), template_dir], env=env, check=True)
+        child = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", folder,
+                                "--workdir", args.workdir, "--seed", str(args.seed), "--timeout", str(args.timeout)],
+                               env=env, stdout=subprocess.PIPE, text=True)
+        if child.returncode != 0:
+            report["sizes"][str(size)] = {"error": f"Benchmark process exited with {child.returncode}"}
+            continue
+        report["sizes"][str(size)] = json.loads(child.stdout.strip().splitlines()[-1])
+
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+"""
+Flipbook timing - which frame is on screen when, for playback in the preview.
+
+→ Steps are counted from the wall clock, not from timer ticks, so a late tick never slows playback down
+→ Loop, ping-pong (no repeated end frames) and play-once over any range of frames
+→ A step that was due but never shown (its frame wasn't decoded in time) counts as dropped
+→ No Qt dependency
+"""
+import time
+from collections import deque
+
+PLAYBACK_MODES = ("Loop", "Ping-pong", "Once")
+FPS_CHOICES = (12, 24, 25, 30, 60)
+DEFAULT_FPS = 24
+BUFFER_SECONDS = 1.5  # Frames decoded ahead of the playhead
+BUFFER_MEMORY_MB = 256  # Ring buffer cap, whatever the fps and preview size
+
+
+def frame_at(step, count, mode):
+    """Frame (0 .. count - 1) shown at step 0, 1, 2, ... of a playback, or None once a "Once" run is over"""
+    if count <= 0 or (mode == "Once" and step >= count):
+        return None
+    if mode == "Ping-pong" and count > 1:
+        period = 2 * (count - 1)
+        phase = step % period
+        return phase if phase < count else period - phase
+    return step % count
+
+
+def buffer_frames(fps, frame_bytes):
+    """Ring buffer size: BUFFER_SECONDS of playback, within BUFFER_MEMORY_MB"""
+    return max(2, min(int(fps * BUFFER_SECONDS), BUFFER_MEMORY_MB * 1024 * 1024 // max(1, frame_bytes)))
+
+
+class PlaybackClock:
+    """Due step by wall-clock time, plus shown / dropped counts and the measured frame rate"""
+
+    def __init__(self, fps, step=0, clock=time.perf_counter):
+        self.clock = clock
+        self.fps = fps
+        self.shown = 0
+        self.dropped = 0
+        self.last_step = step - 1  # Last step put on screen
+        self.recent = deque()  # When the frames of the last second were shown
+        self.origin = clock() - step / fps
+
+    def due(self):
+        return int((self.clock() - self.origin) * self.fps)
+
+    def restart(self, fps, step):
+        """New rate, or resume after a pause: step is due now"""
+        self.fps = fps
+        self.origin = self.clock() - step / fps
+        self.last_step = step - 1
+        self.recent.clear()
+
+    def show(self, step):
+        """step is on screen; the steps skipped since the last one shown were dropped"""
+        now = self.clock()
+        self.dropped += max(0, step - self.last_step - 1)
+        self.shown += 1
+        self.last_step = step
+        self.recent.append(now)
+        while self.recent and now - self.recent[0] > 1.0:
+            self.recent.popleft()
+
+    def measured_fps(self):
+        if len(self.recent) < 2:
+            return 0.0
+        return (len(self.recent) - 1) / max(self.recent[-1] - self.recent[0], 1e-6)
@@ -0,0 +1,180 @@
+"""
+Event-driven folder watching with exact added / removed / modified deltas.
+
+→ QFileSystemWatcher (inotify / ReadDirectoryChangesW / FSEvents) triggers a debounced rescan
+→ Fallback poll skips the rescan while the directory mtime is unchanged, with an occasional
+  full rescan to catch files edited in place (those don't touch the directory mtime)
+→ Deltas are always relative to the accepted baseline (what the grid shows), so a pending
+  change keeps being reported until it is applied or the folder is reloaded
+→ A restored session starts from its saved baseline; the first scan runs on a worker thread
+"""
+import os
+
+from PyQt5 import QtCore
+
+from profiler import TRACER
+
+
+def scan_folder(folder, extensions):
+    """{file name: (mtime_ns, size)} for supported images directly inside folder"""
+    snapshot = {}
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            if os.path.splitext(entry.name)[1].lower() not in extensions:
+                continue
+            try:
+                st = entry.stat()
+            except OSError:
+                continue  # Deleted while scanning
+            snapshot[entry.name] = (st.st_mtime_ns, st.st_size)
+    return snapshot
+
+
+def diff_snapshots(old, new):
+    """(added, removed, modified) file names, each sorted"""
+    added = sorted(new.keys() - old.keys())
+    removed = sorted(old.keys() - new.keys())
+    modified = sorted(name for name in new.keys() & old.keys() if new[name] != old[name])
+    return added, removed, modified
+
+
+def directory_mtime(folder):
+    try:
+        return os.stat(folder).st_mtime_ns
+    except OSError:
+        return None
+
+
+class ScanTask(QtCore.QRunnable):
+    """Scan the watched folder on a worker thread (reconciling a restored session)"""
+
+    def __init__(self, watcher, generation, folder):
+        super().__init__()
+        self.watcher = watcher
+        self.generation = generation
+        self.folder = folder
+
+    def run(self):
+        try:
+            with TRACER.span("folder_scan", background=True):
+                snapshot = scan_folder(self.folder, self.watcher.extensions)
+        except OSError:
+            snapshot = None
+        self.watcher.scanned.emit(self.generation, snapshot)
+
+
+class FolderWatcher(QtCore.QObject):
+    """Reports (added, removed, modified) file names of one folder relative to its baseline"""
+    changed = QtCore.pyqtSignal(list, list, list)
+    reconciled = QtCore.pyqtSignal(list, list, list)  # First delta after watch(folder, baseline)
+    scanned = QtCore.pyqtSignal(int, object)  # Internal: emitted from the worker thread
+
+    DEBOUNCE_MS = 300
+    FULL_RESCAN_EVERY = 6  # Polls between unconditional rescans
+
+    def __init__(self, extensions, parent=None):
+        super().__init__(parent)
+        self.extensions = extensions
+        self.folder = None
+        self.baseline = {}  # Snapshot the grid reflects
+        self.last_scan = {}
+        self.last_dir_mtime = None
+        self.polls = 0
+        self.suspended = False
+        self.generation = 0  # Bumped whenever a running background scan becomes stale
+        self.pool = QtCore.QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+        self.scanned.connect(self.on_scanned)
+        self.watcher = QtCore.QFileSystemWatcher(self)
+        self.watcher.directoryChanged.connect(self.schedule_check)
+        self.debounce_timer = QtCore.QTimer(self)
+        self.debounce_timer.setSingleShot(True)
+        self.debounce_timer.timeout.connect(self.check)
+
+    def watch(self, folder, baseline=None):
+        """Start watching folder; its current contents become the baseline.
+
+        With a saved baseline (restored session) the folder is scanned in the background
+        instead, and the difference arrives once through reconciled.
+        """
+        if self.watcher.directories():
+            self.watcher.removePaths(self.watcher.directories())
+        self.folder = folder
+        self.suspended = False
+        if baseline is None:
+            self.resync()
+        else:
+            self.generation += 1
+            self.debounce_timer.stop()
+            self.baseline = self.last_scan = baseline
+            self.last_dir_mtime = None
+            self.suspended = True  # Until the background scan lands
+            self.pool.start(ScanTask(self, self.generation, folder))
+        if folder and os.path.isdir(folder):
+            self.watcher.addPath(folder)
+
+    def on_scanned(self, generation, snapshot):
+        if generation != self.generation:
+            return  # Another folder was opened, or a rename re-baselined the folder meanwhile
+        self.suspended = False
+        if snapshot is None:
+            return
+        self.last_dir_mtime = directory_mtime(self.folder)
+        self.last_scan = snapshot
+        self.reconciled.emit(*diff_snapshots(self.baseline, snapshot))
+
+    def shutdown(self):
+        self.generation += 1
+        self.pool.waitForDone()
+
+    def names(self):
+        return set(self.baseline)
+
+    def suspend(self):
+        """Ignore changes (our own rename batches) until resync()"""
+        self.suspended = True
+        self.generation += 1
+        self.debounce_timer.stop()
+
+    def resync(self):
+        """Take the folder as it is now as the new baseline and resume watching"""
+        self.suspended = False
+        self.generation += 1
+        self.debounce_timer.stop()
+        if not self.folder or not os.path.isdir(self.folder):
+            self.baseline = self.last_scan = {}
+            return
+        self.last_dir_mtime = directory_mtime(self.folder)
+        self.baseline = self.last_scan = scan_folder(self.folder, self.extensions)
+
+    def accept(self):
+        """The grid now shows the last scan (live mode applied the delta)"""
+        self.baseline = self.last_scan
+
+    def schedule_check(self, *args):
+        if not self.suspended:
+            self.debounce_timer.start(self.DEBOUNCE_MS)  # Restarts - bursts collapse into one scan
+
+    def poll(self):
+        """Fallback for file systems without change notifications (e.g. some network shares)"""
+        if self.suspended or not self.folder:
+            return
+        self.polls += 1
+        mtime = directory_mtime(self.folder)
+        if mtime == self.last_dir_mtime and self.polls % self.FULL_RESCAN_EVERY:
+            return
+        self.check()
+
+    def check(self):
+        if self.suspended or not self.folder or not os.path.isdir(self.folder):
+            return
+        # Some backends drop the watch when the directory is replaced
+        if self.folder not in self.watcher.directories():
+            self.watcher.addPath(self.folder)
+        self.last_dir_mtime = directory_mtime(self.folder)
+        try:
+            with TRACER.span("folder_scan"):
+                self.last_scan = scan_folder(self.folder, self.extensions)
+        except OSError:
+            return
+        self.changed.emit(*diff_snapshots(self.baseline, self.last_scan))
@@ -0,0 +1,137 @@
+"""
+Perceptual frame hashes and near-duplicate grouping.
+
+→ pHash / dHash / aHash as 64-bit ints, computed from small grayscale renders of a thumbnail
+→ Frames are grouped when a chain of hashes within max_distance bits links them
+→ Grouping never compares all pairs: hashes are indexed by 16-bit chunks, and two hashes
+  within d bits agree on some chunk up to d // 4 bits (pigeonhole), so only hashes whose
+  chunks are that close are ever compared
+→ No Qt dependency
+"""
+import math
+import struct
+from itertools import combinations
+from operator import mul
+
+HASH_KINDS = ("phash", "dhash", "ahash")  # Order of the hashes in a frame's triple
+HASH_SIZE = 8  # 8 x 8 = 64 bits
+PHASH_SIZE = 32  # pHash keeps the low 8 x 8 frequencies of a 32 x 32 DCT
+DEFAULT_MAX_DISTANCE = 6
+MAX_DISTANCE = 10  # Wider radii grow the probes per hash combinatorially
+HASH_STRUCT = struct.Struct("<3Q")
+
+# Rows of the DCT-II basis for the frequencies pHash keeps
+DCT_BASIS = [[math.cos(math.pi * (2 * x + 1) * u / (2 * PHASH_SIZE)) for x in range(PHASH_SIZE)]
+             for u in range(HASH_SIZE)]
+
+try:
+    popcount = int.bit_count  # Python 3.10+
+except AttributeError:
+    def popcount(value):
+        return bin(value).count("1")
+
+
+def bits_to_int(bits):
+    value = 0
+    for bit in bits:
+        value = value << 1 | bit
+    return value
+
+
+def ahash(pixels):
+    """Average hash of an 8 x 8 grayscale render: pixels brighter than the mean"""
+    mean = sum(pixels) / len(pixels)
+    return bits_to_int(p > mean for p in pixels)
+
+
+def dhash(pixels):
+    """Difference hash of a 9 x 8 grayscale render: each pixel against its left neighbour"""
+    width = HASH_SIZE + 1
+    return bits_to_int(pixels[i + 1] > pixels[i]
+                       for row in range(0, len(pixels), width) for i in range(row, row + HASH_SIZE))
+
+
+def phash(pixels):
+    """DCT hash of a 32 x 32 grayscale render: low frequencies above their median"""
+    n = PHASH_SIZE
+    # Separable DCT, low frequencies only: along each row, then down each column
+    partial = [[sum(map(mul, pixels[y:y + n], basis)) for basis in DCT_BASIS] for y in range(0, n * n, n)]
+    columns = list(zip(*partial))
+    coefficients = [sum(map(mul, basis, column)) for basis in DCT_BASIS for column in columns]
+    ordered = sorted(coefficients)
+    median = (ordered[31] + ordered[32]) / 2
+    return bits_to_int(c > median for c in coefficients)
+
+
+def hash_frame(gray):
+    """(phash, dhash, ahash) of one frame; gray(width, height) renders it as 8-bit grayscale bytes"""
+    return (phash(gray(PHASH_SIZE, PHASH_SIZE)), dhash(gray(HASH_SIZE + 1, HASH_SIZE)),
+            ahash(gray(HASH_SIZE, HASH_SIZE)))
+
+
+def pack_hashes(hashes):
+    return HASH_STRUCT.pack(*hashes)
+
+
+def unpack_hashes(data):
+    return HASH_STRUCT.unpack(data)
+
+
+def hamming(a, b):
+    return popcount(a ^ b)
+
+
+def flip_masks(bits, radius):
+    """Every mask of up to radius set bits within the low bits"""
+    return [sum(1 << bit for bit in chosen) for r in range(radius + 1) for chosen in combinations(range(bits), r)]
+
+
+def chunk_count(count, max_distance):
+    """Chunks per hash that keep probes + expected bucket hits per hash lowest"""
+    def cost(chunks):
+        bits = 64 // chunks
+        probes = chunks * sum(math.comb(bits, r) for r in range(max_distance // chunks + 1))
+        return probes * (1 + count / 2 ** bits)
+    return min((2, 4, 8), key=cost)
+
+
+def group_near_duplicates(hashes, max_distance=DEFAULT_MAX_DISTANCE):
+    """Groups of indices into hashes (each ascending, two or more frames), ordered by first index"""
+    members = {}  # Identical hashes are grouped up front; only distinct values are compared
+    for i, value in enumerate(hashes):
+        members.setdefault(value, []).append(i)
+    parent = {value: value for value in members}  # Union-find over the distinct values
+
+    def find(value):
+        while parent[value] != value:
+            parent[value] = parent[parent[value]]
+            value = parent[value]
+        return value
+
+    def union(pairs):
+        for value, other in pairs:
+            root, other_root = find(value), find(other)
+            if root != other_root:
+                parent[other_root] = root
+
+    if max_distance > 0 and len(members) > 1:
+        chunks = chunk_count(len(members), max_distance)
+        bits = 64 // chunks
+        low_mask = (1 << bits) - 1
+        masks = flip_masks(bits, max_distance // chunks)[1:]  # The empty mask is the bucket itself
+        for chunk in range(chunks):
+            shift = chunk * bits
+            buckets = {}
+            for value in members:
+                buckets.setdefault(value >> shift & low_mask, []).append(value)
+            union((a, b) for bucket in buckets.values() if len(bucket) > 1
+                  for i, a in enumerate(bucket) for b in bucket[i + 1:] if popcount(a ^ b) <= max_distance)
+            empty = ()
+            for mask in masks:
+                # Each pair of buckets is visited once, from the smaller chunk value
+                union([(a, b) for part, bucket in buckets.items() if part < part ^ mask
+                       for b in buckets.get(part ^ mask, empty) for a in bucket if popcount(a ^ b) <= max_distance])
+    groups = {}
+    for value, rows in members.items():
+        groups.setdefault(find(value), []).extend(rows)
+    return sorted(sorted(group) for group in groups.values() if len(group) > 1)
@@ -0,0 +1,73 @@
+"""
+Rough sequencing of frames by visual similarity - for shuffled shot dumps, before manual cleanup.
+
+→ A frame's feature is its three perceptual hashes side by side (192 bits); the distance
+  between two frames is one XOR + popcount of their features
+→ Greedy nearest-neighbour chain from the first frame (ties keep the current order), then
+  windowed 2-opt passes that undo the crossings a greedy chain leaves behind
+→ No Qt dependency
+"""
+from frame_hash import popcount
+
+TWO_OPT_WINDOW = 50  # Largest segment a 2-opt move reverses
+TWO_OPT_PASSES = 4
+
+
+def frame_feature(hashes):
+    """192-bit feature of a frame from its (phash, dhash, ahash)"""
+    phash, dhash, ahash = hashes
+    return phash << 128 | dhash << 64 | ahash
+
+
+def nearest_neighbour_chain(features, start=0):
+    """Indices into features: start, then always the nearest frame not yet placed"""
+    rest = [i for i in range(len(features)) if i != start]
+    rest_features = [features[i] for i in rest]
+    chain = [start]
+    current = features[start]
+    while rest:
+        distances = [popcount(current ^ feature) for feature in rest_features]
+        k = distances.index(min(distances))  # First of equals: the one earliest in the current order
+        chain.append(rest.pop(k))
+        current = rest_features.pop(k)
+    return chain
+
+
+def two_opt(chain, features, window=TWO_OPT_WINDOW, passes=TWO_OPT_PASSES):
+    """Shorten an open chain in place by reversing segments of up to window frames (the first frame stays)"""
+    n = len(chain)
+    ordered = [features[i] for i in chain]
+    for _ in range(passes):
+        improved = False
+        for i in range(n - 2):
+            a = ordered[i]
+            ab = popcount(a ^ ordered[i + 1])
+            for j in range(i + 2, min(n, i + 1 + window)):
+                # Reversing i+1..j swaps edges (i, i+1) + (j, j+1) for (i, j) + (i+1, j+1)
+                c = ordered[j]
+                if j + 1 < n:
+                    d = ordered[j + 1]
+                    old = ab + popcount(c ^ d)
+                    new = popcount(a ^ c) + popcount(ordered[i + 1] ^ d)
+                else:
+                    old, new = ab, popcount(a ^ c)  # Open end: only one edge changes
+                if new < old:
+                    chain[i + 1:j + 1] = chain[j:i:-1]
+                    ordered[i + 1:j + 1] = ordered[j:i:-1]
+                    ab = popcount(a ^ ordered[i + 1])
+                    improved = True
+        if not improved:
+            break
+    return chain
+
+
+def similarity_chain(features, start=0):
+    """Order for features (indices) that walks from start through ever-similar frames"""
+    if not features:
+        return []
+    return two_opt(nearest_neighbour_chain(features, start), features)
+
+
+def chain_length(chain, features):
+    """Total distance (differing bits) between consecutive frames of chain"""
+    return sum(popcount(features[a] ^ features[b]) for a, b in zip(chain, chain[1:]))
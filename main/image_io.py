@@ -0,0 +1,149 @@
+"""
+Shared image loading layer built on QImageReader - used by thumbnails, preview and anything
+else that needs pixels from disk.
+
+→ Decodes straight to the requested size (the JPEG decoder downscales in the DCT domain,
+  so a 50 MP photo never exists in memory at full resolution)
+→ Honours EXIF orientation (setAutoTransform)
+→ Reads dimensions and format from the file header without decoding pixels
+→ Tiny grayscale renders of decoded images for perceptual hashing
+→ Region reads for the zoomable preview: TIFF scans through tiled_image, clipped JPEG decodes,
+  whole-image decodes for the rest; very large TIFFs are scaled down without a full decode
+→ Safe to call from worker threads (QImage only, no QPixmap)
+"""
+from PyQt5 import QtGui
+from PyQt5.QtCore import Qt, QRect, QSize
+
+from tiled_image import READ_ERRORS, TIFF_EXTENSIONS, open_tiff
+
+LARGE_IMAGE_PIXELS = 64 * 1000 * 1000  # TIFFs above this are never decoded whole for a scaled read
+CHANNEL_FORMATS = {1: QtGui.QImage.Format_Grayscale8, 3: QtGui.QImage.Format_RGB888,
+                   4: QtGui.QImage.Format_RGBA8888}
+
+
+def open_reader(path):
+    reader = QtGui.QImageReader(path)
+    reader.setAutoTransform(True)
+    return reader
+
+
+def rotates_90(reader):
+    """True when the EXIF orientation swaps width and height"""
+    return bool(reader.transformation() & QtGui.QImageIOHandler.TransformationRotate90)
+
+
+def image_header(path):
+    """(width, height, format) from the file header without decoding pixels; 0 x 0 if unreadable"""
+    reader = open_reader(path)
+    size = reader.size()
+    image_format = bytes(reader.format()).decode("ascii", "replace")
+    if not size.isValid():
+        return 0, 0, image_format
+    if rotates_90(reader):
+        size.transpose()
+    return size.width(), size.height(), image_format
+
+
+def read_image(path, max_width=0, max_height=0):
+    """Decode path so it fits inside max_width x max_height (0 = full size), keeping aspect ratio.
+
+    Images already smaller than the box are decoded as-is (never upscaled here).
+    Returns a null QImage if the file can't be read.
+    """
+    reader = open_reader(path)
+    if max_width > 0 and max_height > 0:
+        size = reader.size()  # Stored orientation, before the EXIF transform
+        if size.isValid() and size.width() * size.height() > LARGE_IMAGE_PIXELS and is_tiff(path):
+            tiff = open_tiff(path)
+            if tiff is not None:
+                return read_tiff_scaled(tiff, max_width, max_height)
+        if size.isValid():
+            box = QSize(max_width, max_height)
+            if rotates_90(reader):
+                box.transpose()
+            if size.width() > box.width() or size.height() > box.height():
+                reader.setScaledSize(size.scaled(box, Qt.KeepAspectRatio))
+    return reader.read()
+
+
+def gray_pixels(image, width, height):
+    """8-bit grayscale pixels of image squeezed to width x height, row by row without padding"""
+    small = image.scaled(width, height, Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+    small = small.convertToFormat(QtGui.QImage.Format_Grayscale8)
+    stride = small.bytesPerLine()
+    data = small.constBits().asstring(stride * height)
+    if stride == width:
+        return data
+    return b"".join(data[y * stride:y * stride + width] for y in range(height))
+
+
+def is_tiff(path):
+    return path.lower().endswith(TIFF_EXTENSIONS)
+
+
+def tiff_region(tiff, x, y, width, height, step):
+    """QImage of every step-th pixel of a full-resolution rectangle of a TiffImage (null if the file is corrupt)"""
+    try:
+        columns, rows, channels, data = tiff.read_region(x, y, width, height, step)
+    except READ_ERRORS:
+        return QtGui.QImage()  # Damaged, or still being copied in - reported like any unreadable file
+    image_format = QtGui.QImage.Format_RGBA8888_Premultiplied if tiff.premultiplied else CHANNEL_FORMATS[channels]
+    return QtGui.QImage(data, columns, rows, columns * channels, image_format).copy()
+
+
+def read_tiff_scaled(tiff, max_width, max_height):
+    """Fit a huge TIFF into max_width x max_height from every n-th pixel (twice the box, then smoothed)"""
+    width, height = tiff.size
+    step = max(1, int(min(width / max_width, height / max_height) / 2))
+    image = tiff_region(tiff, 0, 0, width, height, step)
+    if image.isNull():
+        return image
+    if image.width() > max_width or image.height() > max_height:
+        image = image.scaled(max_width, max_height, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+    return image
+
+
+class RegionSource:
+    """Rectangles of one image at 1 / step scale, decoding as little of the file as the format allows.
+
+    TIFF scans are read strip / tile-wise (tiled_image) and JPEGs decode only the clipped rows;
+    other formats (and EXIF-rotated files) can only be decoded whole: whole is True and callers
+    ask for the full rectangle once per scale. Safe to share between worker threads.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.tiff = open_tiff(path) if is_tiff(path) else None
+        if self.tiff is not None:
+            self.width, self.height = self.tiff.size
+            self.whole = False
+            return
+        reader = open_reader(path)
+        size = reader.size()
+        self.width, self.height = (size.width(), size.height()) if size.isValid() else (0, 0)
+        self.whole = not (reader.supportsOption(QtGui.QImageIOHandler.ClipRect)
+                          and reader.supportsOption(QtGui.QImageIOHandler.ScaledSize)
+                          and reader.transformation() == QtGui.QImageIOHandler.TransformationNone)
+        if self.whole and rotates_90(reader):
+            self.width, self.height = self.height, self.width
+
+    def read(self, x, y, width, height, step):
+        """QImage of the full-resolution rectangle at 1 / step scale (null if unreadable)"""
+        width = min(width, self.width - x)
+        height = min(height, self.height - y)
+        if width <= 0 or height <= 0:
+            return QtGui.QImage()
+        if self.tiff is not None:
+            return tiff_region(self.tiff, x, y, width, height, step)
+        scaled = QSize(max(1, -(-width // step)), max(1, -(-height // step)))
+        if self.whole:
+            # Callers read the full rectangle once per scale; Qt scales while decoding where it can
+            image = read_image(self.path, -(-self.width // step), -(-self.height // step))
+            if (x, y, width, height) != (0, 0, self.width, self.height) and not image.isNull():
+                image = image.copy(x // step, y // step, scaled.width(), scaled.height())
+            return image
+        reader = open_reader(self.path)
+        reader.setClipRect(QRect(x, y, width, height))
+        if step > 1:
+            reader.setScaledSize(scaled)
+        return reader.read()
@@ -0,0 +1,121 @@
+"""
+Image metadata index - what the grid sorts and filters by, read without decoding pixels.
+
+→ Per file: mtime, size, pixel dimensions, format and EXIF capture time (DateTimeOriginal)
+→ EXIF is read straight from the JPEG APP1 segment or the TIFF header (a few KB of the file)
+→ Sorting and filtering only look at the index; files are never re-read for them
+→ No Qt dependency
+"""
+import struct
+from collections import namedtuple
+from datetime import datetime
+from operator import attrgetter
+
+FrameMetadata = namedtuple("FrameMetadata", "mtime size width height format captured")
+
+EXIF_READ_LIMIT = 256 * 1024  # EXIF data lives near the start of the file
+EXIF_HEADER = b"Exif\x00\x00"
+TAG_DATETIME = 0x0132  # IFD0: last modified (fallback)
+TAG_EXIF_IFD = 0x8769
+TAG_DATETIME_ORIGINAL = 0x9003
+TAG_DATETIME_DIGITIZED = 0x9004
+TYPE_ASCII, TYPE_LONG = 2, 4
+UHD_EDGE, FULL_HD_EDGE = 3840, 1920
+
+
+def capture_key(metadata):
+    """Capture time, or the modified time for files without EXIF (seconds since the epoch)"""
+    return metadata.captured if metadata.captured is not None else metadata.mtime / 1e9
+
+
+SORT_KEYS = {
+    "Capture time": capture_key,
+    "Modified time": attrgetter("mtime"),
+    "Dimensions": lambda m: (m.width * m.height, m.width),
+    "File size": attrgetter("size"),
+}
+
+FRAME_FILTERS = {
+    "All frames": None,
+    "4K and larger": lambda m: max(m.width, m.height) >= UHD_EDGE,
+    "Full HD and larger": lambda m: max(m.width, m.height) >= FULL_HD_EDGE,
+    "Smaller than Full HD": lambda m: 0 < max(m.width, m.height) < FULL_HD_EDGE,
+    "Landscape": lambda m: m.width > m.height,
+    "Portrait": lambda m: m.height > m.width,
+}
+
+
+def jpeg_exif(f):
+    """TIFF block of the Exif APP1 segment of an open JPEG (positioned after SOI), or None"""
+    while True:
+        marker = f.read(2)
+        if len(marker) < 2 or marker[0] != 0xFF:
+            return None
+        if marker[1] in (0xD9, 0xDA):
+            return None  # End of image / start of scan: no EXIF before the pixels
+        length = struct.unpack(">H", f.read(2))[0]
+        if marker[1] == 0xE1:
+            data = f.read(length - 2)
+            if data.startswith(EXIF_HEADER):
+                return data[len(EXIF_HEADER):]
+        else:
+            f.seek(length - 2, 1)
+
+
+def parse_exif_time(text):
+    text = text.strip("\x00 ")[:19]
+    if len(text) != 19:
+        return None  # Blank, or cut short by a truncated file ("14:07:0" must not read as 14:07:00)
+    try:
+        return datetime.strptime(text, "%Y:%m:%d %H:%M:%S").timestamp()
+    except (ValueError, OverflowError, OSError):
+        return None  # Malformed date or time
+
+
+def tiff_capture_time(data):
+    """DateTimeOriginal (else DateTimeDigitized, else DateTime) from a TIFF block, as a local timestamp"""
+    order = {b"II": "<", b"MM": ">"}.get(data[:2])
+    if order is None:
+        return None
+
+    def entries(offset):
+        count = struct.unpack_from(order + "H", data, offset)[0]
+        for i in range(count):
+            yield struct.unpack_from(order + "HHII", data, offset + 2 + i * 12)
+
+    def text(type_, count, value_offset):
+        if type_ != TYPE_ASCII or count <= 4:
+            return None
+        return parse_exif_time(data[value_offset:value_offset + count].decode("ascii", "replace"))
+
+    found = {}
+    exif_ifd = None
+    for tag, type_, count, value in entries(struct.unpack_from(order + "I", data, 4)[0]):
+        if tag == TAG_EXIF_IFD and type_ == TYPE_LONG:
+            exif_ifd = value
+        elif tag == TAG_DATETIME:
+            found[tag] = text(type_, count, value)
+    if exif_ifd:
+        for tag, type_, count, value in entries(exif_ifd):
+            if tag in (TAG_DATETIME_ORIGINAL, TAG_DATETIME_DIGITIZED):
+                found[tag] = text(type_, count, value)
+    for tag in (TAG_DATETIME_ORIGINAL, TAG_DATETIME_DIGITIZED, TAG_DATETIME):
+        if found.get(tag) is not None:
+            return found[tag]
+    return None
+
+
+def capture_time(path):
+    """EXIF capture time of a JPEG or TIFF file (local timestamp), or None"""
+    try:
+        with open(path, "rb") as f:
+            head = f.read(2)
+            if head == b"\xff\xd8":
+                data = jpeg_exif(f)
+            elif head in (b"II", b"MM"):
+                data = head + f.read(EXIF_READ_LIMIT - 2)
+            else:
+                return None
+        return tiff_capture_time(data) if data else None
+    except (OSError, struct.error):
+        return None
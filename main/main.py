@@ -20,21 +20,107 @@ UPDATED:
 - FIXED: Thumbnail slider now actually resizes thumbnails progressively (not just padding)
 - FIXED: Preview maximized to full width (no left/right padding)
 - FIXED: Copyright moved to absolute bottom in standard professional position
+- Thumbnails decode on a background thread pool (all cores), placeholders appear instantly
+- Persistent SQLite thumbnail cache in the user cache folder (size cap + purge button)
+- Grid is a QListView over a flat model; thumbnails are decoded lazily for the rows on screen
+- Thumbnail scheduling: visible rows first, then a prefetch margin, then everything else
+- Each image is decoded once into a 100/200/400px pyramid; the size slider never re-reads files
+- All image reads go through QImageReader at target size (image_io), EXIF orientation honoured
+- Preview decodes off the GUI thread (LRU + prefetch in the direction of travel, key repeats coalesced)
+- Decoded thumbnails live in a byte-budgeted LRU (hit/miss/eviction counters in the status tooltip)
+- Folder watching is event-driven (exact added/removed/modified counts); optional live sync updates the grid in place
+- Renames are planned as a permutation: files already in place are skipped, temp names only break cycles
+- Renames run on a worker thread (progress + cancel), journaled so an interrupted batch can be finished or undone
+- Search uses a name index kept in step with renames/reorders: "k of N" match counts while typing, ↑/↓ in O(1)
+- Text / Regex / Glob / Fuzzy search modes; all matches are highlighted and "All" selects them in one go
+- Reordering is one O(n) permutation with bulk selection restore; drags carry a compact binary row payload (no eval)
+- Scanning / ordering / renumbering live in a Qt-free core (scene_core) shared with the scene_master command line
+- Switchable timing spans on the hot paths (Chrome trace export) and a Stats panel: decode rate, queue, hit rate, memory
+- Instant cold start: the last session (order, thumbnail size, current row) is painted from a snapshot, then reconciled
+- Natural-order keys are computed once per name (precompiled tokenizer); new files are placed by bisect, not row scans
+- Find Duplicates: perceptual hashes (pHash/dHash/aHash) from the decoded thumbnails, cached with them; groups to select or gather
+- Auto-order by Similarity: the selection (or folder) is chained nearest-neighbour by hash features, applied as one reorder
+- Metadata index (size, mtime, dimensions, format, EXIF capture time) built in parallel from headers, cached with the
+  thumbnails: instant sort by capture time / mtime / dimensions / size and filters such as "4K and larger"
+- Workspaces: a root folder (recursive) or a saved folder list; every shot folder is a shard, listed concurrently,
+  watched for counts, and loaded only while on screen (left shards keep just their order); drop frames on a shard to move them
+- Flipbook: Space / Play runs the selection (or all frames) in the preview at 12–60 fps, loop / ping-pong / once,
+  from a ring buffer decoded ahead by worker threads; frames that miss their slot are dropped and counted
+- Zoomable preview (wheel / drag / double-click to fit): only the tiles on screen are decoded, at the zoom's scale,
+  coarse to fine into a bounded tile cache; TIFF scans are read strip / tile-wise, so 500 MP files open in a blink
 """
+import time
+LAUNCH_TIME = time.perf_counter()  # Time to first interactive is measured from here
+import json
 import os
 import sys
 import re
+import sqlite3
+import struct
+import threading
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from itertools import groupby
+from operator import attrgetter
 from PyQt5 import QtWidgets, QtGui, QtCore
 from PyQt5.QtCore import Qt, QSettings, QTimer
 from PyQt5.QtWidgets import QAbstractItemView, QApplication
+from image_io import RegionSource, gray_pixels, image_header, read_image
+from image_metadata import FRAME_FILTERS, SORT_KEYS, FrameMetadata, capture_time
+from flipbook import DEFAULT_FPS, FPS_CHOICES, PLAYBACK_MODES, PlaybackClock, buffer_frames, frame_at
+from folder_watcher import FolderWatcher
+from frame_order import frame_feature, similarity_chain
+from frame_hash import HASH_KINDS, DEFAULT_MAX_DISTANCE, MAX_DISTANCE, hash_frame, pack_hashes, unpack_hashes, \
+    group_near_duplicates
+from profiler import TRACER, TRACE_ENV, process_memory_mb
+from name_index import NameIndex, MatchCursor, SEARCH_MODES, match_names
+from rename_planner import JOURNAL_NAME, RenameJournal, path_key, plan_renames, execute_plan, undo_steps
+from scene_core import CLI_COMMANDS, SUPPORTED_EXT, InsertionIndex, list_images, natural_key, sequence_moves, reload_moves
+from session_snapshot import SNAPSHOT_NAME, save_snapshot, load_snapshot
+from thumbnail_cache import ThumbnailDiskCache, DEFAULT_CACHE_LIMIT_MB, CACHE_DB_NAME, file_signature
+from workspace import SCAN_WORKERS, WORKSPACE_SUFFIX, count_images, load_workspace, save_workspace, scan_workspace, \
+    shard_label, transfer_moves
 
-SUPPORTED_EXT = {".jpg", ".jpeg", ".png", ".bmp", ".gif", ".tiff", ".webp", ".tif"}
 THUMB_MIN, THUMB_MAX, DEFAULT_THUMB = 60, 400, 180
 PADDING = 30
+PYRAMID_LEVELS = (100, 200, THUMB_MAX)  # Every slider value is derived from the nearest larger level
+PREVIEW_PREFETCH_AHEAD, PREVIEW_PREFETCH_BEHIND = 4, 1
+DEFAULT_THUMB_MEMORY_MB = 1024
+FIRST_PAINT_TIMEOUT_MS = 2000  # Start up anyway if the window is never painted (e.g. opened minimized)
+SEARCH_HIGHLIGHT_BACKGROUND = QtGui.QColor(255, 159, 10, 70)
+SEARCH_HIGHLIGHT_TEXT = QtGui.QColor("#ff9f0a")
+
+
+def row_ranges(rows):
+    """Merge row numbers into sorted (first, last) runs of consecutive rows"""
+    ranges = []
+    for row in sorted(rows):
+        if ranges and row == ranges[-1][1] + 1:
+            ranges[-1][1] = row
+        else:
+            ranges.append([row, row])
+    return [tuple(r) for r in ranges]
+
+
+def encode_row_payload(rows):
+    """Drag payload: owner process id + (first, last) runs of the rows as native uint32 pairs"""
+    runs = array("I", [row for run in row_ranges(rows) for row in run])
+    return struct.pack("=Q", os.getpid()) + runs.tobytes()
 
 
-def natural_key(s):
-    return [int(c) if c.isdigit() else c.lower() for c in re.split(r'(\d+)', s)]
+def decode_row_payload(data):
+    """Rows from encode_row_payload, or None if the payload is malformed or from another process"""
+    if len(data) < 8 or (len(data) - 8) % 8:
+        return None
+    if struct.unpack_from("=Q", data)[0] != os.getpid():
+        return None  # Row numbers only mean something inside the window that started the drag
+    runs = array("I")
+    runs.frombytes(data[8:])
+    rows = []
+    for i in range(0, len(runs), 2):
+        rows.extend(range(runs[i], runs[i + 1] + 1))
+    return rows
 
 
 class SmartLineEdit(QtWidgets.QLineEdit):
@@ -54,40 +140,1894 @@ class SmartLineEdit(QtWidgets.QLineEdit):
         super().mousePressEvent(event)
 
 
-class DragDropListWidget(QtWidgets.QListWidget):
+def encode_thumbnail(image):
+    """Compress a thumbnail for the disk cache (PNG keeps transparency, JPEG otherwise)"""
+    data = QtCore.QByteArray()
+    buffer = QtCore.QBuffer(data)
+    buffer.open(QtCore.QIODevice.WriteOnly)
+    if image.hasAlphaChannel():
+        image.save(buffer, "PNG")
+    else:
+        image.save(buffer, "JPG", 90)
+    buffer.close()
+    return bytes(data)
+
+
+def build_pyramid(image):
+    """Smooth-scaled thumbnail levels (one per PYRAMID_LEVELS entry), each derived from the level above"""
+    current = image.scaled(THUMB_MAX, THUMB_MAX, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+    levels = [current]
+    for edge in reversed(PYRAMID_LEVELS[:-1]):
+        current = current.scaled(edge, edge, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        levels.insert(0, current)
+    return levels
+
+
+def pyramid_level(pyramid, size):
+    """Smallest pyramid level that is at least size (falls back to the largest)"""
+    for edge, image in zip(PYRAMID_LEVELS, pyramid):
+        if edge >= size:
+            return image
+    return pyramid[-1]
+
+
+def frame_hashes(pyramid):
+    """Perceptual hashes of a frame, rendered from its smallest thumbnail level"""
+    base = pyramid[0]
+    return hash_frame(lambda width, height: gray_pixels(base, width, height))
+
+
+def stored_hashes(cache, path, signature):
+    """Hashes the disk cache holds for this version of path, or None"""
+    if cache is None:
+        return None
+    data = cache.get_hashes(path, *signature)
+    return unpack_hashes(data) if data is not None else None
+
+
+def default_cache_path():
+    base = QtCore.QStandardPaths.writableLocation(QtCore.QStandardPaths.GenericCacheLocation)
+    return os.path.join(base or os.path.expanduser("~"), "ImageSceneFlowOrganizer", CACHE_DB_NAME)
+
+
+def default_snapshot_path():
+    base = QtCore.QStandardPaths.writableLocation(QtCore.QStandardPaths.GenericCacheLocation)
+    return os.path.join(base or os.path.expanduser("~"), "ImageSceneFlowOrganizer", SNAPSHOT_NAME)
+
+
+def default_journal_path():
+    base = QtCore.QStandardPaths.writableLocation(QtCore.QStandardPaths.GenericDataLocation)
+    return os.path.join(base or os.path.expanduser("~"), "ImageSceneFlowOrganizer", JOURNAL_NAME)
+
+
+class ThumbnailTask(QtCore.QRunnable):
+    """Decode pyramids and scale display thumbnails for a chunk of jobs on a worker thread.
+
+    Each job is (path, pyramid); a job without a pyramid reads the file (or the disk cache)
+    once, a job with one only smooth-scales from memory.
+    """
+
+    def __init__(self, loader, generation, ticket, jobs, size):
+        super().__init__()
+        self.loader = loader
+        self.generation = generation
+        self.ticket = ticket
+        self.jobs = jobs
+        self.paths = [path for path, _ in jobs]
+        self.size = size
+        self.cancelled = False  # Set from the GUI thread when the rows scroll far away
+
+    def run(self):
+        with TRACER.span("thumbnail_chunk", jobs=len(self.jobs), size=self.size):
+            self.decode_chunk()
+
+    def decode_chunk(self):
+        results = []  # (path, display QImage, new pyramid or None)
+        new_entries = []  # Freshly decoded top levels for the disk cache
+        cache_hits = []
+        hashes = []  # (path, hashes) of every freshly loaded pyramid
+        new_hashes = []  # Computed here, for the disk cache
+        for path, pyramid in self.jobs:
+            # Dropped, or the whole load was cancelled (new folder opened) - skip the rest
+            if self.cancelled or self.loader.generation != self.generation:
+                return
+            fresh = None
+            if pyramid is None:
+                pyramid = fresh = self.load_pyramid(path, new_entries, cache_hits, hashes, new_hashes)
+            if pyramid is None:
+                results.append((path, QtGui.QImage(), None))
+                continue
+            with TRACER.span("scale"):
+                image = pyramid_level(pyramid, self.size).scaled(self.size, self.size, Qt.KeepAspectRatio,
+                                                                 Qt.SmoothTransformation)
+            results.append((path, image, fresh))
+        self.loader.batch_decoded.emit(self.generation, self.ticket,
+                                       [results, new_entries, cache_hits, self.size, hashes, new_hashes])
+
+    def load_pyramid(self, path, new_entries, cache_hits, hashes, new_hashes):
+        """Build the pyramid from the cached top level, or decode the file once; hash it either way"""
+        signature = file_signature(path)
+        if signature is None:
+            return None
+        cache = self.loader.disk_cache
+        pyramid = None
+        if cache is not None:
+            with TRACER.span("disk_cache_read"):
+                data = cache.get(path, THUMB_MAX, *signature)
+                image = QtGui.QImage.fromData(data) if data is not None else None
+            if image is not None and not image.isNull():
+                cache_hits.append((path, THUMB_MAX))
+                with TRACER.span("build_pyramid"):
+                    pyramid = build_pyramid(image)
+        if pyramid is None:
+            with TRACER.span("read_image", path=path):  # Disk read + decode at reduced size
+                image = read_image(path, THUMB_MAX, THUMB_MAX)
+            if image.isNull():
+                return None
+            with TRACER.span("build_pyramid"):
+                pyramid = build_pyramid(image)
+            if cache is not None:
+                new_entries.append((path, THUMB_MAX, *signature, encode_thumbnail(pyramid[-1])))
+        found = stored_hashes(cache, path, signature)
+        if found is None:
+            with TRACER.span("frame_hash"):
+                found = frame_hashes(pyramid)
+            new_hashes.append((path, *signature, pack_hashes(found)))
+        hashes.append((path, found))
+        return pyramid
+
+
+class ThumbnailLoader(QtCore.QObject):
+    """Decodes thumbnails on all cores and streams them back to the GUI thread in batches.
+
+    Work is pulled from job_source(count) -> [(path, pyramid), ...] only when a worker frees
+    up, so the caller can change priorities at any time without rebuilding a queue.
+    """
+    thumbnails_ready = QtCore.pyqtSignal(list, int)  # [(path, QImage, pyramid), ...], size
+    hashes_ready = QtCore.pyqtSignal(list)  # [(path, (phash, dhash, ahash)), ...]
+    idle = QtCore.pyqtSignal()
+    batch_decoded = QtCore.pyqtSignal(int, int, list)  # Internal: emitted from worker threads
+
+    CHUNK_SIZE = 4  # Small chunks so new priorities take effect quickly
+
+    def __init__(self, job_source=None, parent=None):
+        super().__init__(parent)
+        self.job_source = job_source
+        self.disk_cache = None  # Optional ThumbnailDiskCache
+        self.thumbnail_size = DEFAULT_THUMB
+        self.pool = QtCore.QThreadPool(self)
+        self.pool.setMaxThreadCount(max(1, QtCore.QThread.idealThreadCount()))
+        self.max_in_flight = self.pool.maxThreadCount() * 2
+        self.generation = 0
+        self.next_ticket = 0
+        self.in_flight = {}  # ticket -> ThumbnailTask
+        self.busy_paths = set()
+        self.decoded_count = 0  # Images delivered (for the Stats panel)
+        self.disk_hit_count = 0
+        self.batch_decoded.connect(self.on_batch_decoded)
+
+    def pump(self):
+        """Fill free worker slots with the highest-priority jobs"""
+        while len(self.in_flight) < self.max_in_flight:
+            jobs = self.job_source(self.CHUNK_SIZE) if self.job_source else []
+            if not jobs:
+                break
+            self.next_ticket += 1
+            task = ThumbnailTask(self, self.generation, self.next_ticket, jobs, self.thumbnail_size)
+            self.in_flight[self.next_ticket] = task
+            self.busy_paths.update(task.paths)
+            self.pool.start(task)
+        TRACER.counter("thumbnail_queue", paths=len(self.busy_paths))
+        if not self.in_flight:
+            self.idle.emit()
+
+    def drop(self, keep_paths):
+        """Cancel in-flight chunks that contain none of keep_paths (rows scrolled far away)"""
+        for ticket, task in list(self.in_flight.items()):
+            if keep_paths.isdisjoint(task.paths):
+                task.cancelled = True
+                del self.in_flight[ticket]
+                self.busy_paths.difference_update(task.paths)
+
+    def cancel(self):
+        """Drop every queued and running chunk; running chunks stop at their next file"""
+        self.generation += 1
+        for task in self.in_flight.values():
+            task.cancelled = True
+        self.in_flight.clear()
+        self.busy_paths.clear()
+        self.pool.clear()
+
+    def is_running(self):
+        return bool(self.in_flight)
+
+    def on_batch_decoded(self, generation, ticket, batch):
+        results, new_entries, cache_hits, size, hashes, new_hashes = batch
+        self.decoded_count += len(results)
+        self.disk_hit_count += len(cache_hits)
+        if self.disk_cache is not None:
+            # Writes happen on the GUI thread in one transaction per batch
+            try:
+                with TRACER.span("disk_cache_write", entries=len(new_entries)):
+                    self.disk_cache.put_many(new_entries)
+                    self.disk_cache.touch(cache_hits)
+                    self.disk_cache.put_hashes_many(new_hashes)
+            except sqlite3.Error:
+                pass
+        if generation != self.generation:
+            return  # Stale batch from a cancelled load
+        task = self.in_flight.pop(ticket, None)
+        if task is not None:
+            self.busy_paths.difference_update(task.paths)
+        if hashes:
+            self.hashes_ready.emit(hashes)
+        self.thumbnails_ready.emit(results, size)
+        self.pump()
+
+
+class HashTask(QtCore.QRunnable):
+    """Perceptual hashes for a chunk of frames the thumbnail loader has not reached yet.
+
+    Hashes come from the disk cache, else from the cached thumbnail, else from one decode
+    (whose thumbnail is cached too, so the grid never decodes that file again).
+    """
+
+    def __init__(self, hasher, generation, paths):
+        super().__init__()
+        self.hasher = hasher
+        self.generation = generation
+        self.paths = paths
+
+    def run(self):
+        with TRACER.span("hash_chunk", frames=len(self.paths)):
+            self.hash_chunk()
+
+    def hash_chunk(self):
+        cache = self.hasher.disk_cache
+        hashes = []
+        new_hashes = []
+        new_entries = []
+        for path in self.paths:
+            if self.hasher.generation != self.generation:
+                return  # Cancelled
+            signature = file_signature(path)
+            if signature is None:
+                continue
+            found = stored_hashes(cache, path, signature)
+            if found is None:
+                data = cache.get(path, THUMB_MAX, *signature) if cache is not None else None
+                image = QtGui.QImage.fromData(data) if data is not None else QtGui.QImage()
+                fresh = image.isNull()
+                if fresh:
+                    with TRACER.span("read_image", path=path):
+                        image = read_image(path, THUMB_MAX, THUMB_MAX)
+                    if image.isNull():
+                        continue
+                pyramid = build_pyramid(image)
+                if fresh and cache is not None:
+                    new_entries.append((path, THUMB_MAX, *signature, encode_thumbnail(pyramid[-1])))
+                with TRACER.span("frame_hash"):
+                    found = frame_hashes(pyramid)
+                new_hashes.append((path, *signature, pack_hashes(found)))
+            hashes.append((path, found))
+        self.hasher.chunk_hashed.emit(self.generation, [len(self.paths), hashes, new_hashes, new_entries])
+
+
+class MetadataTask(QtCore.QRunnable):
+    """Stat, header and EXIF of a chunk of files (no pixels decoded); unchanged files come from the disk cache"""
+
+    def __init__(self, indexer, generation, paths):
+        super().__init__()
+        self.indexer = indexer
+        self.generation = generation
+        self.paths = paths
+
+    def run(self):
+        with TRACER.span("metadata_chunk", files=len(self.paths)):
+            self.index_chunk()
+
+    def index_chunk(self):
+        cache = self.indexer.disk_cache
+        stored = {}
+        if cache is not None:
+            try:
+                stored = cache.get_metadata_many(self.paths)
+            except sqlite3.Error:
+                pass
+        entries = []
+        new_rows = []
+        for path in self.paths:
+            if self.indexer.generation != self.generation:
+                return  # Cancelled
+            signature = file_signature(path)
+            if signature is None:
+                continue
+            row = stored.get(path)
+            if row is not None and tuple(row[:2]) == signature:
+                metadata = FrameMetadata(*row)
+            else:
+                width, height, image_format = image_header(path)
+                metadata = FrameMetadata(*signature, width, height, image_format, capture_time(path))
+                new_rows.append((path, *metadata))
+            entries.append((path, metadata))
+        self.indexer.chunk_indexed.emit(self.generation, [len(self.paths), entries, new_rows])
+
+
+class MetadataIndexer(QtCore.QObject):
+    """Builds the metadata index on all cores; files already being indexed are not queued again"""
+    progress = QtCore.pyqtSignal(int, int)  # files indexed, total
+    indexed = QtCore.pyqtSignal(list)  # [(path, FrameMetadata), ...]
+    idle = QtCore.pyqtSignal()  # Every queued file is indexed
+    chunk_indexed = QtCore.pyqtSignal(int, list)  # Internal: emitted from worker threads
+
+    CHUNK_SIZE = 256  # Also bounds the parameters of one cache query
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.disk_cache = None  # Optional ThumbnailDiskCache
+        self.pool = QtCore.QThreadPool(self)
+        self.pool.setMaxThreadCount(max(1, QtCore.QThread.idealThreadCount()))
+        self.generation = 0
+        self.queued = set()
+        self.pending_chunks = 0
+        self.done = 0
+        self.chunk_indexed.connect(self.on_chunk_indexed)
+
+    def is_running(self):
+        return self.pending_chunks > 0
+
+    def index(self, paths):
+        new = [path for path in paths if path not in self.queued]
+        self.queued.update(new)
+        for i in range(0, len(new), self.CHUNK_SIZE):
+            self.pending_chunks += 1
+            self.pool.start(MetadataTask(self, self.generation, new[i:i + self.CHUNK_SIZE]))
+        if not self.pending_chunks:
+            self.idle.emit()
+
+    def on_chunk_indexed(self, generation, batch):
+        count, entries, new_rows = batch
+        if self.disk_cache is not None:
+            try:
+                self.disk_cache.put_metadata_many(new_rows)
+            except sqlite3.Error:
+                pass
+        if generation != self.generation:
+            return
+        self.indexed.emit(entries)
+        self.pending_chunks -= 1
+        self.done += count
+        self.progress.emit(self.done, len(self.queued))
+        if not self.pending_chunks:
+            self.queued.clear()
+            self.done = 0
+            self.idle.emit()
+
+    def cancel(self):
+        self.generation += 1
+        self.pool.clear()
+        self.queued.clear()
+        self.pending_chunks = 0
+        self.done = 0
+
+    def shutdown(self):
+        self.cancel()
+        self.pool.waitForDone()
+
+
+class FrameJobTask(QtCore.QRunnable):
+    """Run one computation over frame hashes (grouping, ordering) on a worker thread"""
+
+    def __init__(self, hasher, name, ticket, function, args):
+        super().__init__()
+        self.hasher = hasher
+        self.name = name
+        self.ticket = ticket
+        self.function = function
+        self.args = args
+
+    def run(self):
+        with TRACER.span(self.name, frames=len(self.args[0])):
+            result = self.function(*self.args)
+        self.hasher.job_finished.emit(self.name, self.ticket, result)
+
+
+class FrameHasher(QtCore.QObject):
+    """Hashes frames on all cores and runs computations over the hashes off the GUI thread.
+
+    Hash requests made while others run are merged: frames already queued are not queued
+    again, and every caller hears back once all the frames it asked for are in.
+    """
+    progress = QtCore.pyqtSignal(int, int)  # frames hashed, total
+    hashes_ready = QtCore.pyqtSignal(list)  # [(path, (phash, dhash, ahash)), ...]
+    chunk_hashed = QtCore.pyqtSignal(int, list)  # Internal: emitted from worker threads
+    job_finished = QtCore.pyqtSignal(str, int, object)  # Internal: emitted from worker threads
+
+    CHUNK_SIZE = 16
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.disk_cache = None  # Optional ThumbnailDiskCache
+        self.pool = QtCore.QThreadPool(self)
+        self.pool.setMaxThreadCount(max(1, QtCore.QThread.idealThreadCount()))
+        self.generation = 0
+        self.queued = set()  # Paths of the current hashing run
+        self.pending_chunks = 0
+        self.done = 0
+        self.waiters = []  # Callbacks of the current hashing run
+        self.job_tickets = {}  # job name -> newest ticket
+        self.job_callbacks = {}  # job name -> callback of the newest request
+        self.next_ticket = 0
+        self.chunk_hashed.connect(self.on_chunk_hashed)
+        self.job_finished.connect(self.on_job_finished)
+
+    def is_hashing(self):
+        return bool(self.waiters)
+
+    def hash_paths(self, paths, on_hashed):
+        """Hash paths; hashes_ready streams the results and on_hashed() runs once all are in"""
+        self.waiters.append(on_hashed)
+        new = [path for path in paths if path not in self.queued]
+        self.queued.update(new)
+        chunks = [new[i:i + self.CHUNK_SIZE] for i in range(0, len(new), self.CHUNK_SIZE)]
+        self.pending_chunks += len(chunks)
+        for chunk in chunks:
+            self.pool.start(HashTask(self, self.generation, chunk))
+        if not self.pending_chunks:
+            self.finish_hashing()
+
+    def on_chunk_hashed(self, generation, batch):
+        count, hashes, new_hashes, new_entries = batch
+        if self.disk_cache is not None:
+            try:
+                self.disk_cache.put_many(new_entries)
+                self.disk_cache.put_hashes_many(new_hashes)
+            except sqlite3.Error:
+                pass
+        if generation != self.generation:
+            return
+        self.hashes_ready.emit(hashes)
+        self.pending_chunks -= 1
+        self.done += count
+        self.progress.emit(self.done, len(self.queued))
+        if self.pending_chunks == 0:
+            self.finish_hashing()
+
+    def finish_hashing(self):
+        waiters, self.waiters = self.waiters, []
+        self.queued.clear()
+        self.done = 0
+        for on_hashed in waiters:
+            on_hashed()
+
+    def run_job(self, name, function, args, on_done):
+        """function(*args) on a worker; on_done(result) runs for the newest request of each name only"""
+        self.next_ticket += 1
+        self.job_tickets[name] = self.next_ticket
+        self.job_callbacks[name] = on_done
+        self.pool.start(FrameJobTask(self, name, self.next_ticket, function, args), 1)
+
+    def on_job_finished(self, name, ticket, result):
+        if self.job_tickets.get(name) != ticket:
+            return
+        on_done = self.job_callbacks.pop(name, None)
+        if on_done is not None:
+            on_done(result)
+
+    def cancel(self):
+        """Drop queued hashing and forget every pending callback (a new folder was opened)"""
+        self.generation += 1
+        self.pool.clear()
+        self.queued.clear()
+        self.pending_chunks = 0
+        self.done = 0
+        self.waiters = []
+        self.job_tickets.clear()
+        self.job_callbacks.clear()
+
+    def shutdown(self):
+        self.cancel()
+        self.pool.waitForDone()
+
+
+class PreviewTask(QtCore.QRunnable):
+    """Decode one preview at label size on a worker thread"""
+
+    def __init__(self, loader, key, signature):
+        super().__init__()
+        self.loader = loader
+        self.key = key  # (path, width, height)
+        self.signature = signature
+        self.started = False
+        self.cancelled = False
+
+    def run(self):
+        with self.loader.lock:
+            if self.cancelled:
+                return  # Superseded before a worker picked it up
+            self.started = True
+        path, width, height = self.key
+        with TRACER.span("preview_decode", path=path):
+            image = read_image(path, width, height)
+            if not image.isNull():
+                image = image.scaled(width, height, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        self.loader.decoded.emit(self.key, self.signature, image)
+
+
+class PreviewLoader(QtCore.QObject):
+    """Decodes previews off the GUI thread into a small LRU.
+
+    Only the latest request is ever rendered: a new request takes every stale job that has
+    not started yet off the queue, and neighbours are prefetched in the direction of travel.
+    """
+    preview_ready = QtCore.pyqtSignal(str, QtGui.QImage)
+    decoded = QtCore.pyqtSignal(tuple, object, QtGui.QImage)  # Internal: emitted from worker threads
+
+    CACHE_SIZE = 32
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pool = QtCore.QThreadPool(self)
+        self.pool.setMaxThreadCount(max(2, min(4, QtCore.QThread.idealThreadCount())))
+        self.cache = OrderedDict()  # (path, w, h) -> (signature, QImage)
+        self.pending = {}  # key -> PreviewTask (queued or running)
+        self.current = None  # Key the preview label is waiting for
+        self.lock = threading.Lock()  # Guards PreviewTask.started / cancelled
+        self.decoded.connect(self.on_decoded)
+
+    def request(self, path, size, prefetch_paths=()):
+        """Show path at size; prefetch_paths are decoded afterwards, nearest first"""
+        key = (path, size.width(), size.height())
+        prefetch_keys = [(p, size.width(), size.height()) for p in prefetch_paths]
+        wanted = set(prefetch_keys)
+        wanted.add(key)
+        # Cancel stale requests that haven't started (rapid key repeats)
+        with self.lock:
+            for stale_key, task in list(self.pending.items()):
+                if stale_key not in wanted and not task.started:
+                    task.cancelled = True
+                    del self.pending[stale_key]
+        self.current = key
+        image = self.lookup(key)
+        if image is not None:
+            self.current = None
+            self.preview_ready.emit(path, image)
+        else:
+            self.submit(key, priority=len(prefetch_keys) + 1)
+        for i, prefetch_key in enumerate(prefetch_keys):
+            if self.lookup(prefetch_key) is None:
+                self.submit(prefetch_key, priority=len(prefetch_keys) - i)
+
+    def lookup(self, key):
+        entry = self.cache.get(key)
+        if entry is None or entry[0] != file_signature(key[0]):
+            return None  # Missing, or the file changed since it was decoded
+        self.cache.move_to_end(key)
+        return entry[1]
+
+    def submit(self, key, priority):
+        if key in self.pending:
+            return
+        task = PreviewTask(self, key, file_signature(key[0]))
+        self.pending[key] = task
+        self.pool.start(task, priority)
+
+    def on_decoded(self, key, signature, image):
+        self.pending.pop(key, None)
+        if not image.isNull():
+            self.cache[key] = (signature, image)
+            self.cache.move_to_end(key)
+            while len(self.cache) > self.CACHE_SIZE:
+                self.cache.popitem(last=False)
+        if key == self.current:
+            self.current = None
+            self.preview_ready.emit(key[0], image)
+
+    def clear(self):
+        """Forget cached previews (file names now point at different images)"""
+        self.cache.clear()
+
+    def shutdown(self):
+        with self.lock:
+            for task in self.pending.values():
+                task.cancelled = True
+        self.pool.waitForDone()
+
+
+class TileTask(QtCore.QRunnable):
+    """Decode one preview tile (a rectangle of the image at 1 / step scale) on a worker thread"""
+
+    def __init__(self, loader, source, key, rect):
+        super().__init__()
+        self.loader = loader
+        self.source = source
+        self.key = key  # (path, step, column, row)
+        self.rect = rect  # (x, y, width, height) in full-resolution pixels
+
+    def run(self):
+        self.loader.mark_running(self.key)
+        with TRACER.span("tile_decode", step=self.key[1]):
+            image = self.source.read(*self.rect, self.key[1])
+        self.loader.decoded.emit(self.key, image)
+
+
+class TileLoader(QtCore.QObject):
+    """Decodes preview tiles off the GUI thread into a byte-budgeted LRU.
+
+    A new request drops the queued tiles of the previous one; tiles already decoding still land
+    in the cache (they are valid, just no longer the most urgent) and are not queued again.
+    """
+    tile_ready = QtCore.pyqtSignal(tuple)
+    decoded = QtCore.pyqtSignal(tuple, QtGui.QImage)  # Internal: emitted from worker threads
+
+    def __init__(self, budget_bytes, parent=None):
+        super().__init__(parent)
+        self.pool = QtCore.QThreadPool(self)
+        self.pool.setMaxThreadCount(max(2, min(4, QtCore.QThread.idealThreadCount())))
+        self.budget = budget_bytes
+        self.used = 0
+        self.cache = OrderedDict()  # key -> QImage
+        self.in_flight = set()  # Queued or decoding
+        self.running = set()  # Decoding now (added by the worker thread)
+        self.running_lock = threading.Lock()
+        self.decoded.connect(self.on_decoded)
+
+    def get(self, key):
+        image = self.cache.get(key)
+        if image is not None:
+            self.cache.move_to_end(key)
+        return image
+
+    def mark_running(self, key):
+        with self.running_lock:
+            self.running.add(key)
+
+    def drop_queued(self):
+        """Forget the queued tiles; running ones stay in flight until on_decoded"""
+        self.pool.clear()
+        with self.running_lock:
+            self.in_flight &= self.running
+
+    def request(self, source, tiles):
+        """tiles: [(key, rect), ...] most urgent first; cached ones and ones in flight are skipped"""
+        self.drop_queued()
+        for key, rect in tiles:
+            if key not in self.cache and key not in self.in_flight:
+                self.in_flight.add(key)
+                self.pool.start(TileTask(self, source, key, rect))
+
+    def on_decoded(self, key, image):
+        with self.running_lock:
+            self.running.discard(key)
+        self.in_flight.discard(key)
+        if image.isNull() or key in self.cache:
+            return
+        self.cache[key] = image
+        self.used += image_bytes(image)
+        while self.used > self.budget and len(self.cache) > 1:
+            old_key, old = self.cache.popitem(last=False)
+            self.used -= image_bytes(old)
+        self.tile_ready.emit(key)
+
+    def clear(self):
+        self.drop_queued()
+        self.cache.clear()
+        self.used = 0
+
+    def shutdown(self):
+        self.pool.clear()
+        self.pool.waitForDone()
+
+
+class ZoomPreview(QtWidgets.QLabel):
+    """The preview label, zoomable: wheel zooms at the cursor, drag pans, double-click fits again.
+
+    At fit size it shows the pixmap it was given. Zoomed in, it draws tiles decoded at the
+    nearest power-of-two scale, only those on screen, coarse levels first; until a tile arrives
+    the best coarser one (or the fitted pixmap) is stretched in its place.
+    """
+    TILE_EDGE = 256  # Tile size in decoded pixels
+    MAX_ZOOM = 4.0  # Screen pixels per image pixel
+    TILE_MEMORY_MB = 192
+    WHOLE_LEVEL_BYTES = 256 * 1024 * 1024  # Largest single-tile level of a format that can't read regions
+
+    def __init__(self, text="", parent=None):
+        super().__init__(text, parent)
+        self.path = None
+        self.source = None  # RegionSource, opened on the first zoom
+        self.scale = None  # Screen pixels per image pixel; None = fit
+        self.center = QtCore.QPointF()  # Image point at the middle of the view
+        self.drag_origin = None
+        self.tile_loader = TileLoader(self.TILE_MEMORY_MB * 1024 * 1024, self)
+        self.tile_loader.tile_ready.connect(self.on_tile_ready)
+        self.setToolTip("Mouse wheel: zoom | Drag: pan | Double-click: fit")
+
+    def set_path(self, path):
+        """The pixmap now shows path; a different image starts at fit size again"""
+        if path == self.path:
+            return
+        self.path = path
+        self.source = None
+        self.scale = None
+        self.unsetCursor()
+        self.update()
+
+    def fit_scale(self):
+        return min(self.width() / self.source.width, self.height() / self.source.height)
+
+    def level_step(self):
+        """Decoded pixels are 1 / step of the image; step is a power of two at or below the zoom"""
+        step = 1
+        while step * 2 * self.scale <= 1:
+            step *= 2
+        if self.source.whole:
+            while self.source.width * self.source.height * 4 / (step * step) > self.WHOLE_LEVEL_BYTES:
+                step *= 2
+        return step
+
+    def tiles(self, step):
+        """[(key, rect), ...] of the tiles of a level that are on screen, nearest to the centre first"""
+        if self.source.whole:
+            return [((self.path, step, 0, 0), (0, 0, self.source.width, self.source.height))]
+        edge = self.TILE_EDGE * step
+        half_width, half_height = self.width() / 2 / self.scale, self.height() / 2 / self.scale
+        left = max(0, int((self.center.x() - half_width) // edge))
+        top = max(0, int((self.center.y() - half_height) // edge))
+        right = min((self.source.width - 1) // edge, int((self.center.x() + half_width) // edge))
+        bottom = min((self.source.height - 1) // edge, int((self.center.y() + half_height) // edge))
+        cells = [(column, row) for row in range(top, bottom + 1) for column in range(left, right + 1)]
+        cells.sort(key=lambda cell: abs((cell[0] + 0.5) * edge - self.center.x()) + abs((cell[1] + 0.5) * edge - self.center.y()))
+        return [((self.path, step, column, row), (column * edge, row * edge, edge, edge)) for column, row in cells]
+
+    def request_tiles(self):
+        """The level below the zoom, preceded by the next coarser one so something sharp arrives first"""
+        step = self.level_step()
+        coarse = self.tiles(step * 2) if step * 2 * self.TILE_EDGE < max(self.source.width, self.source.height) else []
+        self.tile_loader.request(self.source, coarse + self.tiles(step))
+
+    def on_tile_ready(self, key):
+        if self.scale is not None and key[0] == self.path:
+            self.update()
+
+    def to_view(self, x, y):
+        return QtCore.QPointF((x - self.center.x()) * self.scale + self.width() / 2,
+                              (y - self.center.y()) * self.scale + self.height() / 2)
+
+    def to_image(self, point):
+        return QtCore.QPointF((point.x() - self.width() / 2) / self.scale + self.center.x(),
+                              (point.y() - self.height() / 2) / self.scale + self.center.y())
+
+    def clamp_center(self):
+        x = min(max(self.center.x(), 0), self.source.width)
+        y = min(max(self.center.y(), 0), self.source.height)
+        self.center = QtCore.QPointF(x, y)
+
+    def wheelEvent(self, event):
+        if not self.path or self.pixmap() is None or self.pixmap().isNull():
+            return super().wheelEvent(event)
+        if self.source is None:
+            self.source = RegionSource(self.path)
+            self.tile_loader.clear()  # Tiles of the previous image
+        if not self.source.width or not self.source.height:
+            return
+        fit = self.fit_scale()
+        anchor = event.pos()
+        if self.scale is None:
+            self.scale = fit
+            self.center = QtCore.QPointF(self.source.width / 2, self.source.height / 2)
+        under_cursor = self.to_image(anchor)
+        scale = min(self.MAX_ZOOM, max(fit, self.scale * 1.25 ** (event.angleDelta().y() / 120)))
+        if scale <= fit * 1.001:
+            self.scale = None
+            self.unsetCursor()
+        else:
+            self.scale = scale
+            # Keep the image point under the cursor in place
+            self.center = QtCore.QPointF(under_cursor.x() - (anchor.x() - self.width() / 2) / scale,
+                                         under_cursor.y() - (anchor.y() - self.height() / 2) / scale)
+            self.clamp_center()
+            self.setCursor(Qt.OpenHandCursor)
+            self.request_tiles()
+        self.update()
+        event.accept()
+
+    def mousePressEvent(self, event):
+        if self.scale is not None and event.button() == Qt.LeftButton:
+            self.drag_origin = event.pos()
+            self.setCursor(Qt.ClosedHandCursor)
+        super().mousePressEvent(event)
+
+    def mouseMoveEvent(self, event):
+        if self.scale is not None and self.drag_origin is not None:
+            delta = event.pos() - self.drag_origin
+            self.drag_origin = event.pos()
+            self.center -= QtCore.QPointF(delta.x() / self.scale, delta.y() / self.scale)
+            self.clamp_center()
+            self.request_tiles()
+            self.update()
+        super().mouseMoveEvent(event)
+
+    def mouseReleaseEvent(self, event):
+        if self.drag_origin is not None:
+            self.drag_origin = None
+            self.setCursor(Qt.OpenHandCursor)
+        super().mouseReleaseEvent(event)
+
+    def mouseDoubleClickEvent(self, event):
+        if self.scale is not None:
+            self.scale = None
+            self.unsetCursor()
+            self.update()
+        super().mouseDoubleClickEvent(event)
+
+    def paintEvent(self, event):
+        if self.scale is None:
+            return super().paintEvent(event)
+        painter = QtGui.QPainter(self)
+        painter.fillRect(self.rect(), QtGui.QColor("#1c1c1e"))
+        painter.setRenderHint(QtGui.QPainter.SmoothPixmapTransform)
+        width, height = self.source.width, self.source.height
+        # Fitted pixmap stretched first, then every cached level from coarse to fine on top
+        painter.drawPixmap(QtCore.QRectF(self.to_view(0, 0), self.to_view(width, height)), self.pixmap(),
+                           QtCore.QRectF(self.pixmap().rect()))
+        step = self.level_step()
+        coarsest = step
+        while self.TILE_EDGE * coarsest < max(width, height) and not self.source.whole:
+            coarsest *= 2
+        level = coarsest if not self.source.whole else step * 4
+        while level >= step:
+            for key, (x, y, w, h) in self.tiles(level):
+                image = self.tile_loader.get(key)
+                if image is not None:
+                    w, h = min(w, width - x), min(h, height - y)
+                    painter.drawImage(QtCore.QRectF(self.to_view(x, y), self.to_view(x + w, y + h)), image)
+            level //= 2
+        painter.setPen(QtGui.QColor("#e0e0e0"))
+        painter.drawText(self.rect().adjusted(8, 6, -8, -6), Qt.AlignTop | Qt.AlignRight, f"{self.scale * 100:.0f}%")
+        painter.end()
+
+
+class FlipbookTask(QtCore.QRunnable):
+    """Decode one flipbook frame at preview size on a worker thread"""
+
+    def __init__(self, player, generation, index, path, size):
+        super().__init__()
+        self.player = player
+        self.generation = generation
+        self.index = index
+        self.path = path
+        self.size = size
+
+    def run(self):
+        if self.generation != self.player.generation:
+            return  # Playback stopped or restarted before a worker picked it up
+        width, height = self.size
+        with TRACER.span("flipbook_decode", path=self.path):
+            image = read_image(self.path, width, height)
+            if not image.isNull():
+                image = image.scaled(width, height, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        self.player.decoded.emit(self.generation, self.index, image)
+
+
+class FlipbookPlayer(QtCore.QObject):
+    """Plays a range of frames in the preview at a target fps.
+
+    Workers keep a ring buffer full with the frames of the next steps (decoded at preview size,
+    nothing else is kept). The frame due by the clock is shown if it is ready; otherwise the last
+    one stays up and the step counts as dropped.
+    """
+    frame_ready = QtCore.pyqtSignal(str, QtGui.QImage)  # path, frame
+    stats_changed = QtCore.pyqtSignal(dict)
+    stopped = QtCore.pyqtSignal(str)  # Path of the frame left on screen
+    decoded = QtCore.pyqtSignal(int, int, QtGui.QImage)  # Internal: emitted from worker threads
+
+    STATS_INTERVAL = 0.25  # Seconds between stats_changed
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pool = QtCore.QThreadPool(self)
+        self.pool.setMaxThreadCount(max(2, QtCore.QThread.idealThreadCount()))
+        self.generation = 0
+        self.paths = []
+        self.mode = PLAYBACK_MODES[0]
+        self.size = (0, 0)
+        self.buffer = {}  # Frame index -> QImage, only frames of the steps ahead
+        self.in_flight = set()
+        self.capacity = 2
+        self.preroll = 1  # Frames buffered before the clock starts
+        self.clock = PlaybackClock(DEFAULT_FPS)
+        self.frame = -1  # Frame on screen
+        self.stats_time = 0.0
+        self.decoded.connect(self.on_decoded)
+        self.timer = QTimer(self)
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.timeout.connect(self.tick)
+
+    def is_playing(self):
+        return self.timer.isActive()
+
+    def play(self, paths, start, fps, mode, size):
+        """Play paths from frame start, each frame decoded to fit size"""
+        self.stop()
+        self.paths = paths
+        self.mode = mode
+        self.size = (size.width(), size.height())
+        self.frame = -1
+        self.clock = PlaybackClock(fps, start)
+        self.capacity = buffer_frames(fps, self.size[0] * self.size[1] * 4)
+        self.preroll = max(1, min(self.capacity // 2, len(self.upcoming(start))))
+        self.timer.start(max(1, int(500 / fps)))  # Twice per frame: a due frame is at most half a frame late
+        self.fill()
+
+    def set_fps(self, fps):
+        if not self.is_playing():
+            return
+        self.capacity = buffer_frames(fps, self.size[0] * self.size[1] * 4)
+        self.clock.restart(fps, self.clock.last_step + 1)
+        self.timer.setInterval(max(1, int(500 / fps)))
+        self.fill()
+
+    def set_mode(self, mode):
+        if mode != self.mode and self.is_playing() and self.frame >= 0:
+            self.clock.restart(self.clock.fps, self.frame + 1)  # Carry on from the frame on screen
+        self.mode = mode
+        if self.is_playing():
+            self.fill()
+
+    def upcoming(self, step):
+        """Frames of the next capacity steps from step, in play order without repeats"""
+        frames = []
+        seen = set()
+        for s in range(step, step + self.capacity):
+            frame = frame_at(s, len(self.paths), self.mode)
+            if frame is None:
+                break
+            if frame not in seen:
+                seen.add(frame)
+                frames.append(frame)
+        return frames
+
+    def fill(self):
+        """Drop frames behind the playhead, queue the missing ones ahead (nearest first)"""
+        wanted = self.upcoming(max(self.clock.due(), self.clock.last_step + 1))
+        keep = set(wanted)
+        for frame in [frame for frame in self.buffer if frame not in keep]:
+            del self.buffer[frame]
+        slots = self.pool.maxThreadCount() * 2 - len(self.in_flight)
+        for frame in wanted:
+            if slots <= 0:
+                break
+            if frame in self.buffer or frame in self.in_flight:
+                continue
+            self.in_flight.add(frame)
+            self.pool.start(FlipbookTask(self, self.generation, frame, self.paths[frame], self.size))
+            slots -= 1
+
+    def on_decoded(self, generation, index, image):
+        if generation != self.generation:
+            return
+        self.in_flight.discard(index)
+        self.buffer[index] = image  # Null for unreadable files: the step passes without a new frame
+        self.fill()
+
+    def tick(self):
+        if self.clock.shown == 0 and len(self.buffer) < self.preroll:
+            self.clock.restart(self.clock.fps, self.clock.last_step + 1)  # Pre-roll: hold the first step
+            return
+        due = self.clock.due()
+        frame = frame_at(due, len(self.paths), self.mode)
+        if frame is None:
+            self.stop()  # End of a "Once" run
+            return
+        if due > self.clock.last_step and frame in self.buffer:
+            image = self.buffer[frame]
+            self.clock.show(due)
+            self.frame = frame
+            if not image.isNull():
+                self.frame_ready.emit(self.paths[frame], image)
+            self.fill()
+        now = time.perf_counter()
+        if now - self.stats_time >= self.STATS_INTERVAL:
+            self.stats_time = now
+            self.stats_changed.emit(self.stats())
+
+    def stats(self):
+        return {"frame": self.frame, "frames": len(self.paths), "fps": self.clock.measured_fps(),
+                "target_fps": self.clock.fps, "shown": self.clock.shown, "dropped": self.clock.dropped,
+                "buffered": len(self.buffer), "capacity": self.capacity}
+
+    def stop(self):
+        was_playing = self.is_playing()
+        if was_playing:
+            self.stats_changed.emit(self.stats())
+        self.timer.stop()
+        self.generation += 1
+        self.pool.clear()
+        self.buffer.clear()
+        self.in_flight.clear()
+        if was_playing:
+            self.stopped.emit(self.paths[self.frame] if 0 <= self.frame < len(self.paths) else "")
+
+    def shutdown(self):
+        self.stop()
+        self.pool.waitForDone()
+
+
+class RenameTask(QtCore.QRunnable):
+    """Run one journaled rename batch (or the undo of an interrupted one) on a worker thread"""
+
+    def __init__(self, renamer, plan, done=(), failed=(), undo=False):
+        super().__init__()
+        self.renamer = renamer
+        self.plan = plan
+        self.done = done
+        self.failed = failed
+        self.undo = undo
+
+    def run(self):
+        with TRACER.span("rename_batch", steps=len(self.plan.steps), undo=self.undo):
+            self.run_batch()
+
+    def run_batch(self):
+        renamer = self.renamer
+        last = [-1]
+
+        def progress(done, total):
+            percent = int(done / total * 100) if total else 100
+            if percent != last[0]:  # At most ~100 queued signals per batch
+                last[0] = percent
+                renamer.step_done.emit(done, total)
+
+        if self.undo:
+            locations = undo_steps(self.plan, self.done, journal=renamer.journal, progress=progress)
+            renamer.task_finished.emit(self.plan, locations, [], True)
+            return
+        locations, failures, cancelled = execute_plan(
+            self.plan, progress, journal=renamer.journal, cancelled=renamer.cancel_event.is_set,
+            done=self.done, failed=self.failed)
+        renamer.task_finished.emit(self.plan, locations, failures, cancelled)
+
+
+class SearchTask(QtCore.QRunnable):
+    """Match one regex / glob / fuzzy query against a snapshot of all names on a worker thread"""
+
+    def __init__(self, runner, search_bar, ticket, query, mode, version, names):
+        super().__init__()
+        self.runner = runner
+        self.search_bar = search_bar
+        self.ticket = ticket
+        self.query = query
+        self.mode = mode
+        self.version = version
+        self.names = names  # The index replaces (never mutates) this list, so it is safe to read here
+
+    def run(self):
+        if self.runner.tickets.get(self.search_bar) != self.ticket:
+            return  # Superseded while queued (the user kept typing)
+        try:
+            rows, error = match_names(self.names, self.query, self.mode), ""
+        except ValueError as e:
+            rows, error = [], str(e)
+        self.runner.matches_ready.emit(self.search_bar, self.query, self.mode, self.version, rows, error)
+
+
+class SearchRunner(QtCore.QObject):
+    """Runs pattern searches one at a time off the GUI thread; only the newest query per bar runs"""
+    matches_ready = QtCore.pyqtSignal(int, str, str, int, list, str)  # bar, query, mode, version, rows, error
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pool = QtCore.QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+        self.tickets = {}  # search bar -> newest ticket
+        self.next_ticket = 0
+
+    def submit(self, search_bar, query, mode, version, names):
+        self.next_ticket += 1
+        self.tickets[search_bar] = self.next_ticket
+        self.pool.start(SearchTask(self, search_bar, self.next_ticket, query, mode, version, names))
+
+    def shutdown(self):
+        self.tickets.clear()
+        self.pool.waitForDone()
+
+
+class BatchRenamer(QtCore.QObject):
+    """Executes rename plans one at a time off the GUI thread, journaled for crash recovery.
+
+    Cancelling undoes the steps already taken, so a batch is either applied or not at all.
+    """
+    step_done = QtCore.pyqtSignal(int, int)  # done, total (emitted from the worker thread)
+    task_finished = QtCore.pyqtSignal(object, dict, list, bool)  # Internal: plan, locations, failures, cancelled
+
+    def __init__(self, journal_path, parent=None):
+        super().__init__(parent)
+        self.journal = RenameJournal(journal_path)
+        self.pool = QtCore.QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+        self.cancel_event = threading.Event()
+        self.on_done = None
+        self.task_finished.connect(self.on_task_finished)
+
+    def is_running(self):
+        return self.on_done is not None
+
+    def start(self, plan, on_done):
+        """Journal the plan, then run it; on_done(plan, locations, failures, cancelled) on the GUI thread.
+
+        Raises OSError if the journal can't be written (nothing has been renamed then).
+        """
+        self.journal.begin(plan)
+        self.submit(RenameTask(self, plan), on_done)
+
+    def recover(self, plan, done, failed, roll_forward, on_done):
+        """Finish (roll_forward) or undo a batch loaded from the journal of an interrupted run"""
+        self.journal.resume()
+        self.submit(RenameTask(self, plan, done, failed, undo=not roll_forward), on_done)
+
+    def submit(self, task, on_done):
+        self.cancel_event.clear()
+        self.on_done = on_done
+        self.pool.start(task)
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def on_task_finished(self, plan, locations, failures, cancelled):
+        on_done, self.on_done = self.on_done, None
+        if on_done is not None:
+            on_done(plan, locations, failures, cancelled)
+
+    def shutdown(self):
+        """Undo a running batch and wait for it (the folder is never left half-renamed)"""
+        self.cancel()
+        self.pool.waitForDone()
+
+
+class WorkspaceTask(QtCore.QRunnable):
+    """Scan workspace folders (or recount changed shards) on a worker thread"""
+
+    def __init__(self, scanner, generation, signal, function, *args):
+        super().__init__()
+        self.scanner = scanner
+        self.generation = generation
+        self.signal = signal
+        self.function = function
+        self.args = args
+
+    def run(self):
+        with TRACER.span(self.function.__name__, background=True):
+            result = self.function(*self.args)
+        self.signal.emit(self.generation, result)
+
+
+class ShardScanner(QtCore.QObject):
+    """Finds the shards of a workspace and keeps their image counts current while they change on disk"""
+    shards_ready = QtCore.pyqtSignal(list)  # [Shard, ...] in natural path order
+    counts_changed = QtCore.pyqtSignal(dict)  # {folder: image count} of shards that changed on disk
+    scanned = QtCore.pyqtSignal(int, object)  # Internal: emitted from the worker thread
+    counted = QtCore.pyqtSignal(int, object)  # Internal: emitted from the worker thread
+
+    DEBOUNCE_MS = 500
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pool = QtCore.QThreadPool(self)
+        self.pool.setMaxThreadCount(1)  # scan_workspace lists the folders on its own pool
+        self.generation = 0
+        self.changed_folders = set()
+        self.scanned.connect(self.on_scanned)
+        self.counted.connect(self.on_counted)
+        self.watcher = QtCore.QFileSystemWatcher(self)
+        self.watcher.directoryChanged.connect(self.on_directory_changed)
+        self.debounce_timer = QtCore.QTimer(self)
+        self.debounce_timer.setSingleShot(True)
+        self.debounce_timer.setInterval(self.DEBOUNCE_MS)
+        self.debounce_timer.timeout.connect(self.recount)
+
+    def scan(self, folders, recursive):
+        self.cancel()
+        generation = self.generation
+        self.pool.start(WorkspaceTask(self, generation, self.scanned, scan_workspace, folders, recursive,
+                                      SCAN_WORKERS, lambda: generation != self.generation))
+
+    def on_scanned(self, generation, shards):
+        if generation != self.generation:
+            return  # Another workspace was opened meanwhile
+        if shards:
+            self.watcher.addPaths([shard.folder for shard in shards])
+        self.shards_ready.emit(shards)
+
+    def on_directory_changed(self, folder):
+        self.changed_folders.add(folder)
+        self.debounce_timer.start()  # Restarts - a copy into a shard is recounted once
+
+    def recount(self):
+        folders, self.changed_folders = sorted(self.changed_folders), set()
+        if folders:
+            self.pool.start(WorkspaceTask(self, self.generation, self.counted, count_images, folders))
+
+    def on_counted(self, generation, counts):
+        if generation == self.generation:
+            self.counts_changed.emit(counts)
+
+    def cancel(self):
+        self.generation += 1
+        self.debounce_timer.stop()
+        self.changed_folders.clear()
+        if self.watcher.directories():
+            self.watcher.removePaths(self.watcher.directories())
+
+    def shutdown(self):
+        self.cancel()
+        self.pool.waitForDone()
+
+
+def remap_paths(table, renamed):
+    """Re-key table entries for a batch of renames {old path: new path}.
+
+    Every entry is taken out before any is put back, so names swapped by the batch (cycles)
+    keep each file's own entry instead of overwriting the one of a file not yet moved.
+    """
+    carried = {new: table.pop(old) for old, new in renamed.items() if old in table}
+    table.update(carried)
+
+
+def image_bytes(image):
+    return image.bytesPerLine() * image.height()
+
+
+class ThumbnailEntry:
+    """Decoded thumbnail data for one path: pyramid levels plus the display icon"""
+    __slots__ = ("pyramid", "icon", "icon_bytes", "edge", "refined", "nbytes")
+
+    def __init__(self, pyramid):
+        self.pyramid = pyramid
+        self.icon = None
+        self.icon_bytes = 0
+        self.edge = 0
+        self.refined = False
+        self.nbytes = sum(image_bytes(level) for level in pyramid)
+
+
+class ThumbnailMemoryCache:
+    """Byte-budgeted LRU of decoded thumbnails, ordered by when each row was last painted"""
+
+    def __init__(self, budget_bytes):
+        self.entries = OrderedDict()  # path -> ThumbnailEntry
+        self.budget = budget_bytes
+        self.used = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __contains__(self, path):
+        return path in self.entries
+
+    def peek(self, path):
+        """Entry without touching LRU order or counters (scheduler checks)"""
+        return self.entries.get(path)
+
+    def get(self, path):
+        """Entry for a row being viewed - counts a hit or miss and marks it most recent"""
+        entry = self.entries.get(path)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(path)
+        return entry
+
+    def put_pyramid(self, path, pyramid):
+        self.remove(path)
+        entry = ThumbnailEntry(pyramid)
+        self.entries[path] = entry
+        self.used += entry.nbytes
+
+    def set_icon(self, path, pixmap, edge, refined):
+        entry = self.entries[path]
+        entry.nbytes -= entry.icon_bytes
+        self.used -= entry.icon_bytes
+        entry.icon = QtGui.QIcon(pixmap)
+        entry.icon_bytes = pixmap.width() * pixmap.height() * pixmap.depth() // 8
+        entry.edge = edge
+        entry.refined = refined
+        entry.nbytes += entry.icon_bytes
+        self.used += entry.icon_bytes
+
+    def remove(self, path):
+        entry = self.entries.pop(path, None)
+        if entry is not None:
+            self.used -= entry.nbytes
+        return entry
+
+    def rename(self, renamed):
+        """Carry entries along a rename batch {old path: new path}"""
+        remap_paths(self.entries, renamed)
+
+    def evict(self, keep=()):
+        """Drop least recently viewed entries not in keep until within budget; returns the evicted entries"""
+        evicted = []
+        for path in list(self.entries):
+            if self.used <= self.budget or len(self.entries) <= 1:
+                break
+            if path in keep:
+                continue  # On screen right now - skip it, hidden entries after it still go
+            evicted.append(self.remove(path))
+            self.evictions += 1
+        return evicted
+
+    def has_room(self):
+        """Budget left for background work (keeps headroom for what comes into view)"""
+        return self.used < self.budget * 0.9
+
+    def clear(self):
+        self.entries.clear()
+        self.used = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "used_bytes": self.used,
+            "budget_bytes": self.budget,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+class ImageRecord:
+    """Compact per-file entry of the grid model"""
+    __slots__ = ("path", "name", "key")
+
+    def __init__(self, path):
+        self.set_path(path)
+
+    def set_path(self, path):
+        self.path = path
+        self.name = os.path.basename(path)
+        self.key = natural_key(self.name)
+
+
+class ImageListModel(QtCore.QAbstractListModel):
+    """Flat list of image records; thumbnails are decoded in viewport-priority order"""
+    progress = QtCore.pyqtSignal(int, int)  # thumbnails ready, total rows
+
+    PREFETCH_SCREENS = 2  # Rows prefetched above and below the viewport, in screens
+
+    def __init__(self, loader, memory_budget=DEFAULT_THUMB_MEMORY_MB * 1024 * 1024, parent=None):
+        super().__init__(parent)
+        self.records = []
+        self.name_index = NameIndex()  # Search over names, rebuilt lazily after changes
+        self.insertion_index = None  # Natural-order positions for new files, built lazily
+        self.highlighted = set()  # Rows matching the active search
+        self.loader = loader
+        self.loader.job_source = self.next_jobs
+        self.loader.thumbnails_ready.connect(self.apply_thumbnails)
+        self.loader.hashes_ready.connect(self.store_hashes)
+        self.loader.idle.connect(self.on_loader_idle)
+        self.thumbnail_size = DEFAULT_THUMB
+        # path -> pyramid (decoded once per file) + display icon, evicted least recently viewed first
+        self.thumbnail_cache = ThumbnailMemoryCache(memory_budget)
+        self.failed = set()  # Paths that could not be decoded
+        self.frame_hashes = {}  # path -> (phash, dhash, ahash), filled as thumbnails are decoded
+        self.metadata = {}  # path -> FrameMetadata, filled by the MetadataIndexer
+        self.ready_count = 0  # Rows whose refined thumbnail matches the current size
+        self.refine_suspended = False  # True while the size slider is being dragged
+        self.placeholder = None
+        # Scheduling: visible rows, then the prefetch margin, then a background sweep of the rest
+        self.visible_range = (0, -1)
+        self.priority_jobs = None  # Generator over visible + margin rows, rebuilt on reprioritize
+        self.sweep_row = 0  # Background sweep cursor ("everything else")
+        self.sweep_paths = set()  # In-flight paths issued by the sweep (never dropped)
+        self.pump_timer = QTimer(self)
+        self.pump_timer.setSingleShot(True)
+        self.pump_timer.timeout.connect(self.loader.pump)
+
+    # --- Qt model interface ---
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.records)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self.records):
+            return None
+        record = self.records[index.row()]
+        if role == Qt.DisplayRole:
+            return record.name
+        if role == Qt.UserRole:
+            return record.path
+        if role == Qt.DecorationRole:
+            return self.thumbnail_for(record.path)
+        if role == Qt.BackgroundRole and index.row() in self.highlighted:
+            return SEARCH_HIGHLIGHT_BACKGROUND
+        if role == Qt.ForegroundRole and index.row() in self.highlighted:
+            return SEARCH_HIGHLIGHT_TEXT
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.ItemIsDropEnabled
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsDragEnabled | Qt.ItemNeverHasChildren
+
+    # --- Thumbnails ---
+    def placeholder_icon(self):
+        """Flat tile shown until the real thumbnail arrives (QIcon scales it down to any size)"""
+        if self.placeholder is None:
+            pix = QtGui.QPixmap(THUMB_MAX, THUMB_MAX)
+            pix.fill(QtGui.QColor(44, 44, 46))
+            self.placeholder = QtGui.QIcon(pix)
+        return self.placeholder
+
+    def needs_thumbnail(self, path):
+        if path in self.failed or path in self.loader.busy_paths:
+            return False
+        entry = self.thumbnail_cache.peek(path)
+        if entry is None:
+            return True  # Never decoded, or evicted - fetched again (disk cache first)
+        if self.refine_suspended:
+            return False
+        return entry.edge != self.thumbnail_size or not entry.refined
+
+    def thumbnail_for(self, path):
+        entry = self.thumbnail_cache.get(path)
+        size = self.thumbnail_size
+        if entry is not None and entry.edge != size:
+            # Instant fast-scaled icon from the nearest larger level; refined in the background
+            image = pyramid_level(entry.pyramid, size).scaled(size, size, Qt.KeepAspectRatio,
+                                                              Qt.FastTransformation)
+            self.thumbnail_cache.set_icon(path, QtGui.QPixmap.fromImage(image), size, False)
+        if self.needs_thumbnail(path):
+            # A painted row is missing - rescan the priority tiers and keep the workers busy
+            self.priority_jobs = None
+            if not self.pump_timer.isActive():
+                self.pump_timer.start(0)
+        if entry is None:
+            return self.placeholder_icon()
+        return entry.icon
+
+    def iter_priority_rows(self):
+        first, last = self.visible_range
+        total = len(self.records)
+        yield from range(max(0, first), min(last + 1, total))
+        margin = (last - first + 1) * self.PREFETCH_SCREENS
+        for distance in range(1, margin + 1):
+            if last + distance < total:
+                yield last + distance
+            if first - distance >= 0:
+                yield first - distance
+
+    def next_jobs(self, count):
+        """Job source for the loader: next (path, pyramid) jobs, highest priority first"""
+        paths = []
+        if self.priority_jobs is None:
+            self.priority_jobs = self.iter_priority_rows()
+        for row in self.priority_jobs:
+            if row < len(self.records) and self.needs_thumbnail(self.records[row].path):
+                paths.append(self.records[row].path)
+                if len(paths) == count:
+                    break
+        # The background sweep stops once the memory budget is nearly used up
+        while self.sweep_row < len(self.records) and len(paths) < count and self.thumbnail_cache.has_room():
+            path = self.records[self.sweep_row].path
+            self.sweep_row += 1
+            if self.needs_thumbnail(path) and path not in paths:
+                paths.append(path)
+                self.sweep_paths.add(path)
+        jobs = []
+        for path in paths:
+            entry = self.thumbnail_cache.peek(path)
+            jobs.append((path, entry.pyramid if entry is not None else None))
+        return jobs
+
+    def set_viewport(self, first, last):
+        """Re-prioritize around the visible rows and drop jobs that scrolled far away"""
+        self.visible_range = (first, last)
+        self.priority_jobs = None
+        margin = (last - first + 1) * self.PREFETCH_SCREENS
+        low, high = max(0, first - margin), min(len(self.records) - 1, last + margin)
+        keep = {self.records[r].path for r in range(low, high + 1)}
+        self.loader.drop(keep | self.sweep_paths)
+        self.loader.pump()
+
+    def reset_thumbnail_jobs(self):
+        self.loader.cancel()
+        self.pump_timer.stop()
+        self.priority_jobs = None
+        self.sweep_row = 0
+        self.sweep_paths.clear()
+
+    def apply_thumbnails(self, results, size):
+        """Receive a batch of decoded thumbnails from the loader (GUI thread)"""
+        with TRACER.span("apply_thumbnails", images=len(results)):
+            cache = self.thumbnail_cache
+            for path, image, pyramid in results:
+                self.sweep_paths.discard(path)
+                if pyramid is not None:
+                    cache.put_pyramid(path, pyramid)  # Kept even if the size changed meanwhile
+                if image.isNull():
+                    if path not in self.failed:
+                        self.failed.add(path)
+                        self.ready_count += 1
+                    continue
+                entry = cache.peek(path)
+                if size != self.thumbnail_size or entry is None:
+                    continue  # Slider moved on (the pyramid serves the new size), or evicted meanwhile
+                if entry.edge != size or not entry.refined:
+                    self.ready_count += 1
+                cache.set_icon(path, QtGui.QPixmap.fromImage(image), size, True)
+            self.evict_thumbnails()
+            if self.records:
+                # One signal per batch; the view only repaints what is on screen
+                self.dataChanged.emit(self.index(0), self.index(len(self.records) - 1), [Qt.DecorationRole])
+            self.report_progress()
+
+    def store_hashes(self, hashes):
+        self.frame_hashes.update(hashes)
+
+    def store_metadata(self, entries):
+        self.metadata.update(entries)
+
+    def evict_thumbnails(self):
+        """Enforce the memory budget, never evicting rows that are on screen"""
+        first, last = self.visible_range
+        visible = {self.records[r].path for r in range(max(0, first), min(last + 1, len(self.records)))}
+        for entry in self.thumbnail_cache.evict(keep=visible):
+            if entry.edge == self.thumbnail_size and entry.refined:
+                self.ready_count -= 1
+
+    def report_progress(self):
+        total = len(self.records)
+        self.progress.emit(min(self.ready_count, total), total)
+
+    def on_loader_idle(self):
+        if self.sweep_row >= len(self.records) or not self.thumbnail_cache.has_room():
+            # Sweep finished (or paused at the memory budget) - nothing left to load now
+            self.progress.emit(len(self.records), len(self.records))
+
+    def set_thumbnail_size(self, size, refine=True):
+        """Switch display size; icons are fast-scaled from the pyramids now and refined later.
+
+        In-flight jobs keep running - their pyramids are still useful at any size.
+        """
+        with TRACER.span("set_thumbnail_size", size=size, refine=refine):
+            self.thumbnail_size = size
+            self.loader.thumbnail_size = size
+            self.refine_suspended = not refine
+            self.priority_jobs = None
+            self.sweep_row = 0
+            self.ready_count = len(self.failed)
+            if self.records:
+                self.dataChanged.emit(self.index(0), self.index(len(self.records) - 1), [Qt.DecorationRole])
+            self.loader.pump()
+
+    # --- Records ---
+    def set_paths(self, paths):
+        self.beginResetModel()
+        self.reset_thumbnail_jobs()
+        self.thumbnail_cache.clear()
+        self.failed.clear()
+        self.frame_hashes.clear()
+        self.metadata.clear()
+        self.ready_count = 0
+        self.refine_suspended = False  # The view dropped its pending slider debounce - the size is final
+        self.records = [ImageRecord(p) for p in paths]
+        self.invalidate_indexes()
+        self.endResetModel()
+        self.report_progress()
+        self.loader.pump()
+
+    def append_paths(self, paths):
+        if not paths:
+            return
+        start = len(self.records)
+        self.beginInsertRows(QtCore.QModelIndex(), start, start + len(paths) - 1)
+        self.records.extend(ImageRecord(p) for p in paths)
+        self.invalidate_indexes()
+        self.endInsertRows()
+        self.loader.pump()
+
+    def insert_paths_sorted(self, paths):
+        """Insert each path before the first row whose name sorts after it (live folder sync)"""
+        new = sorted((ImageRecord(p) for p in paths), key=attrgetter("key"))
+        if not new:
+            return
+        records = self.records
+        if self.insertion_index is None and len(new) < len(records).bit_length():
+            # A few files: one pass over the cached keys is cheaper than building the index
+            targets = [next((r for r, rec in enumerate(records) if rec.key > record.key), len(records))
+                       for record in new]
+        else:
+            index = self.sorted_positions()
+            targets = [index.position(record.key) for record in new]
+        # Targets are rows of the grid before any insertion (inserting a smaller name never moves
+        # a larger one's target); insert bottom-up so the rows above stay valid
+        groups = [(target, [record for _, record in group])
+                  for target, group in groupby(zip(targets, new), key=lambda pair: pair[0])]
+        for target, group in reversed(groups):
+            self.beginInsertRows(QtCore.QModelIndex(), target, target + len(group) - 1)
+            records[target:target] = group
+            self.endInsertRows()
+        self.invalidate_indexes()
+        self.sweep_row = 0  # Rows shifted under the cursor
+        self.loader.pump()
+
+    def remove_paths(self, paths):
+        """Drop rows whose files disappeared, one removal per contiguous block"""
+        doomed = set(paths)
+        rows = [r for r, rec in enumerate(self.records) if rec.path in doomed]
+        for first, last in reversed(row_ranges(rows)):
+            self.beginRemoveRows(QtCore.QModelIndex(), first, last)
+            del self.records[first:last + 1]
+            self.endRemoveRows()
+        self.invalidate_indexes()
+        for path in doomed:
+            self.forget_thumbnail(path)
+            self.sweep_paths.discard(path)
+        self.sweep_row = 0
+        self.report_progress()
+
+    def forget_thumbnail(self, path):
+        entry = self.thumbnail_cache.remove(path)
+        if path in self.failed or (entry is not None and entry.edge == self.thumbnail_size and entry.refined):
+            self.ready_count -= 1
+        self.failed.discard(path)
+        self.frame_hashes.pop(path, None)
+        self.metadata.pop(path, None)
+
+    def refresh_thumbnails(self, paths):
+        """Forget decoded thumbnails of files edited in place so they are decoded again"""
+        for path in paths:
+            self.forget_thumbnail(path)
+        self.priority_jobs = None
+        self.sweep_row = 0
+        if self.records:
+            self.dataChanged.emit(self.index(0), self.index(len(self.records) - 1), [Qt.DecorationRole])
+        self.report_progress()
+        self.loader.pump()
+
+    def path(self, row):
+        return self.records[row].path
+
+    def set_highlighted(self, rows):
+        highlighted = set(rows)
+        if highlighted == self.highlighted:
+            return
+        self.highlighted = highlighted
+        if self.records:
+            self.dataChanged.emit(self.index(0), self.index(len(self.records) - 1),
+                                  [Qt.BackgroundRole, Qt.ForegroundRole])
+
+    def invalidate_indexes(self):
+        """Names or the row order changed"""
+        self.name_index.invalidate()
+        self.insertion_index = None
+
+    def sorted_positions(self):
+        """Insertion index over the current rows"""
+        if self.insertion_index is None:
+            self.insertion_index = InsertionIndex([record.key for record in self.records])
+        return self.insertion_index
+
+    def search_index(self):
+        """Name index over the current rows"""
+        if self.name_index.dirty:
+            self.name_index.rebuild([record.name.lower() for record in self.records])
+        return self.name_index
+
+    def name(self, row):
+        return self.records[row].name
+
+    def set_record_paths(self, moves):
+        """Point rows at their renamed files ({row: new path}), carrying thumbnails, hashes and metadata along"""
+        if not moves:
+            return
+        renamed = {}
+        for row, new_path in moves.items():
+            record = self.records[row]
+            renamed[record.path] = new_path
+            record.set_path(new_path)
+        self.invalidate_indexes()
+        self.thumbnail_cache.rename(renamed)
+        remap_paths(self.frame_hashes, renamed)
+        remap_paths(self.metadata, renamed)
+        self.dataChanged.emit(self.index(min(moves)), self.index(max(moves)))
+
+    def apply_order(self, order):
+        """Reorder records so new row i holds old row order[i]; selection follows its records"""
+        old_to_new = [0] * len(order)
+        for new_row, old_row in enumerate(order):
+            old_to_new[old_row] = new_row
+        self.layoutAboutToBeChanged.emit()
+        persistent = self.persistentIndexList()
+        self.changePersistentIndexList(persistent, [self.index(old_to_new[i.row()]) for i in persistent])
+        self.records = [self.records[i] for i in order]
+        self.invalidate_indexes()
+        self.layoutChanged.emit()
+        self.sweep_row = 0  # Rows moved under the cursor; rescanning skips finished rows
+
+    def move_rows(self, rows, insert_at):
+        """Move rows (in their current order) so the first lands at insert_at of the remaining list"""
+        moving = set(rows)
+        rest = [r for r in range(len(self.records)) if r not in moving]
+        order = rest[:insert_at] + sorted(moving) + rest[insert_at:]
+        self.apply_order(order)
+        return list(range(insert_at, insert_at + len(moving)))
+
+    def sort_by_name(self):
+        order = sorted(range(len(self.records)), key=lambda r: self.records[r].key)
+        self.apply_order(order)
+
+    def sort_by_metadata(self, key):
+        """Reorder by key(FrameMetadata) from the index; ties and unindexed files (last) in natural order"""
+        records, metadata = self.records, self.metadata
+        rows = sorted(range(len(records)), key=lambda r: records[r].key)
+        indexed = [r for r in rows if records[r].path in metadata]
+        # Stable: equal keys keep the natural order of the first pass
+        indexed.sort(key=lambda r: key(metadata[records[r].path]))
+        if len(indexed) < len(rows):
+            indexed_set = set(indexed)
+            indexed.extend(r for r in rows if r not in indexed_set)
+        self.apply_order(indexed)
+
+    def rows_rejected_by(self, test):
+        """Rows whose metadata fails test (unindexed rows fail too)"""
+        metadata = self.metadata
+        rejected = []
+        for row, record in enumerate(self.records):
+            entry = metadata.get(record.path)
+            if entry is None or not test(entry):
+                rejected.append(row)
+        return rejected
+
+
+class DragDropListView(QtWidgets.QListView):
     double_left_clicked = QtCore.pyqtSignal(str, str)
     double_right_clicked = QtCore.pyqtSignal(str)
+    playback_toggled = QtCore.pyqtSignal()
 
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.setViewMode(QtWidgets.QListWidget.IconMode)
+        self.setViewMode(QtWidgets.QListView.IconMode)
+        # Static movement keeps the flow layout (no per-item positions) so huge folders stay cheap
+        self.setMovement(QtWidgets.QListView.Static)
         self.setSelectionMode(QtWidgets.QAbstractItemView.ExtendedSelection)
         self.setAcceptDrops(True)
         self.setDragEnabled(True)
         self.setDropIndicatorShown(True)
         self.setDefaultDropAction(Qt.MoveAction)
         self.setSpacing(12)
-        self.setResizeMode(QtWidgets.QListWidget.Adjust)
+        self.setResizeMode(QtWidgets.QListView.Adjust)
         self.setWrapping(True)
-        self.setMovement(QtWidgets.QListWidget.Snap)
+        self.setUniformItemSizes(True)
+        self.setLayoutMode(QtWidgets.QListView.Batched)
+        self.setBatchSize(1000)
         self.thumbnail_size = DEFAULT_THUMB
         self.setIconSize(QtCore.QSize(self.thumbnail_size, self.thumbnail_size))
         self.setGridSize(QtCore.QSize(self.thumbnail_size + PADDING, self.thumbnail_size + PADDING + 50))
-        self.thumbnail_cache = {}
-        self.itemDoubleClicked.connect(self.handle_double_click)
         self.setFocusPolicy(Qt.StrongFocus)
 
-        # Progressive thumbnail regeneration
+        # Background thumbnail decoding, driven by the rows the view actually paints
+        self.thumbnail_loader = ThumbnailLoader(parent=self)
+        self.image_model = ImageListModel(self.thumbnail_loader, parent=self)
+        self.setModel(self.image_model)
+        self.doubleClicked.connect(self.handle_double_click)
+
+        # Visible rows decode first; priorities follow scrolling, resizing and key jumps
+        self.viewport_timer = QTimer()
+        self.viewport_timer.setSingleShot(True)
+        self.viewport_timer.timeout.connect(self.update_thumbnail_priorities)
+        self.verticalScrollBar().valueChanged.connect(self.schedule_thumbnail_priorities)
+        self.image_model.modelReset.connect(self.schedule_thumbnail_priorities)
+        self.image_model.layoutChanged.connect(self.schedule_thumbnail_priorities)
+        self.image_model.rowsInserted.connect(self.schedule_thumbnail_priorities)
+
+        # Debounce rapid slider movements before re-requesting thumbnails
         self.resize_timer = QTimer()
         self.resize_timer.setSingleShot(True)
-        self.resize_timer.timeout.connect(self.start_progressive_resize)
-        self.progressive_timer = QTimer()
-        self.progressive_timer.timeout.connect(self.resize_next_thumbnail)
-        self.resize_index = 0
+        self.resize_timer.timeout.connect(self.apply_thumbnail_size)
+
+    # --- Row helpers (replace the old QListWidget item API) ---
+    def count(self):
+        return self.image_model.rowCount()
+
+    def selected_rows(self):
+        """Sorted selected rows, read from the selection ranges (no index per row)"""
+        rows = []
+        for selection_range in self.selectionModel().selection():
+            rows.extend(range(selection_range.top(), selection_range.bottom() + 1))
+        rows.sort()
+        return rows
+
+    def first_selected_row(self):
+        """Top row of the first selection range, -1 if nothing is selected"""
+        selection = self.selectionModel().selection()
+        return selection[0].top() if not selection.isEmpty() else -1
+
+    def current_row(self):
+        index = self.currentIndex()
+        return index.row() if index.isValid() else -1
+
+    def select_rows(self, rows, current=None):
+        """Replace the selection with rows, merged into contiguous ranges"""
+        selection = QtCore.QItemSelection()
+        model = self.image_model
+        for first, last in row_ranges(rows):
+            selection.select(model.index(first), model.index(last))
+        selection_model = self.selectionModel()
+        if current is not None:
+            selection_model.setCurrentIndex(model.index(current), QtCore.QItemSelectionModel.NoUpdate)
+        selection_model.select(selection, QtCore.QItemSelectionModel.ClearAndSelect)
+
+    def move_rows(self, rows, insert_at):
+        """Move rows as one permutation and select them at their new place; returns the new rows.
+
+        The selection is dropped first so the model doesn't have to carry thousands of
+        persistent indexes through the layout change only for them to be replaced.
+        """
+        self.selectionModel().clear()
+        moved_rows = self.image_model.move_rows(rows, insert_at)
+        self.select_rows(moved_rows, current=moved_rows[0] if moved_rows else None)
+        return moved_rows
+
+    def set_current_row(self, row):
+        self.selectionModel().setCurrentIndex(self.image_model.index(row),
+                                              QtCore.QItemSelectionModel.ClearAndSelect)
+
+    def scroll_to_row(self, row, hint=QAbstractItemView.EnsureVisible):
+        self.scrollTo(self.image_model.index(row), hint)
+
+    def visible_row_range(self):
+        """(first, last) rows intersecting the viewport, found by binary search over item rects"""
+        total = self.count()
+        if total == 0:
+            return 0, -1
+        height = self.viewport().height()
+        model = self.image_model
+        # Rows not laid out yet (batched layout) have invalid rects and count as below the viewport
+        lo, hi = 0, total
+        while lo < hi:
+            mid = (lo + hi) // 2
+            rect = self.visualRect(model.index(mid))
+            if rect.isValid() and rect.bottom() < 0:
+                lo = mid + 1
+            else:
+                hi = mid
+        first = min(lo, total - 1)
+        lo, hi = first, total
+        while lo < hi:
+            mid = (lo + hi) // 2
+            rect = self.visualRect(model.index(mid))
+            if rect.isValid() and rect.top() <= height:
+                lo = mid + 1
+            else:
+                hi = mid
+        return first, max(first, lo - 1)
+
+    def schedule_thumbnail_priorities(self, *args):
+        if not self.viewport_timer.isActive():
+            self.viewport_timer.start(0)
+
+    def update_thumbnail_priorities(self):
+        self.image_model.set_viewport(*self.visible_row_range())
+
+    def timerEvent(self, event):
+        # Batched item layout (and the delayed relayout after model changes) runs on view timers
+        with TRACER.span("qt_layout"):
+            super().timerEvent(event)
+
+    def updateGeometries(self):
+        super().updateGeometries()
+        self.schedule_thumbnail_priorities()  # Layout batches and grid changes move the viewport
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.schedule_thumbnail_priorities()
 
     def keyPressEvent(self, event):
         if event.key() == Qt.Key_Left or event.key() == Qt.Key_Right:
-            current_row = self.currentRow()
+            current_row = self.current_row()
             total = self.count()
             if total == 0:
                 return
@@ -95,111 +2035,66 @@ class DragDropListWidget(QtWidgets.QListWidget):
                 new_row = (current_row - 1) % total
             else:
                 new_row = (current_row + 1) % total
-            self.setCurrentRow(new_row)
-            item = self.item(new_row)
-            self.scrollToItem(item, QAbstractItemView.PositionAtCenter)
+            self.set_current_row(new_row)
+            self.scroll_to_row(new_row, QAbstractItemView.PositionAtCenter)
+            self.schedule_thumbnail_priorities()
+            event.accept()
+            return
+        if event.key() == Qt.Key_Space and not event.modifiers():
+            self.playback_toggled.emit()
             event.accept()
             return
         super().keyPressEvent(event)
+        self.schedule_thumbnail_priorities()  # Page/Home/End jumps
 
-    def handle_double_click(self, item):
-        name = item.text()
-        path = item.data(Qt.UserRole)
+    def handle_double_click(self, index):
+        name = self.image_model.name(index.row())
+        path = self.image_model.path(index.row())
         self.double_left_clicked.emit(name, path)
 
     def mouseDoubleClickEvent(self, event):
         if event.button() == Qt.RightButton:
-            item = self.itemAt(event.pos())
-            if item:
-                name = item.text()
+            index = self.indexAt(event.pos())
+            if index.isValid():
+                name = self.image_model.name(index.row())
                 self.double_right_clicked.emit(name)
                 return
         super().mouseDoubleClickEvent(event)
 
     def setThumbnailSize(self, size: int):
-        """Called when slider changes - triggers progressive resize"""
+        """Called when slider changes - fast-scaled icons now, smooth refinement after a short debounce"""
         self.thumbnail_size = size
         # Immediately update icon and grid size (allocates space)
         self.setIconSize(QtCore.QSize(size, size))
         self.setGridSize(QtCore.QSize(size + PADDING, size + PADDING + 50))
+        self.image_model.set_thumbnail_size(size, refine=False)
+        self.resize_timer.stop()
+        self.resize_timer.start(150)  # Wait 150ms after last slider change
 
-        # Stop any ongoing resize
-        self.progressive_timer.stop()
-
-        # Clear cache to force regeneration at new size
-        self.thumbnail_cache.clear()
-
-        # Restart from beginning
-        self.resize_index = 0
+    def apply_thumbnail_size(self):
+        self.image_model.set_thumbnail_size(self.thumbnail_size)
+        self.update_thumbnail_priorities()
 
-        # Delay start to debounce rapid slider movements
+    def set_paths(self, paths):
         self.resize_timer.stop()
-        self.resize_timer.start(150)  # Wait 150ms after last slider change
+        self.image_model.thumbnail_size = self.thumbnail_size
+        self.thumbnail_loader.thumbnail_size = self.thumbnail_size
+        self.image_model.set_paths(paths)
 
-    def start_progressive_resize(self):
-        """Start the progressive thumbnail regeneration"""
-        self.resize_index = 0
-        if self.count() > 0:
-            self.progressive_timer.start(0)  # Process as fast as possible
-
-    def resize_next_thumbnail(self):
-        """Regenerate one thumbnail at a time"""
-        if self.resize_index >= self.count():
-            # All done
-            self.progressive_timer.stop()
-            return
-
-        item = self.item(self.resize_index)
-        if item:
-            path = item.data(Qt.UserRole)
-            if path and os.path.exists(path):
-                # Generate new thumbnail at current size
-                icon = self.get_thumbnail_icon(path, force_regenerate=True)
-                item.setIcon(icon)
-
-        self.resize_index += 1
-
-        # Process events every 10 thumbnails to keep UI responsive
-        if self.resize_index % 10 == 0:
-            QApplication.processEvents()
-
-    def get_thumbnail_icon(self, path, force_regenerate=False):
-        """Get or generate thumbnail icon"""
-        # Check cache unless forced to regenerate
-        if not force_regenerate and path in self.thumbnail_cache:
-            cached_icon = self.thumbnail_cache[path]
-            # Verify cached icon is correct size
-            if not cached_icon.isNull():
-                pixmap = cached_icon.pixmap(QtCore.QSize(self.thumbnail_size, self.thumbnail_size))
-                if pixmap.width() == self.thumbnail_size or pixmap.height() == self.thumbnail_size:
-                    return cached_icon
-
-        # Generate new thumbnail
-        if os.path.exists(path):
-            pix = QtGui.QPixmap(path)
-            if not pix.isNull():
-                scaled = pix.scaled(self.thumbnail_size, self.thumbnail_size,
-                                    Qt.KeepAspectRatio, Qt.SmoothTransformation)
-                icon = QtGui.QIcon(scaled)
-                self.thumbnail_cache[path] = icon
-                return icon
-
-        return QtGui.QIcon()
+    def cancel_thumbnail_loading(self):
+        self.image_model.reset_thumbnail_jobs()
 
     def startDrag(self, supportedActions):
-        selected = [i.row() for i in self.selectedIndexes()]
-        drag_rows = sorted(set(selected))
+        drag_rows = self.selected_rows()
         if not drag_rows: return
-        self.clearSelection()
-        for r in drag_rows:
-            self.item(r).setSelected(True)
+        self.select_rows(drag_rows)
         mime = QtCore.QMimeData()
-        mime.setData('application/x-drag-rows', str(drag_rows).encode())
+        mime.setData('application/x-drag-rows', encode_row_payload(drag_rows))
         drag = QtGui.QDrag(self)
         drag.setMimeData(mime)
-        first_item = self.item(drag_rows[0])
-        if first_item and not first_item.icon().isNull():
-            drag.setPixmap(first_item.icon().pixmap(self.iconSize()))
+        icon = self.image_model.data(self.image_model.index(drag_rows[0]), Qt.DecorationRole)
+        if icon and not icon.isNull():
+            drag.setPixmap(icon.pixmap(self.iconSize()))
         drag.exec_(Qt.MoveAction)
 
     def dragEnterEvent(self, e):
@@ -217,27 +2112,227 @@ class DragDropListWidget(QtWidgets.QListWidget):
     def dropEvent(self, e):
         if not e.mimeData().hasFormat('application/x-drag-rows'):
             return super().dropEvent(e)
-        try:
-            drag_rows = eval(e.mimeData().data('application/x-drag-rows').data().decode())
-        except:
+        drag_rows = decode_row_payload(e.mimeData().data('application/x-drag-rows').data())
+        if not drag_rows or drag_rows[-1] >= self.count(): e.ignore(); return
+        pos = e.pos()
+        target_index = self.indexAt(pos)
+        target_row = target_index.row() if target_index.isValid() else self.count()
+        # Dragged rows before the target no longer count once they are lifted out
+        before = bisect_left(drag_rows, target_row)
+        if before < len(drag_rows) and drag_rows[before] == target_row: e.ignore(); return
+        insert_at = target_row - before
+        self.move_rows(drag_rows, insert_at)
+        e.acceptProposedAction()
+
+
+class ShardListWidget(QtWidgets.QListWidget):
+    """Shards of the open workspace; frames dragged from the grid onto a shard are moved into its folder"""
+    frames_dropped = QtCore.pyqtSignal(str, list)  # target folder, grid rows
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setAcceptDrops(True)
+        self.setDragDropMode(QAbstractItemView.DropOnly)
+        self.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.setStyleSheet("QListWidget { font-size: 12px; } QListWidget::item { padding: 4px; }")
+
+    def folder(self, item):
+        return item.data(Qt.UserRole)
+
+    def item_for(self, folder):
+        key = path_key(folder)
+        for row in range(self.count()):
+            if path_key(self.folder(self.item(row))) == key:
+                return self.item(row)
+        return None
+
+    def set_count(self, folder, count):
+        item = self.item_for(folder)
+        if item is not None:
+            item.setText(f"{item.data(Qt.UserRole + 1)}  ({count})")
+
+    def dragEnterEvent(self, e):
+        if e.mimeData().hasFormat('application/x-drag-rows'):
+            e.acceptProposedAction()
+        else:
+            e.ignore()
+
+    def dragMoveEvent(self, e):
+        item = self.itemAt(e.pos())
+        if e.mimeData().hasFormat('application/x-drag-rows') and item is not None and item is not self.currentItem():
+            e.acceptProposedAction()
+        else:
+            e.ignore()
+
+    def dropEvent(self, e):
+        item = self.itemAt(e.pos())
+        rows = decode_row_payload(e.mimeData().data('application/x-drag-rows').data())
+        if item is None or not rows:
             e.ignore()
             return
-        if not drag_rows: e.ignore(); return
-        pos = e.pos()
-        target_item = self.itemAt(pos)
-        target_row = self.row(target_item) if target_item else self.count()
-        if target_row in drag_rows: e.ignore(); return
-        insert_at = target_row if target_row <= max(drag_rows) else target_row - len(drag_rows)
-        dragged_items = []
-        for r in reversed(sorted(drag_rows)):
-            itm = self.takeItem(r)
-            dragged_items.insert(0, itm)
-        for i, itm in enumerate(dragged_items):
-            self.insertItem(insert_at + i, itm)
-        self.clearSelection()
-        for i in range(len(dragged_items)):
-            self.item(insert_at + i).setSelected(True)
         e.acceptProposedAction()
+        self.frames_dropped.emit(self.folder(item), rows)
+
+
+class DuplicatesDialog(QtWidgets.QDialog):
+    """Groups of re-exported and near-identical frames; groups are selected or gathered in the grid.
+
+    Frames the thumbnail loader has not hashed yet are hashed first (disk cache first). Groups
+    are kept as paths, so they stay valid while the grid is reordered.
+    """
+    HASH_LABELS = ("pHash (robust)", "dHash (gradients)", "aHash (fastest, strict)")
+    NAMES_SHOWN = 4
+
+    def __init__(self, organizer):
+        super().__init__(organizer)
+        self.setWindowTitle("Find Duplicates")
+        self.resize(560, 480)
+        self.organizer = organizer
+        self.hasher = organizer.frame_hasher
+        self.groups = []  # [[path, ...], ...], each in grid order at grouping time
+        self.hashing = False
+
+        self.kind_combo = QtWidgets.QComboBox()
+        self.kind_combo.addItems(self.HASH_LABELS)
+        kind = organizer.settings.value("duplicate_hash", HASH_KINDS[0])
+        self.kind_combo.setCurrentIndex(HASH_KINDS.index(kind) if kind in HASH_KINDS else 0)
+        self.distance_spin = QtWidgets.QSpinBox()
+        self.distance_spin.setRange(0, MAX_DISTANCE)
+        self.distance_spin.setValue(int(organizer.settings.value("duplicate_distance", DEFAULT_MAX_DISTANCE)))
+        self.distance_spin.setSuffix(" bits")
+        self.distance_spin.setToolTip("Largest Hamming distance between frames of a group (0 = identical hashes)")
+        options = QtWidgets.QHBoxLayout()
+        options.addWidget(QtWidgets.QLabel("Hash:"))
+        options.addWidget(self.kind_combo, 1)
+        options.addWidget(QtWidgets.QLabel("Max distance:"))
+        options.addWidget(self.distance_spin)
+
+        self.status = QtWidgets.QLabel()
+        self.progress = QtWidgets.QProgressBar()
+        self.progress.setVisible(False)
+        self.group_list = QtWidgets.QListWidget()
+        self.group_list.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.group_list.itemDoubleClicked.connect(lambda item: self.select_groups())
+
+        select_btn = QtWidgets.QPushButton("Select in Grid")
+        select_btn.setToolTip("Select the frames of the chosen groups (all groups if none is chosen)")
+        select_btn.clicked.connect(self.select_groups)
+        extras_btn = QtWidgets.QPushButton("Select Extras")
+        extras_btn.setToolTip("Select every frame but the first of each group")
+        extras_btn.clicked.connect(lambda: self.select_groups(extras_only=True))
+        gather_btn = QtWidgets.QPushButton("Gather in Grid")
+        gather_btn.setToolTip("Move the frames of each group next to its first frame")
+        gather_btn.clicked.connect(self.gather_groups)
+        close_btn = QtWidgets.QPushButton("Close")
+        close_btn.clicked.connect(self.close)
+        buttons = QtWidgets.QHBoxLayout()
+        for button in (select_btn, extras_btn, gather_btn):
+            buttons.addWidget(button)
+        buttons.addStretch()
+        buttons.addWidget(close_btn)
+
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.addLayout(options)
+        layout.addWidget(self.status)
+        layout.addWidget(self.progress)
+        layout.addWidget(self.group_list, 1)
+        layout.addLayout(buttons)
+
+        # Settings changes regroup once they settle (a 100k-frame grouping takes seconds)
+        self.regroup_timer = QTimer(self)
+        self.regroup_timer.setSingleShot(True)
+        self.regroup_timer.setInterval(250)
+        self.regroup_timer.timeout.connect(self.regroup)
+        self.kind_combo.currentIndexChanged.connect(lambda *args: self.regroup_timer.start())
+        self.distance_spin.valueChanged.connect(lambda *args: self.regroup_timer.start())
+        self.hasher.progress.connect(self.update_progress)
+
+    def refresh(self):
+        """Hash whatever is missing, then group"""
+        self.hashing = False
+        model = self.organizer.list.image_model
+        missing = [record.path for record in model.records
+                   if record.path not in model.frame_hashes and record.path not in model.failed]
+        if not missing:
+            self.regroup()
+            return
+        self.status.setText(f"Hashing {len(missing)} frames…")
+        self.progress.setValue(0)
+        self.progress.setVisible(True)
+        self.hashing = True
+        self.hasher.hash_paths(missing, self.hashing_finished)
+
+    def update_progress(self, done, total):
+        self.progress.setValue(int(done / total * 100) if total else 100)
+
+    def hashing_finished(self):
+        self.hashing = False
+        self.regroup()
+
+    def regroup(self):
+        if self.hashing:
+            return  # Grouped once every frame is in
+        self.progress.setVisible(False)
+        kind = self.kind_combo.currentIndex()
+        distance = self.distance_spin.value()
+        self.organizer.settings.setValue("duplicate_hash", HASH_KINDS[kind])
+        self.organizer.settings.setValue("duplicate_distance", distance)
+        model = self.organizer.list.image_model
+        paths = [record.path for record in model.records if record.path in model.frame_hashes]
+        hashes = [model.frame_hashes[path][kind] for path in paths]
+        self.status.setText(f"Grouping {len(paths)} frames…")
+        self.hasher.run_job("group_duplicates", group_near_duplicates, (hashes, distance),
+                            lambda groups: self.show_groups(paths, groups))
+
+    def show_groups(self, paths, groups):
+        self.groups = [[paths[i] for i in group] for group in groups]
+        self.group_list.clear()
+        for group in self.groups:
+            names = [os.path.basename(path) for path in group[:self.NAMES_SHOWN]]
+            more = f" … +{len(group) - self.NAMES_SHOWN}" if len(group) > self.NAMES_SHOWN else ""
+            self.group_list.addItem(f"{len(group)} frames: {', '.join(names)}{more}")
+        frames = sum(len(group) for group in self.groups)
+        self.status.setText(f"{len(self.groups)} groups, {frames} frames out of {len(paths)}"
+                            if self.groups else f"No duplicates among {len(paths)} frames")
+
+    def chosen_groups(self):
+        rows = sorted(self.group_list.row(item) for item in self.group_list.selectedItems())
+        return [self.groups[r] for r in rows] if rows else self.groups
+
+    def group_rows(self, groups):
+        """Current grid rows of each group (frames no longer in the grid are left out)"""
+        model = self.organizer.list.image_model
+        row_of = {record.path: row for row, record in enumerate(model.records)}
+        return [sorted(row_of[path] for path in group if path in row_of) for group in groups]
+
+    def select_groups(self, extras_only=False):
+        grid = self.organizer.list
+        rows = sorted(row for group in self.group_rows(self.chosen_groups())
+                      for row in (group[1:] if extras_only else group))
+        if not rows:
+            return
+        grid.select_rows(rows, current=rows[0])
+        grid.scroll_to_row(rows[0])
+
+    def gather_groups(self):
+        """One reorder: each group lands at its first frame's row, in grid order"""
+        grid = self.organizer.list
+        leaders = {}
+        followers = set()
+        for rows in self.group_rows(self.chosen_groups()):
+            if len(rows) > 1:
+                leaders[rows[0]] = rows
+                followers.update(rows[1:])
+        if not leaders:
+            return
+        order = []
+        for row in range(grid.count()):
+            if row in leaders:
+                order.extend(leaders[row])
+            elif row not in followers:
+                order.append(row)
+        grid.image_model.apply_order(order)
+        self.select_groups()
 
 
 class ImageOrganizer(QtWidgets.QMainWindow):
@@ -255,10 +2350,52 @@ class ImageOrganizer(QtWidgets.QMainWindow):
             self.restoreState(window_state)
         if not geometry:
             self.showMaximized()
+        self.disk_cache = self.open_disk_cache()
         self.folder = None
         self.preview_locked = False
-        self.last_search_index = {1: -1, 2: -1}
-        self.current_folder_files = set()
+        self.preview_path = None
+        self.last_preview_row = -1
+        self.preview_loader = PreviewLoader(self)
+        self.preview_loader.preview_ready.connect(self.on_preview_ready)
+        self.renamer = BatchRenamer(default_journal_path(), self)
+        self.renamer.step_done.connect(self.update_rename_progress)
+        self.search_cursors = {1: MatchCursor(), 2: MatchCursor()}
+        self.pending_search_steps = {}  # search bar -> prev, stepped once its background match set arrives
+        self.active_search_bar = 1  # Its matches are highlighted in the grid
+        self.search_runner = SearchRunner(self)
+        self.search_runner.matches_ready.connect(self.on_matches_ready)
+        self.frame_hasher = FrameHasher(self)
+        self.frame_hasher.disk_cache = self.disk_cache
+        self.duplicates_dialog = None
+        self.flipbook = FlipbookPlayer(self)
+        self.flipbook.frame_ready.connect(self.on_flipbook_frame)
+        self.flipbook.stats_changed.connect(self.show_playback_stats)
+        self.flipbook.stopped.connect(self.on_playback_stopped)
+        self.flipbook_ranged = False  # Playing the selection (kept on pause) rather than every frame
+        self.metadata_indexer = MetadataIndexer(self)
+        self.metadata_indexer.disk_cache = self.disk_cache
+        self.metadata_indexer.idle.connect(self.on_metadata_indexed)
+        self.pending_sort = None  # Sort picked while the index was still being built
+        # Workspace: shard folders found under its roots; only the shard on screen (self.folder) is loaded
+        self.workspace = None  # {"roots": [...], "recursive": bool, "labels": [...]} while one is open
+        self.shard_states = {}  # folder -> (names, baseline) of shards left this session, reopened in that order
+        self.shard_scanner = ShardScanner(self)
+        self.shard_scanner.shards_ready.connect(self.on_shards_ready)
+        self.shard_scanner.counts_changed.connect(self.on_shard_counts)
+        # Folder changes arrive as exact deltas from file system notifications (debounced)
+        self.folder_watcher = FolderWatcher(SUPPORTED_EXT, self)
+        self.folder_watcher.changed.connect(self.on_folder_changed)
+        self.folder_watcher.reconciled.connect(self.on_folder_reconciled)
+        self.pending_baseline = None  # Restored session's folder baseline, reconciled after the first paint
+        self.startup_ms = None  # Launch to the end of the first painted frame
+        self.first_painted = False
+        self.trace_path = os.environ.get(TRACE_ENV)  # Tracing from startup, saved on exit
+        if self.trace_path:
+            TRACER.enable()
+        self.stats_sample = (time.perf_counter(), 0)  # (when, images decoded) at the last panel update
+        self.stats_timer = QTimer(self)
+        self.stats_timer.setInterval(1000)
+        self.stats_timer.timeout.connect(self.update_stats_panel)
         central = QtWidgets.QWidget()
         self.setCentralWidget(central)
         left_panel = QtWidgets.QVBoxLayout()
@@ -299,6 +2436,21 @@ class ImageOrganizer(QtWidgets.QMainWindow):
         open_btn.setStyleSheet(blue_btn_style)
         open_btn.clicked.connect(self.open_folder)
 
+        workspace_btn = QtWidgets.QPushButton("Open Workspace")
+        workspace_btn.setStyleSheet(blue_btn_style)
+        workspace_btn.setToolTip("Open many shot folders at once: a root folder (all subfolders) or a saved folder list")
+        workspace_menu = QtWidgets.QMenu(workspace_btn)
+        workspace_menu.addAction("Root Folder (Recursive)…", self.open_workspace_root)
+        workspace_menu.addAction("Workspace File…", self.open_workspace_file)
+        workspace_menu.addSeparator()
+        workspace_menu.addAction("Rescan Workspace", self.rescan_workspace)
+        workspace_menu.addAction("Save Workspace As…", self.save_workspace_file)
+        workspace_menu.addAction("Close Workspace", self.close_workspace)
+        workspace_btn.setMenu(workspace_menu)
+        open_layout = QtWidgets.QHBoxLayout()
+        open_layout.addWidget(open_btn, 1)
+        open_layout.addWidget(workspace_btn, 1)
+
         reload_btn = QtWidgets.QPushButton("Reload Folder")
         reload_btn.setStyleSheet(blue_btn_style)
         reload_btn.clicked.connect(self.reload_folder)
@@ -311,6 +2463,11 @@ class ImageOrganizer(QtWidgets.QMainWindow):
         bottom_btn.setStyleSheet(blue_btn_style)
         bottom_btn.clicked.connect(self.move_to_bottom)
 
+        auto_order_btn = QtWidgets.QPushButton("Auto-order by Similarity")
+        auto_order_btn.setStyleSheet(blue_btn_style)
+        auto_order_btn.setToolTip("Rough-sequence the selected frames (or the whole folder) so similar frames follow each other")
+        auto_order_btn.clicked.connect(self.auto_order)
+
         clear_btn = QtWidgets.QPushButton("Clear Selection")
         clear_btn.setStyleSheet(gray_btn_style)
         clear_btn.clicked.connect(lambda: self.list.clearSelection())
@@ -323,6 +2480,15 @@ class ImageOrganizer(QtWidgets.QMainWindow):
         rename_selected_btn.setStyleSheet(blue_btn_style)
         rename_selected_btn.clicked.connect(self.rename_selected)
 
+        duplicates_btn = QtWidgets.QPushButton("Find Duplicates")
+        duplicates_btn.setStyleSheet(gray_btn_style)
+        duplicates_btn.setToolTip("Group re-exported and near-identical frames by perceptual hash")
+        duplicates_btn.clicked.connect(self.find_duplicates)
+
+        purge_cache_btn = QtWidgets.QPushButton("Purge Thumbnail Cache")
+        purge_cache_btn.setStyleSheet(gray_btn_style)
+        purge_cache_btn.clicked.connect(self.purge_thumbnail_cache)
+
         self.thumb_label = QtWidgets.QLabel(f"Thumbnail Size: {DEFAULT_THUMB}px")
         self.thumb_label.setStyleSheet("font-size: 12px; color: #e0e0e0; font-weight: 500;")
 
@@ -330,6 +2496,19 @@ class ImageOrganizer(QtWidgets.QMainWindow):
         self.thumb_slider.setRange(THUMB_MIN, THUMB_MAX)
         self.thumb_slider.setValue(DEFAULT_THUMB)
         self.thumb_slider.valueChanged.connect(self.update_thumb_size)
+        self.sort_combo = QtWidgets.QComboBox()
+        self.sort_combo.addItems(["Sort by…", "Name", *SORT_KEYS])
+        self.sort_combo.setToolTip("Reorder the grid once from the metadata index (files without EXIF use their "
+                                   "modified time as capture time)")
+        self.sort_combo.activated.connect(self.sort_frames)
+        self.filter_combo = QtWidgets.QComboBox()
+        self.filter_combo.addItems(list(FRAME_FILTERS))
+        self.filter_combo.setToolTip("Show only the frames that match (by pixel dimensions)")
+        self.filter_combo.currentIndexChanged.connect(lambda *args: self.apply_frame_filter())
+        order_layout = QtWidgets.QHBoxLayout()
+        order_layout.addWidget(self.sort_combo, 1)
+        order_layout.addWidget(self.filter_combo, 1)
+
         self.thumb_slider.setStyleSheet("""
             QSlider::groove:horizontal {
                 background: #2a2a2a;
@@ -369,6 +2548,15 @@ class ImageOrganizer(QtWidgets.QMainWindow):
         """)
         self.progress_bar.setVisible(False)
 
+        self.cancel_rename_btn = QtWidgets.QPushButton("Cancel")
+        self.cancel_rename_btn.setStyleSheet(gray_btn_style)
+        self.cancel_rename_btn.setToolTip("Stop the rename and undo the files already renamed")
+        self.cancel_rename_btn.clicked.connect(lambda: self.renamer.cancel())
+        self.cancel_rename_btn.setVisible(False)
+        progress_layout = QtWidgets.QHBoxLayout()
+        progress_layout.addWidget(self.progress_bar, 1)
+        progress_layout.addWidget(self.cancel_rename_btn)
+
         self.status_label = QtWidgets.QLabel("No folder opened")
         self.status_label.setAlignment(Qt.AlignCenter)
         self.status_label.setStyleSheet(
@@ -376,6 +2564,33 @@ class ImageOrganizer(QtWidgets.QMainWindow):
             "border-radius: 6px; border: 1px solid #3a3a3c;")
         self.status_label.setFixedHeight(32)
 
+        self.stats_btn = QtWidgets.QPushButton("Stats")
+        self.stats_btn.setStyleSheet(gray_btn_style)
+        self.stats_btn.setCheckable(True)
+        self.stats_btn.setToolTip("Show decode throughput, queue depth, cache hit rate and memory; records timing spans")
+        self.stats_btn.setFixedHeight(32)
+        status_layout = QtWidgets.QHBoxLayout()
+        status_layout.addWidget(self.status_label, 1)
+        status_layout.addWidget(self.stats_btn)
+
+        self.stats_label = QtWidgets.QLabel()
+        self.stats_label.setStyleSheet("font-size: 11px; color: #a0a0a0; font-family: monospace;")
+        self.save_trace_btn = QtWidgets.QPushButton("Save Trace…")
+        self.save_trace_btn.setStyleSheet(gray_btn_style)
+        self.save_trace_btn.setToolTip("Export the recorded spans as Chrome trace JSON (chrome://tracing, ui.perfetto.dev)")
+        self.save_trace_btn.clicked.connect(self.save_trace)
+        stats_layout = QtWidgets.QHBoxLayout()
+        stats_layout.addWidget(self.stats_label, 1)
+        stats_layout.addWidget(self.save_trace_btn)
+        self.stats_label.setVisible(False)
+        self.save_trace_btn.setVisible(False)
+        self.stats_btn.toggled.connect(self.toggle_stats)
+
+        self.live_sync_checkbox = QtWidgets.QCheckBox("Live folder sync (apply added/removed/edited files)")
+        self.live_sync_checkbox.setStyleSheet("font-size: 11px; color: #a0a0a0;")
+        self.live_sync_checkbox.setChecked(self.settings.value("live_folder_sync", False, type=bool))
+        self.live_sync_checkbox.toggled.connect(self.toggle_live_sync)
+
         search1_label = QtWidgets.QLabel("Search 1 (Double Left-Click):")
         search1_label.setStyleSheet("font-weight: 600; color: #0a84ff; font-size: 11px;")
 
@@ -383,6 +2598,18 @@ class ImageOrganizer(QtWidgets.QMainWindow):
         self.search_input1.setPlaceholderText("Double left-click → fill & lock | LClick: copy+clear | RClick: paste")
         self.search_input1.returnPressed.connect(lambda: self.search_image(1, prev=False))
         self.search_input1.textChanged.connect(lambda: self.reset_search_index(1))
+        self.search_count1 = QtWidgets.QLabel("")
+        self.search_count1.setStyleSheet("font-size: 11px; color: #a0a0a0;")
+        self.search_count1.setFixedWidth(80)
+        self.search_mode1 = QtWidgets.QComboBox()
+        self.search_mode1.addItems(SEARCH_MODES)
+        self.search_mode1.setToolTip("Text: substring | Regex | Glob: e.g. shot_12_* | Fuzzy: ranked, best first")
+        self.search_mode1.setCurrentText(self.settings.value("search_mode_1", "Text"))
+        self.search_mode1.currentTextChanged.connect(lambda mode: self.change_search_mode(1, mode))
+        self.search_all_btn1 = QtWidgets.QPushButton("All")
+        self.search_all_btn1.setToolTip("Select every match")
+        self.search_all_btn1.clicked.connect(lambda: self.select_all_matches(1))
+        self.search_count1.setAlignment(Qt.AlignRight | Qt.AlignVCenter)
 
         search_layout1 = QtWidgets.QHBoxLayout()
         self.search_up_btn1 = QtWidgets.QPushButton("↑")
@@ -390,8 +2617,11 @@ class ImageOrganizer(QtWidgets.QMainWindow):
         self.search_up_btn1.clicked.connect(lambda: self.search_image(1, prev=True))
         self.search_down_btn1.clicked.connect(lambda: self.search_image(1, prev=False))
         search_layout1.addWidget(self.search_input1)
+        search_layout1.addWidget(self.search_mode1)
         search_layout1.addWidget(self.search_up_btn1)
         search_layout1.addWidget(self.search_down_btn1)
+        search_layout1.addWidget(self.search_all_btn1)
+        search_layout1.addWidget(self.search_count1)
 
         search2_label = QtWidgets.QLabel("Search 2 (Double Right-Click):")
         search2_label.setStyleSheet("font-weight: 600; color: #0a84ff; font-size: 11px;")
@@ -400,6 +2630,18 @@ class ImageOrganizer(QtWidgets.QMainWindow):
         self.search_input2.setPlaceholderText("Double right-click → fill & unlock | LClick: copy+clear | RClick: paste")
         self.search_input2.returnPressed.connect(lambda: self.search_image(2, prev=False))
         self.search_input2.textChanged.connect(lambda: self.reset_search_index(2))
+        self.search_count2 = QtWidgets.QLabel("")
+        self.search_count2.setStyleSheet("font-size: 11px; color: #a0a0a0;")
+        self.search_count2.setFixedWidth(80)
+        self.search_mode2 = QtWidgets.QComboBox()
+        self.search_mode2.addItems(SEARCH_MODES)
+        self.search_mode2.setToolTip("Text: substring | Regex | Glob: e.g. shot_12_* | Fuzzy: ranked, best first")
+        self.search_mode2.setCurrentText(self.settings.value("search_mode_2", "Text"))
+        self.search_mode2.currentTextChanged.connect(lambda mode: self.change_search_mode(2, mode))
+        self.search_all_btn2 = QtWidgets.QPushButton("All")
+        self.search_all_btn2.setToolTip("Select every match")
+        self.search_all_btn2.clicked.connect(lambda: self.select_all_matches(2))
+        self.search_count2.setAlignment(Qt.AlignRight | Qt.AlignVCenter)
 
         search_layout2 = QtWidgets.QHBoxLayout()
         self.search_up_btn2 = QtWidgets.QPushButton("↑")
@@ -407,11 +2649,14 @@ class ImageOrganizer(QtWidgets.QMainWindow):
         self.search_up_btn2.clicked.connect(lambda: self.search_image(2, prev=True))
         self.search_down_btn2.clicked.connect(lambda: self.search_image(2, prev=False))
         search_layout2.addWidget(self.search_input2)
+        search_layout2.addWidget(self.search_mode2)
         search_layout2.addWidget(self.search_up_btn2)
         search_layout2.addWidget(self.search_down_btn2)
+        search_layout2.addWidget(self.search_all_btn2)
+        search_layout2.addWidget(self.search_count2)
 
         # Preview with full width (no minimum width, maximizes available space)
-        self.preview = QtWidgets.QLabel("Preview\n(Double LEFT-click: lock | Double RIGHT-click: unlock)")
+        self.preview = ZoomPreview("Preview\n(Double LEFT-click: lock | Double RIGHT-click: unlock)")
         self.preview.setAlignment(Qt.AlignCenter)
         self.preview.setFixedHeight(350)
         # Removed setMinimumWidth - now uses full available width
@@ -426,20 +2671,47 @@ class ImageOrganizer(QtWidgets.QMainWindow):
             }
         """)
 
+        # Flipbook: plays the selected frames (or the whole grid) in the preview
+        self.play_btn = QtWidgets.QPushButton("▶ Play")
+        self.play_btn.setStyleSheet(gray_btn_style)
+        self.play_btn.setToolTip("Play the selected frames (or all frames) in the preview – Space in the grid")
+        self.play_btn.clicked.connect(self.toggle_playback)
+        self.fps_combo = QtWidgets.QComboBox()
+        self.fps_combo.addItems([f"{fps} fps" for fps in FPS_CHOICES])
+        self.fps_combo.setCurrentIndex(FPS_CHOICES.index(DEFAULT_FPS))
+        self.fps_combo.currentIndexChanged.connect(lambda i: self.flipbook.set_fps(FPS_CHOICES[i]))
+        self.playback_mode_combo = QtWidgets.QComboBox()
+        self.playback_mode_combo.addItems(PLAYBACK_MODES)
+        self.playback_mode_combo.currentTextChanged.connect(lambda mode: self.flipbook.set_mode(mode))
+        self.playback_label = QtWidgets.QLabel()
+        self.playback_label.setStyleSheet("font-size: 11px; color: #a0a0a0; font-family: monospace;")
+        self.playback_label.setToolTip("Frames that were due but not decoded in time are dropped (the disk can't keep up)")
+        self.playback_label.setVisible(False)
+        playback_layout = QtWidgets.QHBoxLayout()
+        playback_layout.addWidget(self.play_btn, 1)
+        playback_layout.addWidget(self.fps_combo)
+        playback_layout.addWidget(self.playback_mode_combo)
+
         # Assemble left panel with compact spacing
-        left_panel.addWidget(open_btn)
+        left_panel.addLayout(open_layout)
         left_panel.addWidget(reload_btn)
         left_panel.addWidget(top_btn)
         left_panel.addWidget(bottom_btn)
+        left_panel.addWidget(auto_order_btn)
         left_panel.addWidget(clear_btn)
         left_panel.addWidget(rename_all_btn)
         left_panel.addWidget(rename_selected_btn)
+        left_panel.addWidget(duplicates_btn)
+        left_panel.addWidget(purge_cache_btn)
         left_panel.addSpacing(6)
         left_panel.addWidget(self.thumb_label)
         left_panel.addWidget(self.thumb_slider)
+        left_panel.addLayout(order_layout)
         left_panel.addSpacing(6)
-        left_panel.addWidget(self.progress_bar)
-        left_panel.addWidget(self.status_label)
+        left_panel.addLayout(progress_layout)
+        left_panel.addLayout(status_layout)
+        left_panel.addLayout(stats_layout)
+        left_panel.addWidget(self.live_sync_checkbox)
         left_panel.addSpacing(8)
         left_panel.addWidget(search1_label)
         left_panel.addLayout(search_layout1)
@@ -448,6 +2720,8 @@ class ImageOrganizer(QtWidgets.QMainWindow):
         left_panel.addLayout(search_layout2)
         left_panel.addSpacing(10)
         left_panel.addWidget(self.preview)
+        left_panel.addLayout(playback_layout)
+        left_panel.addWidget(self.playback_label)
         left_panel.addStretch()  # Pushes copyright to bottom
 
         # Copyright at the very bottom - standard professional position
@@ -458,29 +2732,74 @@ class ImageOrganizer(QtWidgets.QMainWindow):
             "border-top: 1px solid #2a2a2a;")
         left_panel.addWidget(credit_label)
 
-        self.list = DragDropListWidget()
-        self.list.itemSelectionChanged.connect(self.update_preview)
+        self.list = DragDropListView()
+        self.list.selectionModel().selectionChanged.connect(self.update_preview)
         self.list.double_left_clicked.connect(self.handle_double_left_click)
         self.list.double_right_clicked.connect(self.handle_double_right_click)
+        self.list.playback_toggled.connect(self.toggle_playback)
+        self.list.image_model.modelReset.connect(self.flipbook.stop)  # Another folder: the frames are gone
+        self.list.thumbnail_loader.disk_cache = self.disk_cache
+        self.frame_hasher.hashes_ready.connect(self.list.image_model.store_hashes)
+        self.frame_hasher.progress.connect(self.update_hash_progress)
+        self.metadata_indexer.indexed.connect(self.list.image_model.store_metadata)
+
+        self.shard_list = ShardListWidget()
+        self.shard_list.setFixedWidth(240)
+        self.shard_list.setToolTip("Shots of the workspace – click to open one, drop frames on one to move them there")
+        self.shard_list.currentItemChanged.connect(
+            lambda item, previous: item is not None and self.open_shard(self.shard_list.folder(item)))
+        self.shard_list.frames_dropped.connect(self.move_frames_to_shard)
+        self.shard_list.setVisible(False)
+
+        # Match counts follow typing (coalesced) and any change to the rows' names or order
+        self.search_count_timers = {}
+        for search_bar in (1, 2):
+            timer = QTimer(self)
+            timer.setSingleShot(True)
+            timer.setInterval(50)
+            timer.timeout.connect(lambda bar=search_bar: self.update_search_count(bar))
+            self.search_count_timers[search_bar] = timer
+        self.search_refresh_timer = QTimer(self)
+        self.search_refresh_timer.setSingleShot(True)
+        self.search_refresh_timer.setInterval(100)
+        self.search_refresh_timer.timeout.connect(self.refresh_search_counts)
+        for signal in (self.list.image_model.modelReset, self.list.image_model.layoutChanged,
+                       self.list.image_model.rowsInserted, self.list.image_model.rowsRemoved):
+            signal.connect(lambda *args: self.search_refresh_timer.start())
+        self.list.image_model.progress.connect(self.update_load_progress)
+        budget_mb = int(self.settings.value("thumbnail_memory_budget_mb", DEFAULT_THUMB_MEMORY_MB))
+        self.list.image_model.thumbnail_cache.budget = budget_mb * 1024 * 1024
 
         main_layout = QtWidgets.QHBoxLayout(central)
         left_widget = QtWidgets.QWidget()
         left_widget.setLayout(left_panel)
         left_widget.setFixedWidth(460)
         main_layout.addWidget(left_widget)
+        main_layout.addWidget(self.shard_list)
         main_layout.addWidget(self.list, 1)
 
         last_folder = self.settings.value("last_folder", "")
         if last_folder and os.path.isdir(last_folder):
             self.folder = last_folder
+            self.restore_session()
+        try:
+            self.workspace = json.loads(self.settings.value("workspace", "") or "null")
+        except ValueError:
+            self.workspace = None
+        if not isinstance(self.workspace, dict):
+            self.workspace = None
 
         self.list.setFocus()
 
+        # Fallback for file systems without change notifications; cheap while the folder is unchanged
         self.folder_watch_timer = QTimer(self)
         self.folder_watch_timer.timeout.connect(self.check_for_new_files)
         self.folder_watch_timer.start(5000)
 
-        self.show()
+        self.stats_btn.setChecked(self.settings.value("show_stats", False, type=bool))
+
+        self.show()  # on_first_interactive follows the first paint (see paintEvent)
+        QTimer.singleShot(FIRST_PAINT_TIMEOUT_MS, self.on_first_interactive)
 
     def apply_dark_theme(self):
         palette = QtGui.QPalette()
@@ -518,38 +2837,228 @@ class ImageOrganizer(QtWidgets.QMainWindow):
                 selection-background-color: #0066CC;
             }
             QLineEdit:focus { border: 1px solid #0066CC; }
-            QListWidget {
+            QListView {
                 background-color: #1c1c1e;
                 border: 1px solid #3a3a3c;
                 border-radius: 8px;
                 color: #e0e0e0;
                 outline: none;
             }
-            QListWidget::item:selected { background-color: #0066CC; color: white; }
-            QListWidget::item:hover { background-color: #2c2c2e; }
+            QListView::item:selected { background-color: #0066CC; color: white; }
+            QListView::item:hover { background-color: #2c2c2e; }
         """
         QApplication.instance().setStyleSheet(app_stylesheet)
 
+    def open_disk_cache(self):
+        """Persistent thumbnail cache; the app still works (uncached) if it can't be opened"""
+        limit_mb = int(self.settings.value("thumbnail_cache_limit_mb", DEFAULT_CACHE_LIMIT_MB))
+        try:
+            return ThumbnailDiskCache(default_cache_path(), limit_mb * 1024 * 1024)
+        except (sqlite3.Error, OSError):
+            return None
+
+    def purge_thumbnail_cache(self):
+        if self.disk_cache is None:
+            QtWidgets.QMessageBox.warning(self, "Error", "Thumbnail cache is not available!")
+            return
+        if QtWidgets.QMessageBox.question(self, "Purge Thumbnail Cache",
+                                          "Delete all cached thumbnails from disk?",
+                                          QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No) != QtWidgets.QMessageBox.Yes:
+            return
+        try:
+            freed = self.disk_cache.purge()
+        except sqlite3.Error as e:
+            QtWidgets.QMessageBox.warning(self, "Error", f"Could not purge cache: {e}")
+            return
+        QtWidgets.QMessageBox.information(self, "Done", f"Thumbnail cache purged ({freed / (1024 * 1024):.1f} MB freed).")
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self.first_painted:
+            self.first_painted = True
+            # Posted from inside the paint pass, so it runs once the whole first frame is on screen
+            QTimer.singleShot(0, self.on_first_interactive)
+
     def closeEvent(self, event):
+        # Let workers finish their current file before their loaders are destroyed
+        self.list.cancel_thumbnail_loading()
+        self.list.thumbnail_loader.pool.waitForDone()
+        self.preview_loader.shutdown()
+        self.preview.tile_loader.shutdown()
+        self.flipbook.shutdown()
+        self.frame_hasher.shutdown()
+        self.metadata_indexer.shutdown()
+        self.shard_scanner.shutdown()
+        self.renamer.shutdown()
+        self.search_runner.shutdown()
+        self.folder_watcher.shutdown()
+        self.save_session()
+        if self.trace_path:
+            try:
+                TRACER.export_chrome_trace(self.trace_path)
+            except OSError:
+                pass
         self.settings.setValue("geometry", self.saveGeometry())
         self.settings.setValue("windowState", self.saveState())
         if self.folder:
             self.settings.setValue("last_folder", self.folder)
         super().closeEvent(event)
 
+    def restore_session(self):
+        """Paint the last session from its snapshot; the folder itself is scanned after the first paint"""
+        snapshot = load_snapshot(default_snapshot_path(), self.folder)
+        if snapshot is None:
+            return
+        with TRACER.span("restore_session", images=len(snapshot["names"])):
+            size = snapshot.get("thumbnail_size")
+            if isinstance(size, int) and THUMB_MIN <= size <= THUMB_MAX:
+                self.thumb_slider.setValue(size)
+            # Thumbnails come from the disk cache; nothing is listed or decoded before the first paint
+            self.list.set_paths([os.path.join(self.folder, name) for name in snapshot["names"]])
+            self.pending_baseline = snapshot["baseline"]
+            row = snapshot.get("current_row")
+            if isinstance(row, int) and 0 <= row < self.list.count():
+                self.list.select_rows([row], current=row)
+                QTimer.singleShot(0, lambda: self.list.scroll_to_row(row, QAbstractItemView.PositionAtCenter))
+        self.status_label.setText(f"Restored {self.list.count()} images – checking folder…")
+        self.setWindowTitle(f"Image Scene Flow Organizer — {self.list.count()} images")
+
+    def save_session(self):
+        if not self.folder or self.list.count() == 0:
+            return
+        model = self.list.image_model
+        baseline = self.pending_baseline if self.pending_baseline is not None else self.folder_watcher.baseline
+        try:
+            save_snapshot(default_snapshot_path(), self.folder, [model.name(r) for r in range(model.rowCount())],
+                          baseline, self.list.thumbnail_size, self.list.first_selected_row())
+        except OSError:
+            pass  # Next launch simply loads the folder
+
+    def on_first_interactive(self):
+        if self.startup_ms is not None:
+            return  # Already started from the first paint
+        self.startup_ms = (time.perf_counter() - LAUNCH_TIME) * 1000
+        if TRACER.enabled:
+            TRACER.add("startup", int(LAUNCH_TIME * 1e9), int(self.startup_ms * 1e6),
+                       {"restored": self.pending_baseline is not None})
+        if self.pending_baseline is not None:
+            self.folder_watcher.watch(self.folder, self.pending_baseline)  # Background scan → on_folder_reconciled
+            self.pending_baseline = None
+        elif self.folder and self.list.count() == 0:
+            self.load_folder_contents()
+        self.index_metadata()
+        if self.workspace is not None:
+            self.rescan_workspace()  # The shard list fills in the background
+        self.recover_interrupted_renames()
+
+    def on_folder_reconciled(self, added, removed, modified):
+        """Folder as it is now vs the restored session - applied in place, the order is kept"""
+        model = self.list.image_model
+        present = {model.name(r) for r in range(model.rowCount())}
+        added = [name for name in added if name not in present]
+        if added or removed or modified:
+            self.apply_folder_changes(added, removed, modified)
+        else:
+            self.update_status_label(in_sync=True)
+
     def reset_search_index(self, search_bar):
-        self.last_search_index[search_bar] = -1
+        self.active_search_bar = search_bar
+        self.search_count_timers[search_bar].start()  # Live match count, coalesced while typing
+
+    def search_query(self, search_bar):
+        text = self.search_input1.text() if search_bar == 1 else self.search_input2.text()
+        text = text.strip()
+        return text.lower() if self.search_mode(search_bar) == "Text" else text
+
+    def search_mode(self, search_bar):
+        return (self.search_mode1 if search_bar == 1 else self.search_mode2).currentText()
+
+    def change_search_mode(self, search_bar, mode):
+        self.settings.setValue(f"search_mode_{search_bar}", mode)
+        self.active_search_bar = search_bar
+        self.update_search_count(search_bar)
+
+    def update_search_count(self, search_bar):
+        """Refresh a bar's match set and show "k of N matches" (k once the user has stepped through them).
+
+        Text matches come from the name index right away; regex / glob / fuzzy match sets are
+        computed in the background and land in on_matches_ready.
+        """
+        label = self.search_count1 if search_bar == 1 else self.search_count2
+        query = self.search_query(search_bar)
+        cursor = self.search_cursors[search_bar]
+        if not query:
+            label.setText("")
+            cursor.set_rows(None, "Text", -1, [])
+            self.update_search_highlight(search_bar)
+            return
+        mode = self.search_mode(search_bar)
+        index = self.list.image_model.search_index()
+        if mode == "Text":
+            cursor.update(query, index)
+        elif not cursor.is_current(query, mode, index):
+            label.setText("Searching…")
+            self.search_runner.submit(search_bar, query, mode, index.version, index.names)
+            return
+        self.show_search_count(search_bar)
+
+    def show_search_count(self, search_bar):
+        label = self.search_count1 if search_bar == 1 else self.search_count2
+        cursor = self.search_cursors[search_bar]
+        label.setToolTip("")
+        if not cursor.rows:
+            label.setText("No matches")
+        elif cursor.pos is None:
+            label.setText(f"{len(cursor.rows)} match" + ("es" if len(cursor.rows) > 1 else ""))
+        else:
+            label.setText(f"{cursor.pos + 1} of {len(cursor.rows)}")
+        self.update_search_highlight(search_bar)
+
+    def on_matches_ready(self, search_bar, query, mode, version, rows, error):
+        if query != self.search_query(search_bar) or mode != self.search_mode(search_bar):
+            return  # The user typed on; a newer search is queued
+        if version != self.list.image_model.search_index().version:
+            self.update_search_count(search_bar)  # Rows changed while matching - run again
+            return
+        self.search_cursors[search_bar].set_rows(query, mode, version, rows)
+        if error:
+            self.pending_search_steps.pop(search_bar, None)
+            self.update_search_highlight(search_bar)
+            label = self.search_count1 if search_bar == 1 else self.search_count2
+            label.setText("Invalid pattern")
+            label.setToolTip(error)
+            return
+        if search_bar in self.pending_search_steps:
+            self.search_image(search_bar, self.pending_search_steps.pop(search_bar))
+        else:
+            self.show_search_count(search_bar)
+
+    def update_search_highlight(self, search_bar):
+        if search_bar == self.active_search_bar:
+            self.list.image_model.set_highlighted(self.search_cursors[search_bar].rows)
+
+    def select_all_matches(self, search_bar):
+        """Select every match at once (e.g. to move them all to the top)"""
+        self.active_search_bar = search_bar
+        cursor = self.search_cursors[search_bar]
+        if not cursor.is_current(self.search_query(search_bar), self.search_mode(search_bar),
+                                 self.list.image_model.search_index()):
+            self.update_search_count(search_bar)
+        if not cursor.rows or cursor.query != self.search_query(search_bar):
+            return  # Nothing matches, or the background search hasn't finished yet
+        first = min(cursor.rows)
+        self.list.select_rows(cursor.rows, current=first)
+        self.list.scroll_to_row(first, QAbstractItemView.PositionAtCenter)
+
+    def refresh_search_counts(self):
+        for search_bar in (1, 2):
+            self.update_search_count(search_bar)
 
     def handle_double_left_click(self, name, path):
         name_without_ext = os.path.splitext(name)[0]
         self.search_input1.setText(name_without_ext)
         self.preview_locked = True
-        if os.path.exists(path):
-            pix = QtGui.QPixmap(path)
-            if not pix.isNull():
-                scaled = pix.scaled(self.preview.size() - QtCore.QSize(20, 20),
-                                    Qt.KeepAspectRatio, Qt.SmoothTransformation)
-                self.preview.setPixmap(scaled)
+        self.request_preview(path)
 
     def handle_double_right_click(self, name):
         name_without_ext = os.path.splitext(name)[0]
@@ -562,48 +3071,311 @@ class ImageOrganizer(QtWidgets.QMainWindow):
         folder = QtWidgets.QFileDialog.getExistingDirectory(self, "Select Image Folder", start_dir)
         if not folder:
             return
+        self.close_workspace()
         self.folder = folder
         self.load_folder_contents()
 
-    def load_folder_contents(self):
+    def load_folder_contents(self, shard_state=None):
+        """List self.folder into the grid; shard_state (names, baseline) reopens a workspace shard in the
+        order it was left, and the folder is reconciled against its baseline in the background"""
         if not self.folder:
             return
-        self.progress_bar.setVisible(True)
-        self.progress_bar.setValue(0)
-        QApplication.processEvents()
-        self.list.clear()
-        self.list.thumbnail_cache.clear()
-        files = [f for f in os.listdir(self.folder) if os.path.splitext(f)[1].lower() in SUPPORTED_EXT]
-        files.sort(key=natural_key)
-        total_files = len(files)
-        for idx, f in enumerate(files):
-            path = os.path.join(self.folder, f)
-            item = QtWidgets.QListWidgetItem(os.path.basename(f))
-            item.setData(Qt.UserRole, path)
-            item.setIcon(self.list.get_thumbnail_icon(path))
-            self.list.addItem(item)
-            progress = int(((idx + 1) / total_files) * 100) if total_files > 0 else 100
-            self.progress_bar.setValue(progress)
-            QApplication.processEvents()
-        self.progress_bar.setVisible(False)
-        self.current_folder_files = set(files)
+        with TRACER.span("load_folder_contents"):
+            if shard_state is None:
+                with TRACER.span("list_images"):
+                    files = list_images(self.folder)
+            else:
+                files = shard_state[0]
+            # Cancels thumbnails still loading for the previous folder; rows show placeholders
+            # until worker threads deliver the thumbnails the view asks for
+            self.list.set_paths([os.path.join(self.folder, f) for f in files])
+            self.folder_watcher.watch(self.folder, None if shard_state is None else shard_state[1])
+            self.pending_baseline = None
+            self.frame_hasher.cancel()  # Hashing, grouping and ordering were for the previous folder
+            self.metadata_indexer.cancel()
+            self.pending_sort = None
+            if self.duplicates_dialog is not None:
+                self.duplicates_dialog.close()
         self.update_status_label(in_sync=True)
         self.setWindowTitle(f"Image Scene Flow Organizer — {len(files)} images")
+        self.index_metadata()
+
+    def open_workspace_root(self):
+        root = QtWidgets.QFileDialog.getExistingDirectory(self, "Select Workspace Root", self.folder or "")
+        if root:
+            self.open_workspace([root], True, [root])
+
+    def open_workspace_file(self):
+        path, _ = QtWidgets.QFileDialog.getOpenFileName(self, "Open Workspace", self.folder or "",
+                                                        f"Scene workspaces (*{WORKSPACE_SUFFIX})")
+        if not path:
+            return
+        folders = load_workspace(path)
+        if not folders:
+            QtWidgets.QMessageBox.warning(self, "Open Workspace", "This workspace file could not be read.")
+            return
+        self.open_workspace(folders, False, [os.path.dirname(path)])
+
+    def save_workspace_file(self):
+        if self.shard_list.count() == 0:
+            QtWidgets.QMessageBox.information(self, "Save Workspace", "Open a workspace first.")
+            return
+        path, _ = QtWidgets.QFileDialog.getSaveFileName(self, "Save Workspace As", self.workspace["labels"][0],
+                                                        f"Scene workspaces (*{WORKSPACE_SUFFIX})")
+        if not path:
+            return
+        if not path.endswith(WORKSPACE_SUFFIX):
+            path += WORKSPACE_SUFFIX
+        folders = [self.shard_list.folder(self.shard_list.item(row)) for row in range(self.shard_list.count())]
+        try:
+            save_workspace(path, folders)
+        except OSError as e:
+            QtWidgets.QMessageBox.warning(self, "Save Workspace", f"Could not save the workspace:\n{e}")
+
+    def open_workspace(self, folders, recursive, labels):
+        """Scan folders (recursively for a root) for shards; labels are the folders shard names are relative to"""
+        self.shard_states.clear()
+        self.workspace = {"roots": folders, "recursive": recursive, "labels": labels}
+        self.settings.setValue("workspace", json.dumps(self.workspace))
+        self.rescan_workspace()
+
+    def rescan_workspace(self):
+        if self.workspace is None:
+            return
+        self.shard_list.clear()
+        self.shard_list.setVisible(True)
+        self.status_label.setText("Scanning workspace…")
+        self.shard_scanner.scan(self.workspace["roots"], self.workspace["recursive"])
+
+    def on_shards_ready(self, shards):
+        """List the shards; the one on screen stays, otherwise the first shard is opened"""
+        labels = self.workspace["labels"]
+        self.shard_list.blockSignals(True)
+        self.shard_list.clear()
+        for shard in shards:
+            label = shard_label(shard.folder, labels)
+            item = QtWidgets.QListWidgetItem(f"{label}  ({shard.images})")
+            item.setData(Qt.UserRole, shard.folder)
+            item.setData(Qt.UserRole + 1, label)
+            item.setToolTip(shard.folder)
+            self.shard_list.addItem(item)
+        current = self.shard_list.item_for(self.folder) if self.folder else None
+        if current is not None:
+            self.shard_list.setCurrentItem(current)
+        self.shard_list.blockSignals(False)
+        if not shards:
+            self.update_status_label(in_sync=True)
+            QtWidgets.QMessageBox.information(self, "Open Workspace", "No images were found in the workspace.")
+        elif current is None:
+            self.shard_list.setCurrentRow(0)  # → open_shard
+        else:
+            self.update_status_label(in_sync=True)
+
+    def on_shard_counts(self, counts):
+        for folder, count in counts.items():
+            self.shard_list.set_count(folder, count)
+
+    def close_workspace(self):
+        if self.workspace is None:
+            return
+        self.workspace = None
+        self.settings.remove("workspace")
+        self.shard_scanner.cancel()
+        self.shard_states.clear()
+        self.shard_list.clear()
+        self.shard_list.setVisible(False)
+
+    def open_shard(self, folder):
+        """Show another shard; the one being left keeps only its order (names) and folder baseline"""
+        if self.folder and path_key(folder) == path_key(self.folder):
+            return
+        if self.rename_busy():
+            self.shard_list.blockSignals(True)
+            self.shard_list.setCurrentItem(self.shard_list.item_for(self.folder))
+            self.shard_list.blockSignals(False)
+            return
+        if self.folder and self.list.count() and self.shard_list.item_for(self.folder) is not None:
+            model = self.list.image_model
+            baseline = self.pending_baseline if self.pending_baseline is not None else self.folder_watcher.baseline
+            self.shard_states[path_key(self.folder)] = ([model.name(r) for r in range(model.rowCount())], baseline)
+        self.folder = folder
+        self.load_folder_contents(self.shard_states.pop(path_key(folder), None))
+
+    def move_frames_to_shard(self, folder, rows):
+        """Move the frames in rows into another shard's folder: one planned, journaled batch of file moves"""
+        if not self.folder or path_key(folder) == path_key(self.folder) or self.rename_busy():
+            return
+        model = self.list.image_model
+        try:
+            on_disk = os.listdir(self.folder)
+            target_listing = os.listdir(folder)
+        except OSError as e:
+            QtWidgets.QMessageBox.warning(self, "Move Frames", f"Could not read the folders:\n{e}")
+            return
+        present = set(on_disk)
+        names = [model.name(r) for r in rows if r < model.rowCount() and model.name(r) in present]
+        if not names:
+            return
+        label = shard_label(folder, self.workspace["labels"]) if self.workspace else folder
+        if QtWidgets.QMessageBox.question(self, "Move Frames", f"Move {len(names)} images to\n{label}?",
+                                          QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No) != QtWidgets.QMessageBox.Yes:
+            return
+        moves = transfer_moves(names, self.folder, folder, target_listing)
+
+        def finished(plan, locations, failures, cancelled):
+            # Moved rows now point into the other folder; they leave this grid (the shard picks them up
+            # when it is opened again)
+            target = path_key(folder)
+            moved = [where for where in locations.values() if path_key(os.path.dirname(where)) == target]
+            model.remove_paths(moved)
+            self.shard_list.set_count(self.folder, self.list.count())
+            self.shard_list.set_count(folder, count_images([folder])[folder])
+            self.setWindowTitle(f"Image Scene Flow Organizer — {self.list.count()} images")
+            if cancelled or failures:
+                self.show_rename_result("Move Frames", f"Moved {len(moved)} images.", plan, failures, cancelled)
+
+        self.execute_renames(moves, on_disk, finished, [os.path.join(folder, f) for f in target_listing])
+
+    def update_load_progress(self, done, total):
+        if self.renamer.is_running() or self.frame_hasher.is_hashing():
+            return  # The bar shows rename / hashing progress meanwhile
+        self.progress_bar.setVisible(done < total)
+        self.progress_bar.setValue(int(done / total * 100) if total > 0 else 100)
+        stats = self.list.image_model.thumbnail_cache.stats()
+        self.status_label.setToolTip(
+            f"Thumbnail memory: {stats['used_bytes'] / (1024 * 1024):.0f} / "
+            f"{stats['budget_bytes'] / (1024 * 1024):.0f} MB ({stats['entries']} images)\n"
+            f"Hits: {stats['hits']} | Misses: {stats['misses']} | Evictions: {stats['evictions']}")
+
+    def update_hash_progress(self, done, total):
+        if self.renamer.is_running():
+            return
+        self.progress_bar.setVisible(done < total)
+        self.progress_bar.setValue(int(done / total * 100) if total > 0 else 100)
+
+    def index_metadata(self):
+        """Index the rows the metadata index doesn't cover yet (cached files only cost a stat)"""
+        model = self.list.image_model
+        missing = [record.path for record in model.records if record.path not in model.metadata]
+        if missing:
+            self.metadata_indexer.index(missing)
+
+    def on_metadata_indexed(self):
+        if self.pending_sort is not None:
+            key, self.pending_sort = self.pending_sort, None
+            self.list.image_model.sort_by_metadata(key)
+        if FRAME_FILTERS[self.filter_combo.currentText()] is not None:
+            self.apply_frame_filter()
+
+    def sort_frames(self, index):
+        """One reorder by the picked order; never re-reads files"""
+        choice = self.sort_combo.itemText(index)
+        self.sort_combo.setCurrentIndex(0)
+        model = self.list.image_model
+        if index == 0 or not model.records:
+            return
+        if choice == "Name":
+            model.sort_by_name()
+        elif self.metadata_indexer.is_running():
+            self.pending_sort = SORT_KEYS[choice]  # Applied once the index is complete
+        else:
+            model.sort_by_metadata(SORT_KEYS[choice])
+        self.list.scrollToTop()
+
+    def apply_frame_filter(self):
+        """Hide the rows the filter rejects (rows without metadata yet are hidden too)"""
+        test = FRAME_FILTERS[self.filter_combo.currentText()]
+        selected = self.list.selected_rows()
+        current = self.list.current_row()
+        # reset() drops every hidden row at once; un-hiding row by row is quadratic in QListView
+        self.list.reset()
+        rejected = set(self.list.image_model.rows_rejected_by(test)) if test is not None else set()
+        for row in rejected:
+            self.list.setRowHidden(row, True)
+        visible = [row for row in selected if row not in rejected]
+        if visible:
+            self.list.select_rows(visible, current=current if current in visible else visible[0])
 
     def check_for_new_files(self):
         if not self.folder or not os.path.isdir(self.folder):
             return
-        current_files = [f for f in os.listdir(self.folder) if os.path.splitext(f)[1].lower() in SUPPORTED_EXT]
-        current_set = set(current_files)
+        with TRACER.span("check_for_new_files"):
+            self.folder_watcher.poll()
 
-        if current_set == self.current_folder_files:
+    def on_folder_changed(self, added, removed, modified):
+        """Delta between the folder and the grid; applied in place when live sync is on"""
+        if not (added or removed or modified):
             self.update_status_label(in_sync=True)
+        elif self.live_sync_checkbox.isChecked():
+            self.apply_folder_changes(added, removed, modified)
         else:
-            added = current_set - self.current_folder_files
-            removed = self.current_folder_files - current_set
-            self.update_status_label(in_sync=False, added_count=len(added), removed_count=len(removed))
+            self.update_status_label(in_sync=False, added_count=len(added), removed_count=len(removed),
+                                     modified_count=len(modified))
+
+    def apply_folder_changes(self, added, removed, modified):
+        """Insert, drop and re-thumbnail rows without reloading the grid (order is kept)"""
+        model = self.list.image_model
+        model.remove_paths([os.path.join(self.folder, f) for f in removed])
+        model.refresh_thumbnails([os.path.join(self.folder, f) for f in modified])
+        model.insert_paths_sorted([os.path.join(self.folder, f) for f in added])
+        self.folder_watcher.accept()
+        self.index_metadata()
+        if self.preview_path and os.path.basename(self.preview_path) in modified and not self.preview_locked:
+            self.request_preview(self.preview_path)
+        self.update_status_label(in_sync=True)
+        self.setWindowTitle(f"Image Scene Flow Organizer — {self.list.count()} images")
 
-    def update_status_label(self, in_sync=True, added_count=0, removed_count=0):
+    def toggle_live_sync(self, checked):
+        self.settings.setValue("live_folder_sync", checked)
+        if checked:
+            self.folder_watcher.check()  # Apply whatever is pending right away
+
+    def toggle_stats(self, checked):
+        self.settings.setValue("show_stats", checked)
+        TRACER.enable(checked or bool(self.trace_path))
+        self.stats_label.setVisible(checked)
+        self.save_trace_btn.setVisible(checked)
+        if checked:
+            self.stats_sample = (time.perf_counter(), self.list.thumbnail_loader.decoded_count)
+            self.update_stats_panel()
+            self.stats_timer.start()
+        else:
+            self.stats_timer.stop()
+
+    def update_stats_panel(self):
+        loader = self.list.thumbnail_loader
+        now = time.perf_counter()
+        then, decoded_then = self.stats_sample
+        self.stats_sample = (now, loader.decoded_count)
+        rate = (loader.decoded_count - decoded_then) / (now - then) if now > then else 0.0
+        stats = self.list.image_model.thumbnail_cache.stats()
+        lookups = stats["hits"] + stats["misses"]
+        hit_rate = f"{stats['hits'] * 100 // lookups}%" if lookups else "–"
+        memory = process_memory_mb()
+        memory_text = f"{memory:.0f} MB" if memory is not None else "–"
+        self.stats_label.setText(f"Decode {rate:.0f}/s | Queue {len(loader.busy_paths)} | "
+                                 f"Hit {hit_rate} | Mem {memory_text}")
+        self.stats_label.setToolTip(
+            f"Images decoded: {loader.decoded_count} ({loader.disk_hit_count} from the disk cache)\n"
+            f"Thumbnail memory: {stats['used_bytes'] / (1024 * 1024):.0f} / "
+            f"{stats['budget_bytes'] / (1024 * 1024):.0f} MB ({stats['entries']} images)\n"
+            f"Trace events recorded: {len(TRACER.events)}" +
+            (f"\nStartup: {self.startup_ms:.0f} ms to first interactive" if self.startup_ms is not None else ""))
+
+    def save_trace(self):
+        path, _ = QtWidgets.QFileDialog.getSaveFileName(self, "Save Trace", "scene_master_trace.json",
+                                                        "Chrome trace (*.json)")
+        if not path:
+            return
+        try:
+            count = TRACER.export_chrome_trace(path)
+        except OSError as e:
+            QtWidgets.QMessageBox.warning(self, "Error", f"Could not save the trace:\n{e}")
+            return
+        QtWidgets.QMessageBox.information(self, "Trace Saved",
+                                          f"{count} events saved.\nOpen it in chrome://tracing or ui.perfetto.dev.")
+
+    def update_status_label(self, in_sync=True, added_count=0, removed_count=0, modified_count=0):
         if not self.folder:
             self.status_label.setText("No folder opened")
             self.status_label.setStyleSheet(
@@ -622,6 +3394,8 @@ class ImageOrganizer(QtWidgets.QMainWindow):
                 parts.append(f"{added_count} added")
             if removed_count > 0:
                 parts.append(f"{removed_count} removed")
+            if modified_count > 0:
+                parts.append(f"{modified_count} modified")
             msg = " | ".join(parts) if parts else "Changes detected"
             self.status_label.setText(f"⚠ {msg} – Reload recommended")
             self.status_label.setStyleSheet(
@@ -632,6 +3406,8 @@ class ImageOrganizer(QtWidgets.QMainWindow):
         if not self.folder or self.list.count() == 0:
             QtWidgets.QMessageBox.warning(self, "Error", "No folder loaded!")
             return
+        if self.rename_busy():
+            return
         reply = QtWidgets.QMessageBox.question(
             self, "Reload Folder",
             "This will:\n1. Rename all current images to 1,2,3...\n2. Load any new images from the folder\n\nContinue?",
@@ -639,175 +3415,305 @@ class ImageOrganizer(QtWidgets.QMainWindow):
         )
         if reply != QtWidgets.QMessageBox.Yes:
             return
+        model = self.list.image_model
+        on_disk = os.listdir(self.folder)
+        present = set(on_disk)
+        rows = [r for r in range(self.list.count()) if model.name(r) in present]
+        moves, new_sources = reload_moves(self.folder, [model.name(r) for r in rows], on_disk)
+
+        def finished(plan, locations, failures, cancelled):
+            if cancelled:
+                self.show_rename_result("Reload Folder", "", plan, failures, cancelled)
+                return
+            new_paths = [locations.get(src, src) for src in new_sources]  # Loaded even if their rename failed
+            model.append_paths(new_paths)
+            model.sort_by_name()
+            self.index_metadata()
+            self.update_status_label(in_sync=True)
+            self.setWindowTitle(f"Image Scene Flow Organizer — {self.list.count()} images")
+            self.show_rename_result("Success",
+                                    f"Folder reloaded! Existing files renamed, {len(new_paths)} new files added.",
+                                    plan, failures, cancelled)
+
+        self.execute_renames(moves, on_disk, finished)
+
+    def rename_busy(self):
+        if self.renamer.is_running():
+            QtWidgets.QMessageBox.warning(self, "Busy", "A rename is still in progress.")
+            return True
+        return False
+
+    def execute_renames(self, moves, on_disk, on_done, occupied=()):
+        """Rename [(src, dst), ...] on a worker thread with the fewest file operations.
+
+        on_disk is the folder listing (occupied: other existing paths, e.g. the target folder of a move);
+        targets taken by other files are left alone (reported as failures).
+        Rows follow their files; on_done(plan, locations, failures, cancelled) runs afterwards on the
+        GUI thread - see rename_planner.
+        """
+        with TRACER.span("plan_renames", moves=len(moves)):
+            plan = plan_renames(moves, [os.path.join(self.folder, f) for f in on_disk] + list(occupied))
+        self.folder_watcher.suspend()  # Our own renames are not folder changes
+
+        def finished(plan, locations, failures, cancelled):
+            self.progress_bar.setVisible(False)
+            self.cancel_rename_btn.setVisible(False)
+            with TRACER.span("update_record_paths", files=len(locations)):
+                self.update_record_paths(locations)
+            self.preview_loader.clear()
+            self.search_refresh_timer.start()
+            on_done(plan, locations, failures, cancelled)
+            self.folder_watcher.resync()
+
+        try:
+            self.renamer.start(plan, finished)
+        except OSError as e:
+            self.folder_watcher.resync()
+            QtWidgets.QMessageBox.warning(self, "Error", f"Could not write the rename journal, nothing was renamed:\n{e}")
+            return
+        self.progress_bar.setValue(0)
         self.progress_bar.setVisible(True)
+        self.cancel_rename_btn.setVisible(True)
+
+    def update_rename_progress(self, done, total):
+        self.progress_bar.setValue(int(done / total * 100) if total > 0 else 100)
+
+    def update_record_paths(self, locations):
+        """Point rows at wherever their files ended up"""
+        model = self.list.image_model
+        moves = {}
+        for row in range(model.rowCount()):
+            where = locations.get(model.path(row))
+            if where is not None and where != model.path(row):
+                moves[row] = where
+        model.set_record_paths(moves)
+
+    def show_rename_result(self, title, message, plan, failures, cancelled):
+        """Summary of a finished batch; failed files are listed in the details"""
+        if cancelled:
+            QtWidgets.QMessageBox.information(self, "Cancelled", "Rename cancelled – the folder was left unchanged.")
+            return
+        stats = plan.stats()
+        text = f"{message}\n\n{stats['renames']} file operations ({stats['skipped']} already in place)"
+        if not failures:
+            QtWidgets.QMessageBox.information(self, title, text)
+            return
+        box = QtWidgets.QMessageBox(QtWidgets.QMessageBox.Warning, title,
+                                    f"{text}\n{len(failures)} files could not be renamed (see details).", parent=self)
+        box.setDetailedText("\n".join(f"{os.path.basename(origin)} → {os.path.basename(target)}: {error}"
+                                      for origin, target, error in failures))
+        box.exec_()
+
+    def recover_interrupted_renames(self):
+        """Offer to finish or undo a rename batch that a crash interrupted"""
+        loaded = self.renamer.journal.load()
+        if loaded is None:
+            return
+        plan, done, failed = loaded
+        if not done:
+            self.renamer.journal.finish()  # Nothing was renamed yet
+            return
+        folder = os.path.dirname(plan.steps[0][0])
+        box = QtWidgets.QMessageBox(
+            QtWidgets.QMessageBox.Warning, "Interrupted Rename",
+            f"A rename in\n{folder}\nwas interrupted after {len(done)} of {len(plan.steps)} steps.\n\n"
+            "Finish it, or undo the steps already taken?", parent=self)
+        finish_btn = box.addButton("Finish", QtWidgets.QMessageBox.AcceptRole)
+        undo_btn = box.addButton("Undo", QtWidgets.QMessageBox.DestructiveRole)
+        box.addButton("Later", QtWidgets.QMessageBox.RejectRole)
+        box.exec_()
+        if box.clickedButton() not in (finish_btn, undo_btn):
+            return
+        roll_forward = box.clickedButton() is finish_btn
+
+        def finished(plan, locations, failures, cancelled):
+            self.progress_bar.setVisible(False)
+            if self.folder and os.path.normcase(self.folder) == os.path.normcase(folder):
+                self.load_folder_contents()
+            if failures:
+                self.show_rename_result("Interrupted Rename", "Rename finished.", plan, failures, False)
+                return
+            stranded = [o for o, where in locations.items() if where != o] if not roll_forward else []
+            if stranded:
+                message = (f"{len(stranded)} files could not be moved back; "
+                           "you will be asked again on the next launch.")
+            else:
+                message = "Rename finished." if roll_forward else "Rename undone – files have their original names again."
+            QtWidgets.QMessageBox.information(self, "Interrupted Rename", message)
+
         self.progress_bar.setValue(0)
-        QApplication.processEvents()
-        temp_paths = []
-        total_operations = self.list.count()
-        for i in range(self.list.count()):
-            item = self.list.item(i)
-            old_path = item.data(Qt.UserRole)
-            if not os.path.exists(old_path):
-                continue
-            ext = os.path.splitext(old_path)[1]
-            tmp_path = os.path.join(self.folder, f"__TMP_RENAME_{i}{ext}")
-            try:
-                os.rename(old_path, tmp_path)
-                if old_path in self.list.thumbnail_cache:
-                    self.list.thumbnail_cache[tmp_path] = self.list.thumbnail_cache.pop(old_path)
-                item.setData(Qt.UserRole, tmp_path)
-                temp_paths.append((item, tmp_path, ext))
-                progress = int(((i + 1) / (total_operations * 2)) * 100)
-                self.progress_bar.setValue(progress)
-                QApplication.processEvents()
-            except Exception:
-                continue
-        new_files = [f for f in os.listdir(self.folder) if
-                     os.path.splitext(f)[1].lower() in SUPPORTED_EXT and not f.startswith("__TMP_RENAME_")]
-        new_files.sort(key=natural_key)
-        new_paths = []
-        counter = 0
-        for f in new_files:
-            old_new_path = os.path.join(self.folder, f)
-            ext = os.path.splitext(f)[1]
-            new_name = f"generic_{counter:06d}{ext}"
-            new_path = os.path.join(self.folder, new_name)
-            while os.path.exists(new_path):
-                counter += 1
-                new_name = f"generic_{counter:06d}{ext}"
-                new_path = os.path.join(self.folder, new_name)
-            try:
-                os.rename(old_new_path, new_path)
-                new_paths.append(new_path)
-            except Exception:
-                pass
-            counter += 1
-        num_counter = 1
-        for idx, (item, tmp_path, ext) in enumerate(temp_paths):
-            if not os.path.exists(tmp_path):
-                continue
-            new_name = f"{num_counter}{ext}"
-            new_path = os.path.join(self.folder, new_name)
-            while os.path.exists(new_path):
-                num_counter += 1
-                new_name = f"{num_counter}{ext}"
-                new_path = os.path.join(self.folder, new_name)
-            try:
-                os.rename(tmp_path, new_path)
-                item.setData(Qt.UserRole, new_path)
-                item.setText(new_name)
-                if tmp_path in self.list.thumbnail_cache:
-                    self.list.thumbnail_cache[new_path] = self.list.thumbnail_cache.pop(tmp_path)
-                progress = 50 + int(((idx + 1) / total_operations) * 50)
-                self.progress_bar.setValue(progress)
-                QApplication.processEvents()
-            except Exception:
-                pass
-            num_counter += 1
-        for new_path in new_paths:
-            f = os.path.basename(new_path)
-            item = QtWidgets.QListWidgetItem(f)
-            item.setData(Qt.UserRole, new_path)
-            item.setIcon(self.list.get_thumbnail_icon(new_path))
-            self.list.addItem(item)
-        items = []
-        for _ in range(self.list.count()):
-            items.append(self.list.takeItem(0))
-        items.sort(key=lambda it: natural_key(it.text()))
-        for it in items:
-            self.list.addItem(it)
-        self.progress_bar.setValue(100)
-        QApplication.processEvents()
-        self.progress_bar.setVisible(False)
-        final_files = [f for f in os.listdir(self.folder) if os.path.splitext(f)[1].lower() in SUPPORTED_EXT]
-        self.current_folder_files = set(final_files)
-        self.update_status_label(in_sync=True)
-        self.setWindowTitle(f"Image Scene Flow Organizer — {self.list.count()} images")
-        QtWidgets.QMessageBox.information(self, "Success",
-                                          f"Folder reloaded! Existing files renamed, {len(new_paths)} new files added.")
+        self.progress_bar.setVisible(True)
+        self.renamer.recover(plan, done, failed, roll_forward, finished)
 
     def update_thumb_size(self, val):
         self.thumb_label.setText(f"Thumbnail Size: {val}px")
         self.list.setThumbnailSize(val)
 
     def update_preview(self):
-        if self.preview_locked:
+        with TRACER.span("update_preview"):
+            if self.preview_locked or self.flipbook.is_playing():
+                return
+            row = self.list.first_selected_row()
+            if row < 0:
+                self.preview_path = None
+                self.preview.set_path(None)
+                self.preview.setText("Preview\n(Double LEFT-click: lock | Double RIGHT-click: unlock)")
+                self.preview.setPixmap(QtGui.QPixmap())
+                return
+            model = self.list.image_model
+            total = model.rowCount()
+            # Direction of travel (arrow keys wrap around at the ends)
+            delta = row - self.last_preview_row
+            forward = delta >= 0 if abs(delta) <= total // 2 else delta < 0
+            self.last_preview_row = row
+            step = 1 if forward else -1
+            neighbours = [(row + step * i) % total for i in range(1, PREVIEW_PREFETCH_AHEAD + 1)]
+            neighbours += [(row - step * i) % total for i in range(1, PREVIEW_PREFETCH_BEHIND + 1)]
+            prefetch = [model.path(r) for r in neighbours if r != row]
+            self.request_preview(model.path(row), prefetch)
+
+    def request_preview(self, path, prefetch_paths=()):
+        """Ask the preview loader for path at label size; it arrives in on_preview_ready"""
+        self.preview_path = path
+        box = self.preview.size() - QtCore.QSize(20, 20)
+        self.preview_loader.request(path, box, prefetch_paths)
+
+    def on_preview_ready(self, path, image):
+        if path != self.preview_path or image.isNull():
+            return  # A newer request superseded this one
+        self.preview.setPixmap(QtGui.QPixmap.fromImage(image))
+        self.preview.set_path(path)
+
+    def toggle_playback(self):
+        """Play / pause the flipbook over the selected frames (two or more), else over every visible frame"""
+        if self.flipbook.is_playing():
+            self.flipbook.stop()  # → on_playback_stopped
             return
-        sel = self.list.selectedItems()
-        if not sel:
-            self.preview.setText("Preview\n(Double LEFT-click: lock | Double RIGHT-click: unlock)")
-            self.preview.setPixmap(QtGui.QPixmap())
+        rows = self.list.selected_rows()
+        self.flipbook_ranged = len(rows) > 1
+        if not self.flipbook_ranged:
+            rows = [r for r in range(self.list.count()) if not self.list.isRowHidden(r)]
+        if not rows:
             return
-        path = sel[0].data(Qt.UserRole)
-        if os.path.exists(path):
-            pix = QtGui.QPixmap(path)
-            if not pix.isNull():
-                scaled = pix.scaled(self.preview.size() - QtCore.QSize(20, 20),
-                                    Qt.KeepAspectRatio, Qt.SmoothTransformation)
-                self.preview.setPixmap(scaled)
+        current = self.list.current_row()
+        start = rows.index(current) if current in rows else 0
+        model = self.list.image_model
+        box = self.preview.size() - QtCore.QSize(20, 20)
+        self.flipbook.play([model.path(r) for r in rows], start, FPS_CHOICES[self.fps_combo.currentIndex()],
+                           self.playback_mode_combo.currentText(), box)
+        self.play_btn.setText("❚❚ Pause")
+        self.playback_label.setVisible(True)
+
+    def on_flipbook_frame(self, path, image):
+        self.preview_path = path
+        self.preview.setPixmap(QtGui.QPixmap.fromImage(image))
+        self.preview.set_path(path)
+
+    def show_playback_stats(self, stats):
+        text = (f"{stats['frame'] + 1}/{stats['frames']}  {stats['fps']:.1f}/{stats['target_fps']} fps  "
+                f"dropped {stats['dropped']}  buffer {stats['buffered']}/{stats['capacity']}")
+        self.playback_label.setText(text)
+        self.playback_label.setStyleSheet("font-size: 11px; font-family: monospace; color: %s;"
+                                          % ("#ff9f0a" if stats["dropped"] else "#a0a0a0"))
+
+    def on_playback_stopped(self, path):
+        """Land on the frame left on screen (the selection that defined the range is kept)"""
+        self.play_btn.setText("▶ Play")
+        model = self.list.image_model
+        row = next((r for r in range(model.rowCount()) if model.path(r) == path), -1)
+        if row < 0:
+            return
+        if self.flipbook_ranged:
+            self.list.selectionModel().setCurrentIndex(model.index(row), QtCore.QItemSelectionModel.NoUpdate)
+        else:
+            self.list.select_rows([row], current=row)
+        self.list.scroll_to_row(row, QAbstractItemView.PositionAtCenter)
 
     def move_to_top(self):
-        items = sorted(self.list.selectedItems(), key=lambda x: self.list.row(x))
-        if not items: return
-        self.list.setUpdatesEnabled(False)
-        for item in reversed(items):
-            self.list.takeItem(self.list.row(item))
-        for i, item in enumerate(items):
-            self.list.insertItem(i, item)
-            item.setSelected(True)
-        self.list.setUpdatesEnabled(True)
+        rows = self.list.selected_rows()
+        if not rows: return
+        self.list.move_rows(rows, 0)
         self.list.scrollToTop()
 
     def move_to_bottom(self):
-        items = sorted(self.list.selectedItems(), key=lambda x: self.list.row(x))
-        if not items: return
-        self.list.setUpdatesEnabled(False)
-        for item in reversed(items):
-            self.list.takeItem(self.list.row(item))
-        base = self.list.count()
-        for i, item in enumerate(items):
-            self.list.insertItem(base + i, item)
-            item.setSelected(True)
-        self.list.setUpdatesEnabled(True)
+        rows = self.list.selected_rows()
+        if not rows: return
+        self.list.move_rows(rows, self.list.count() - len(rows))
         self.list.scrollToBottom()
 
+    def auto_order(self):
+        """Rough-sequence the selection (or the whole folder) by visual similarity, as one reorder"""
+        count = self.list.count()
+        if not count:
+            QtWidgets.QMessageBox.warning(self, "Error", "No images loaded!")
+            return
+        rows = self.list.selected_rows()
+        if len(rows) < 2:
+            if QtWidgets.QMessageBox.question(
+                    self, "Auto-order by Similarity",
+                    f"Reorder all {count} images by visual similarity?\n\nThe current order is replaced.",
+                    QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No) != QtWidgets.QMessageBox.Yes:
+                return
+            rows = list(range(count))
+        model = self.list.image_model
+        paths = [model.path(r) for r in rows]
+        missing = [p for p in paths if p not in model.frame_hashes and p not in model.failed]
+        if missing:
+            self.progress_bar.setValue(0)
+            self.progress_bar.setVisible(True)
+        self.frame_hasher.hash_paths(missing, lambda: self.sequence_by_similarity(paths))
+
+    def sequence_by_similarity(self, paths):
+        """Chain the hashed frames of paths on a worker, starting from the first one"""
+        model = self.list.image_model
+        hashed = [p for p in paths if p in model.frame_hashes]
+        if len(hashed) < 2:
+            return
+        features = [frame_feature(model.frame_hashes[p]) for p in hashed]
+        self.frame_hasher.run_job("similarity_order", similarity_chain, (features,),
+                                  lambda chain: self.apply_similarity_order(paths, [hashed[i] for i in chain]))
+
+    def apply_similarity_order(self, paths, sequence):
+        """Fill the rows paths occupy now with sequence, then the frames that could not be hashed"""
+        model = self.list.image_model
+        row_of = {record.path: row for row, record in enumerate(model.records)}
+        sequenced = set(sequence)
+        placed = [row_of[p] for p in sequence if p in row_of]
+        placed += [row_of[p] for p in paths if p in row_of and p not in sequenced]
+        if not placed:
+            return
+        slots = sorted(placed)
+        order = list(range(len(model.records)))
+        for slot, row in zip(slots, placed):
+            order[slot] = row
+        self.list.selectionModel().clear()
+        model.apply_order(order)
+        self.list.select_rows(slots, current=slots[0])
+        self.list.scroll_to_row(slots[0])
+
     def rename_ordered(self):
         if not self.folder or self.list.count() == 0:
             QtWidgets.QMessageBox.warning(self, "Error", "No images loaded!")
             return
+        if self.rename_busy():
+            return
         if QtWidgets.QMessageBox.question(self, "Rename All",
                                           f"Rename all {self.list.count()} images to 1, 2, 3, etc.?",
                                           QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No) != QtWidgets.QMessageBox.Yes:
             return
-        temp_paths = []
-        for i in range(self.list.count()):
-            item = self.list.item(i)
-            old = item.data(Qt.UserRole)
-            if not os.path.exists(old):
-                continue
-            ext = os.path.splitext(old)[1]
-            tmp = os.path.join(self.folder, f"__TMP_RENAME_{i}{ext}")
-            try:
-                os.rename(old, tmp)
-                temp_paths.append((item, tmp, ext))
-            except:
-                continue
-        renamed = 0
-        for idx, (item, tmp, ext) in enumerate(temp_paths, start=1):
-            if not os.path.exists(tmp):
-                continue
-            new = os.path.join(self.folder, f"{idx}{ext}")
-            try:
-                os.rename(tmp, new)
-                item.setData(Qt.UserRole, new)
-                item.setText(os.path.basename(new))
-                renamed += 1
-            except:
-                continue
-        QtWidgets.QMessageBox.information(self, "Done", f"Renamed {renamed} images!")
+        model = self.list.image_model
+        on_disk = os.listdir(self.folder)
+        present = set(on_disk)
+        rows = [r for r in range(self.list.count()) if model.name(r) in present]
+        moves = sequence_moves(self.folder, [model.name(row) for row in rows])
+
+        def finished(plan, locations, failures, cancelled):
+            self.show_rename_result("Done", f"Renamed {len(rows) - len(failures)} images!", plan, failures, cancelled)
+
+        self.execute_renames(moves, on_disk, finished)
 
     def rename_selected(self):
-        sel = self.list.selectedItems()
+        sel = self.list.selected_rows()
         if not sel:
             QtWidgets.QMessageBox.warning(self, "No Selection", "Please select at least one image.")
             return
@@ -815,93 +3721,108 @@ class ImageOrganizer(QtWidgets.QMainWindow):
         if not ok or not base.strip():
             return
         base = base.strip()
-        renamed_items = sorted(sel, key=lambda x: self.list.row(x))
+        if self.rename_busy():
+            return
+        model = self.list.image_model
         max_counter = 0
         pattern = re.compile(rf"^{re.escape(base)}_(\d{{6}})\.[a-zA-Z]{{3,4}}$", re.IGNORECASE)
-        for i in range(self.list.count()):
-            name = self.list.item(i).text()
-            match = pattern.match(name)
-            if match:
-                max_counter = max(max_counter, int(match.group(1)))
+        for row in self.pattern_rows(base, pattern):
+            max_counter = max(max_counter, int(pattern.match(model.name(row)).group(1)))
         counter = max_counter + 1
-        used_names = {self.list.item(i).text() for i in range(self.list.count())}
-        new_items = []
-        for item in renamed_items:
-            old_path = item.data(Qt.UserRole)
-            if not os.path.exists(old_path):
+        used_names = {model.name(i) for i in range(self.list.count())}
+        on_disk = os.listdir(self.folder)
+        present = set(on_disk)
+        moves = []
+        for row in sel:
+            old_path = model.path(row)
+            if model.name(row) not in present:
                 continue
             ext = os.path.splitext(old_path)[1]
             new_name = f"{base}_{counter:06d}{ext}"
             while new_name in used_names:
                 counter += 1
                 new_name = f"{base}_{counter:06d}{ext}"
-            new_path = os.path.join(self.folder, new_name)
-            try:
-                os.rename(old_path, new_path)
-                item.setText(new_name)
-                item.setData(Qt.UserRole, new_path)
-                used_names.add(new_name)
-                new_items.append(item)
-                counter += 1
-            except Exception:
-                continue
-        if not new_items:
-            return
-        rows = sorted([self.list.row(itm) for itm in new_items], reverse=True)
-        for r in rows:
-            self.list.takeItem(r)
-        insert_at = 0
-        for i in range(self.list.count()):
-            name = self.list.item(i).text()
-            if pattern.match(name):
-                insert_at = i + 1
-            else:
-                if insert_at > 0:
-                    break
-        if insert_at == 0:
-            sample = new_items[0].text()
-            for i in range(self.list.count()):
-                if natural_key(self.list.item(i).text()) > natural_key(sample):
-                    insert_at = i
-                    break
-            else:
-                insert_at = self.list.count()
-        for i, item in enumerate(new_items):
-            self.list.insertItem(insert_at + i, item)
-            item.setSelected(True)
-        if new_items:
-            self.list.scrollToItem(new_items[0], QAbstractItemView.PositionAtCenter)
-        QtWidgets.QMessageBox.information(self, "Success", f"Renamed and placed {len(new_items)} images perfectly!")
+            used_names.add(new_name)
+            moves.append((old_path, os.path.join(self.folder, new_name)))
+            counter += 1
+
+        def finished(plan, locations, failures, cancelled):
+            renamed = {dst for src, dst in moves if locations.get(src) == dst}
+            new_rows = [r for r in range(self.list.count()) if model.path(r) in renamed]
+            if cancelled or not new_rows:
+                if cancelled or failures:
+                    self.show_rename_result("Rename Selected", "", plan, failures, cancelled)
+                return
+            self.place_renamed_rows(new_rows, base, pattern)
+            self.show_rename_result("Success", f"Renamed and placed {len(new_rows)} images perfectly!",
+                                    plan, failures, cancelled)
+
+        self.execute_renames(moves, on_disk, finished)
+
+    def pattern_rows(self, base, pattern):
+        """Ascending rows named base_NNNNNN.ext - only rows containing "base_" are matched"""
+        model = self.list.image_model
+        candidates = model.search_index().search(f"{base.lower()}_")
+        return [row for row in candidates if pattern.match(model.name(row))]
+
+    def place_renamed_rows(self, new_rows, base, pattern):
+        """Move freshly renamed rows next to their name pattern (or their natural position)"""
+        model = self.list.image_model
+        # Insertion point among the rows that were not renamed: right after the first run of
+        # pattern rows, else before the first row whose name sorts after the renamed ones
+        moving = set(new_rows)
+        rest = [r for r in range(self.list.count()) if r not in moving]
+        matches = [r for r in self.pattern_rows(base, pattern) if r not in moving]
+        if matches:
+            insert_at = bisect_left(rest, matches[0]) + 1
+            while insert_at < len(rest) and pattern.match(model.name(rest[insert_at])):
+                insert_at += 1
+        else:
+            sample_key = model.records[new_rows[0]].key
+            records = model.records
+            insert_at = next((i for i, r in enumerate(rest) if records[r].key > sample_key), len(rest))
+        moved_rows = self.list.move_rows(new_rows, insert_at)
+        self.list.scroll_to_row(moved_rows[0], QAbstractItemView.PositionAtCenter)
+
+    def find_duplicates(self):
+        if not self.list.count():
+            QtWidgets.QMessageBox.information(self, "Find Duplicates", "Open a folder with images first.")
+            return
+        if self.duplicates_dialog is None:
+            self.duplicates_dialog = DuplicatesDialog(self)
+        self.duplicates_dialog.show()
+        self.duplicates_dialog.raise_()
+        self.duplicates_dialog.activateWindow()
+        self.duplicates_dialog.refresh()
 
     def search_image(self, search_bar, prev=False):
-        text = self.search_input1.text() if search_bar == 1 else self.search_input2.text()
-        text = text.strip().lower()
-        if not text:
+        query = self.search_query(search_bar)
+        if not query or self.list.count() == 0:
             return
-        total = self.list.count()
-        if total == 0:
+        self.active_search_bar = search_bar
+        mode = self.search_mode(search_bar)
+        cursor = self.search_cursors[search_bar]
+        index = self.list.image_model.search_index()
+        if mode == "Text":
+            cursor.update(query, index)
+        elif not cursor.is_current(query, mode, index):
+            self.pending_search_steps[search_bar] = prev  # Step as soon as the match set is ready
+            self.update_search_count(search_bar)
             return
-        start_index = self.last_search_index[search_bar]
-        if start_index == -1:
-            selected = self.list.selectedItems()
-            if selected:
-                start_index = self.list.row(selected[0])
-            else:
-                start_index = -1 if not prev else 0
-        step = -1 if prev else 1
-        current_idx = (start_index + step) % total
-        for _ in range(total):
-            item = self.list.item(current_idx)
-            if item and text in item.text().lower():
-                self.list.clearSelection()
-                item.setSelected(True)
-                self.list.scrollToItem(item, QAbstractItemView.PositionAtCenter)
-                self.last_search_index[search_bar] = current_idx
-                return
-            current_idx = (current_idx + step) % total
+        row = cursor.step(self.list.first_selected_row(), prev)
+        if row is not None:
+            self.list.select_rows([row], current=row)
+            self.list.scroll_to_row(row, QAbstractItemView.PositionAtCenter)
+        self.show_search_count(search_bar)
 
 
 if __name__ == "__main__":
+    if getattr(sys, "frozen", False):
+        import multiprocessing
+        multiprocessing.freeze_support()  # The command line runs folders in a process pool
+    if len(sys.argv) > 1 and sys.argv[1] in CLI_COMMANDS:
+        import scene_master  # Only the command line pays for argparse / concurrent.futures
+        sys.exit(scene_master.main(sys.argv[1:]))
     app = QtWidgets.QApplication(sys.argv)
     app.setStyle("Fusion")
     win = ImageOrganizer()
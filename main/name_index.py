@@ -0,0 +1,159 @@
+"""
+Name search index - substring matches over the whole grid without per-row Python work.
+
+→ All lower-cased names are joined (in row order) into one newline-separated text, so a
+  query is a handful of C-level str.find() calls that jump from hit to hit
+→ Row of a hit comes from a bisect over the row start offsets; hits arrive already ordered
+→ Queries that hit a large share of the rows fall back to one pass over the name list
+→ Typing one more character only filters the previous match set
+→ Rebuilt lazily (one join) after renames / reloads / reorders; no Qt dependency
+→ Regex / glob / fuzzy modes run one compiled pattern over the whole name column (match_names)
+"""
+import fnmatch
+import re
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+
+SEARCH_MODES = ("Text", "Regex", "Glob", "Fuzzy")
+
+
+class NameIndex:
+    """Ordered substring match sets over a list of lower-cased names"""
+
+    def __init__(self):
+        self.names = []
+        self.text = ""
+        self.starts = []   # Offset of each row's name in text
+        self.version = 0   # Bumped on every invalidate(); match sets remember the version they belong to
+        self.dirty = True
+        self.last_query = None
+        self.last_rows = []
+
+    def invalidate(self):
+        """Names or their order changed - rebuild on the next query"""
+        self.dirty = True
+        self.version += 1
+        self.last_query = None
+
+    def rebuild(self, lower_names):
+        self.names = lower_names
+        self.text = "\n".join(lower_names)
+        self.starts = [0]
+        self.starts.extend(accumulate(len(name) + 1 for name in lower_names))
+        self.starts.pop()  # Offset past the end
+        if not lower_names:
+            self.starts = []
+        self.dirty = False
+
+    def search(self, query):
+        """Ascending rows whose name contains query (already lower-cased, no newlines)"""
+        if not query:
+            return []
+        if self.last_query is not None and self.last_query in query:
+            # Refinement: every name containing query also contains the previous query
+            names = self.names
+            rows = [row for row in self.last_rows if query in names[row]]
+        else:
+            rows = self.scan(query)
+        self.last_query = query
+        self.last_rows = rows
+        return rows
+
+    def scan(self, query):
+        text, starts = self.text, self.starts
+        if text.count(query) * 16 > len(starts):
+            # Common query: a plain pass over the names beats hopping from hit to hit
+            return [row for row, name in enumerate(self.names) if query in name]
+        rows = []
+        count = len(starts)
+        i = text.find(query)
+        while i != -1:
+            row = bisect_right(starts, i) - 1
+            rows.append(row)
+            if row + 1 >= count:
+                break
+            i = text.find(query, starts[row + 1])  # Next row; one hit per row is enough
+        return rows
+
+
+def compile_pattern(query, mode):
+    """Compiled pattern for a non-text mode; raises ValueError for an invalid regex"""
+    if mode == "Regex":
+        try:
+            return re.compile(query, re.IGNORECASE)
+        except re.error as e:
+            raise ValueError(str(e)) from None
+    if mode == "Glob":
+        return re.compile(fnmatch.translate(query), re.IGNORECASE)
+    if mode == "Fuzzy":
+        # Characters in order, anything in between; lazy gaps keep the match span tight
+        return re.compile(".*?".join(re.escape(c) for c in query if not c.isspace()), re.IGNORECASE)
+    raise ValueError(f"Unknown search mode {mode}")
+
+
+def match_names(names, query, mode):
+    """Rows of names matching query in mode (Regex / Glob / Fuzzy).
+
+    Regex and glob rows are ascending; fuzzy rows are ranked best first (tightest, earliest match).
+    """
+    pattern = compile_pattern(query, mode)
+    if mode == "Glob":
+        match = pattern.match  # translate() anchors at the end; the whole name must match
+        return [row for row, name in enumerate(names) if match(name)]
+    search = pattern.search
+    if mode == "Regex":
+        return [row for row, name in enumerate(names) if search(name)]
+    scored = []
+    for row, name in enumerate(names):
+        m = search(name)
+        if m is not None:
+            scored.append((m.end() - m.start(), m.start(), row))
+    scored.sort()
+    return [row for span, start, row in scored]
+
+
+class MatchCursor:
+    """Position inside one search bar's match set; stepping is O(1)"""
+
+    def __init__(self):
+        self.query = None
+        self.mode = "Text"
+        self.version = -1
+        self.rows = []
+        self.ranked = False  # Rows in rank order (fuzzy) rather than row order
+        self.pos = None  # Index into rows of the last match shown, None until the user steps
+
+    def is_current(self, query, mode, index):
+        return query == self.query and mode == self.mode and index.version == self.version
+
+    def update(self, query, index):
+        """Recompute a text match set if the query or the index changed; returns the ordered rows"""
+        if not self.is_current(query, "Text", index):
+            self.set_rows(query, "Text", index.version, index.search(query))
+        return self.rows
+
+    def set_rows(self, query, mode, version, rows):
+        """Adopt a match set (computed here or by a background search)"""
+        self.pos = None  # New query, or rows changed - re-anchor on the current selection
+        self.query = query
+        self.mode = mode
+        self.version = version
+        self.rows = rows
+        self.ranked = mode == "Fuzzy"
+
+    def step(self, current_row, prev=False):
+        """Next (or previous) matching row, wrapping around; None if nothing matches"""
+        rows = self.rows
+        if not rows:
+            return None
+        if self.pos is None and self.ranked:
+            self.pos = len(rows) - 1 if prev else 0  # Best match first
+        elif self.pos is None:
+            # First step: the match after (or before) the current row
+            if prev:
+                self.pos = (bisect_left(rows, current_row) - 1) % len(rows) if current_row >= 0 else len(rows) - 1
+            else:
+                self.pos = bisect_right(rows, current_row) % len(rows)
+        else:
+            self.pos = (self.pos + (-1 if prev else 1)) % len(rows)
+        return rows[self.pos]
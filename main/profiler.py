@@ -0,0 +1,141 @@
+"""
+Switchable hot-path instrumentation - timing spans exported as Chrome trace-event JSON.
+
+→ with TRACER.span("decode", path=p): ... around a hot path, any thread
+→ Off by default: span() then returns one shared do-nothing object (no clock read, no allocation)
+→ On: spans land in a bounded ring buffer (old events drop off, memory stays flat)
+→ export_chrome_trace() writes a file for chrome://tracing or https://ui.perfetto.dev
+→ SCENE_MASTER_TRACE=path.json turns tracing on at startup and saves on exit
+→ No Qt dependency
+"""
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+TRACE_ENV = "SCENE_MASTER_TRACE"
+MAX_EVENTS = 200000
+
+
+class NullSpan:
+    """What span() hands out while tracing is off"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_SPAN = NullSpan()
+
+
+class Span:
+    __slots__ = ("tracer", "name", "args", "start")
+
+    def __init__(self, tracer, name, args):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer.add(self.name, self.start, time.perf_counter_ns() - self.start, self.args)
+        return False
+
+
+class Tracer:
+    """Collects complete spans ("X" events) and counters ("C" events) from every thread"""
+
+    def __init__(self, max_events=MAX_EVENTS):
+        self.enabled = False
+        self.events = deque(maxlen=max_events)  # deque.append is thread-safe; no lock on the hot path
+        self.thread_names = {}
+        self.origin = time.perf_counter_ns()
+
+    def enable(self, on=True):
+        self.enabled = on
+
+    def clear(self):
+        self.events.clear()
+        self.origin = time.perf_counter_ns()
+
+    def span(self, name, **args):
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, name, args)
+
+    def add(self, name, start_ns, duration_ns, args):
+        tid = threading.get_ident()
+        if tid not in self.thread_names:
+            self.thread_names[tid] = threading.current_thread().name
+        self.events.append(("X", name, start_ns, duration_ns, tid, args))
+
+    def counter(self, name, **values):
+        """Sampled values (e.g. queue depth) drawn as a graph track"""
+        if self.enabled:
+            self.events.append(("C", name, time.perf_counter_ns(), 0, threading.get_ident(), values))
+
+    def chrome_events(self):
+        pid = os.getpid()
+        events = [{"ph": "M", "name": "thread_name", "pid": pid, "tid": tid, "args": {"name": name}}
+                  for tid, name in list(self.thread_names.items())]
+        for phase, name, start, duration, tid, args in list(self.events):
+            event = {"ph": phase, "name": name, "pid": pid, "tid": tid, "ts": (start - self.origin) / 1000}
+            if phase == "X":
+                event["dur"] = duration / 1000
+            if args:
+                event["args"] = {key: value if isinstance(value, (int, float, bool)) else str(value)
+                                 for key, value in args.items()}
+            events.append(event)
+        return events
+
+    def export_chrome_trace(self, path):
+        """Write every buffered event as Chrome trace-event JSON; returns the event count"""
+        events = self.chrome_events()
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        return len(events)
+
+
+def process_memory_mb(peak=False):
+    """Resident memory of this process in MB (its high-water mark with peak), or None where it can't be read"""
+    if not peak:
+        try:
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+        except (OSError, ValueError, AttributeError):
+            pass
+    try:
+        import ctypes
+        from ctypes import wintypes
+
+        class Counters(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                        ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                        ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                        ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                        ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+
+        counters = Counters()
+        counters.cb = ctypes.sizeof(Counters)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+            return (counters.PeakWorkingSetSize if peak else counters.WorkingSetSize) / (1024 * 1024)
+    except (AttributeError, OSError):
+        pass
+    try:
+        import resource
+        high = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss  # macOS without peak: best available
+        return high / (1024 * 1024) if sys.platform == "darwin" else high / 1024  # Bytes on macOS, KB elsewhere
+    except ImportError:
+        return None
+
+
+TRACER = Tracer()
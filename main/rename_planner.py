@@ -0,0 +1,281 @@
+"""
+Rename planner - turns "file X should be called Y" into the fewest os.rename calls.
+
+→ Files already carrying their target name are skipped
+→ Chains (a→b while b→c) are ordered so every rename lands on a free name
+→ A temporary name is used only to break a cycle (a→b, b→a), one per cycle
+→ Targets held by files outside the batch are reported as blocked, never overwritten
+→ Execution is journaled: an interrupted batch can be rolled forward or back on the next launch
+→ No Qt dependency - plan_renames() is a pure function of names, execute_plan() does the I/O
+"""
+import json
+import os
+
+TEMP_PREFIX = "__TMP_RENAME_"
+JOURNAL_NAME = "rename_journal.jsonl"
+
+
+def path_key(path):
+    """Identity of a path on this file system (case-insensitive on Windows)"""
+    return os.path.normcase(os.path.abspath(path))
+
+
+class RenamePlan:
+    """Ordered rename steps plus what the planner decided not to do"""
+
+    def __init__(self):
+        self.steps = []    # (src, dst, origin) in execution order; origin = the file's original path
+        self.targets = {}  # origin -> final path
+        self.skipped = 0   # Already in place
+        self.blocked = []  # (origin, target) whose target is taken by a file outside the batch
+        self.temps = 0     # Cycles broken with a temporary name
+
+    def stats(self):
+        return {
+            "renames": len(self.steps),
+            "temps": self.temps,
+            "skipped": self.skipped,
+            "blocked": len(self.blocked),
+        }
+
+
+def plan_renames(moves, occupied=()):
+    """Plan [(src, dst), ...]; occupied lists other paths that exist on disk (e.g. the folder listing).
+
+    Raises ValueError if two files are given the same target.
+    """
+    plan = RenamePlan()
+    pending = {}    # key(src) -> (src, dst, origin)
+    waiting = {}    # key(dst) -> key(src) of the move that wants to land there
+    for src, dst in moves:
+        if src == dst:
+            plan.skipped += 1
+            continue
+        dst_key = path_key(dst)
+        if dst_key in waiting:
+            raise ValueError(f"Two files renamed to {dst}")
+        pending[path_key(src)] = (src, dst, src)
+        waiting[dst_key] = path_key(src)
+        plan.targets[src] = dst
+    # Names that stay where they are for the whole batch
+    fixed = {path_key(p) for p in occupied} - pending.keys()
+    used = fixed | pending.keys() | waiting.keys()
+
+    def is_free(key, dst):
+        dst_key = path_key(dst)
+        return dst_key == key or (dst_key not in pending and dst_key not in fixed)  # Case-only renames are free
+
+    def drain(stack):
+        """Run ready moves; each one frees its source for the move waiting on it"""
+        while stack:
+            key = stack.pop()
+            src, dst, origin = pending.pop(key)
+            plan.steps.append((src, dst, origin))
+            follower = waiting.get(key)
+            if follower in pending and follower != key:
+                stack.append(follower)
+
+    drain([key for key, (src, dst, origin) in pending.items() if is_free(key, dst)])
+
+    # Whatever is left sits on a cycle, feeds into one, or ends at a blocked name
+    counter = 0
+    for start in list(pending):
+        visited = set()
+        key = start
+        while key in pending and key not in visited:
+            visited.add(key)
+            key = path_key(pending[key][1])
+        if key not in pending:
+            continue  # Dead end: blocked (or already drained via another cycle)
+        # key is on a cycle - park it under a temporary name and unwind the cycle
+        src, dst, origin = pending.pop(key)
+        folder, name = os.path.split(src)
+        ext = os.path.splitext(name)[1]
+        while True:
+            tmp = os.path.join(folder, f"{TEMP_PREFIX}{counter}{ext}")
+            counter += 1
+            if path_key(tmp) not in used:
+                break
+        used.add(path_key(tmp))
+        plan.steps.append((src, tmp, origin))
+        plan.temps += 1
+        tmp_key = path_key(tmp)
+        pending[tmp_key] = (tmp, dst, origin)
+        waiting[path_key(dst)] = tmp_key
+        drain([waiting[key]])
+
+    for src, dst, origin in pending.values():
+        plan.blocked.append((origin, dst))
+        del plan.targets[origin]
+    return plan
+
+
+class RenameJournal:
+    """Append-only record of a batch so an interrupted one can be finished or undone later.
+
+    Line 1 is the plan as JSON; every later line marks one step: "i" done, "!i" failed, "-i" undone.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+
+    def begin(self, plan):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self.file = open(self.path, "w", encoding="utf-8")
+        header = {"steps": plan.steps, "targets": plan.targets, "blocked": plan.blocked,
+                  "skipped": plan.skipped, "temps": plan.temps}
+        self.file.write(json.dumps(header) + "\n")
+        self.file.flush()
+        os.fsync(self.file.fileno())  # The plan must be on disk before the first rename
+
+    def resume(self):
+        self.file = open(self.path, "a", encoding="utf-8")
+
+    def mark(self, prefix, index):
+        self.file.write(f"{prefix}{index}\n")
+        self.file.flush()
+
+    def finish(self):
+        """Batch is complete (or fully undone) - nothing left to recover"""
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+    def load(self):
+        """(plan, done, failed) index sets from a journal on disk, or None if there is none"""
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                lines = f.read().splitlines()
+            header = json.loads(lines[0])
+        except (OSError, ValueError, IndexError):
+            return None
+        plan = RenamePlan()
+        plan.steps = [tuple(step) for step in header["steps"]]
+        plan.targets = header["targets"]
+        plan.blocked = [tuple(b) for b in header["blocked"]]
+        plan.skipped = header["skipped"]
+        plan.temps = header["temps"]
+        done, failed = set(), set()
+        for line in lines[1:]:
+            try:
+                if line.startswith("!"):
+                    failed.add(int(line[1:]))
+                elif line.startswith("-"):
+                    done.discard(int(line[1:]))
+                else:
+                    done.add(int(line))
+            except ValueError:
+                break  # Torn last line
+        # The step running at the crash may have completed before it could be marked
+        for index, (src, dst, origin) in enumerate(plan.steps):
+            if index not in done and index not in failed:
+                if not os.path.lexists(src) and os.path.lexists(dst):
+                    done.add(index)
+                break
+        return plan, done, failed
+
+
+def execute_plan(plan, progress=None, rename=os.rename, journal=None, cancelled=None, done=(), failed=()):
+    """Run the plan; returns ({origin: where the file is now}, [(origin, target, error), ...], was_cancelled).
+
+    A failed step never lets a later step overwrite the file that stayed behind.
+    progress(done, total) is called after every step. When cancelled() turns true the steps
+    completed so far are undone, leaving the folder as it was. done/failed are step indices
+    already settled by an interrupted run (see RenameJournal.load).
+    """
+    done = set(done)
+    locations = {origin: origin for origin in plan.targets}
+    locations.update((origin, origin) for origin, target in plan.blocked)
+    failures = [(origin, target, "Target name is taken by a file outside the batch")
+                for origin, target in plan.blocked]
+    failed_origins = set()
+    stuck = set()  # Keys of names still occupied because their move failed
+    vacated = set()  # Keys of names this batch has freed and not refilled
+    for index, (src, dst, origin) in enumerate(plan.steps):
+        if index in done:
+            locations[origin] = dst
+            vacated.add(path_key(src))
+            vacated.discard(path_key(dst))
+        elif index in failed and origin not in failed_origins:
+            failed_origins.add(origin)
+            stuck.add(path_key(src))
+            failures.append((origin, plan.targets[origin], "Failed before the batch was interrupted"))
+    total = len(plan.steps)
+    for index, (src, dst, origin) in enumerate(plan.steps):
+        if index in done or index in failed:
+            continue
+        if cancelled is not None and cancelled():
+            return undo_steps(plan, done, rename, journal, progress), [], True
+        if origin in failed_origins:
+            if journal is not None:
+                journal.mark("!", index)  # Rest of a move whose first step failed
+        elif path_key(dst) in stuck:
+            failed_origins.add(origin)
+            failures.append((origin, plan.targets[origin], f"{os.path.basename(dst)} could not be freed"))
+            if journal is not None:
+                journal.mark("!", index)
+            # A file parked under a temporary name goes back home if nothing took its place
+            if src != origin and path_key(origin) in vacated:
+                try:
+                    rename(src, origin)
+                    locations[origin] = origin
+                    vacated.discard(path_key(origin))
+                    src = origin
+                except OSError:
+                    pass
+            stuck.add(path_key(src))
+        else:
+            try:
+                rename(src, dst)
+                locations[origin] = dst
+                done.add(index)
+                vacated.add(path_key(src))
+                vacated.discard(path_key(dst))
+                if journal is not None:
+                    journal.mark("", index)
+            except OSError as e:
+                failed_origins.add(origin)
+                stuck.add(path_key(src))
+                failures.append((origin, plan.targets[origin], e.strerror or str(e)))
+                if journal is not None:
+                    journal.mark("!", index)
+        if progress is not None:
+            progress(index + 1, total)
+    if journal is not None:
+        journal.finish()
+    return locations, failures, False
+
+
+def undo_steps(plan, done, rename=os.rename, journal=None, progress=None):
+    """Reverse completed steps (newest first); returns {origin: where the file is now}"""
+    locations = {origin: origin for origin in plan.targets}
+    for index, (src, dst, origin) in enumerate(plan.steps):
+        if index in done:
+            locations[origin] = dst
+    remaining = sorted(done, reverse=True)
+    stuck = set()  # Names still held by files whose undo failed
+    for count, index in enumerate(remaining, start=1):
+        src, dst, origin = plan.steps[index]
+        if progress is not None:
+            progress(len(remaining) - count, len(remaining))
+        if path_key(src) in stuck:
+            stuck.add(path_key(dst))
+            continue
+        try:
+            rename(dst, src)
+        except OSError as e:
+            # Already undone by a run that was interrupted before it could mark the step
+            if not (isinstance(e, FileNotFoundError) and os.path.lexists(src)):
+                stuck.add(path_key(dst))
+                continue
+        locations[origin] = src
+        if journal is not None:
+            journal.mark("-", index)
+    if journal is not None and not stuck:
+        journal.finish()
+    return locations
@@ -0,0 +1,188 @@
+"""
+Scene Master core - folder scanning, natural ordering and renumbering without any GUI.
+
+→ Shared by the desktop app (main.py) and the command line (scene_master.py)
+→ Renumbering goes through rename_planner: minimal renames, journaled, never overwrites
+→ Natural order keys are computed once per name; InsertionIndex places new names in O(log n)
+→ No Qt dependency - safe to run on render nodes without a display
+"""
+import os
+import re
+from bisect import bisect_right
+from itertools import accumulate
+
+from rename_planner import TEMP_PREFIX, RenameJournal, plan_renames, execute_plan, undo_steps
+
+SUPPORTED_EXT = {".jpg", ".jpeg", ".png", ".bmp", ".gif", ".tiff", ".webp", ".tif"}
+FOLDER_JOURNAL_NAME = ".scene_master_rename.jsonl"  # Per-folder journal used by the command line
+CLI_COMMANDS = ("renumber", "recover")  # scene_master subcommands (the app forwards them)
+
+
+split_digits = re.compile(r"(\d+)").split  # Compiled once: text and digit runs alternate, text first
+
+
+def name_tokens(text):
+    """("shot", 10, ".v", 2, "") for "Shot10.v02" - digit runs compare as numbers, text case-insensitively"""
+    parts = split_digits(text.lower())
+    parts[1::2] = map(int, parts[1::2])
+    return tuple(parts)
+
+
+def natural_key(name):
+    """Sort key: stem in natural order, then extension; the name itself breaks ties.
+
+    The stem is compared as a whole before the extension, so "shot.png" sorts before
+    "shot.1.png" and "a9.tif" before "a10.jpg"; "f01.png" and "f1.png" keep a fixed order.
+    """
+    dot = name.rfind(".")
+    if dot <= 0 or name[0] == ".":
+        stem, ext = os.path.splitext(name)  # No extension, or leading dots (".hidden")
+    else:
+        stem, ext = name[:dot], name[dot:]  # Same split as splitext, without its overhead
+    return name_tokens(stem), ext.lower(), name
+
+
+def is_image(name):
+    return os.path.splitext(name)[1].lower() in SUPPORTED_EXT
+
+
+def list_images(folder, names=None):
+    """Supported image names in folder (or among names, a listing of it) in natural order.
+
+    Files parked under a temporary name by an interrupted rename batch are not frames and are left out.
+    """
+    if names is None:
+        names = os.listdir(folder)
+    images = [f for f in names if is_image(f) and not f.startswith(TEMP_PREFIX)]
+    images.sort(key=natural_key)
+    return images
+
+
+class InsertionIndex:
+    """Positions for new names in a hand-ordered sequence of keys.
+
+    A new name goes before the first row (in sequence order) whose key sorts after it - the
+    natural position when the sequence is sorted, a stable one when it was reordered by hand.
+    Built once in O(n log n) from cached keys; every lookup is a bisect.
+    """
+
+    def __init__(self, keys):
+        self.order = sorted(range(len(keys)), key=keys.__getitem__)  # Rows by key
+        self.keys = [keys[row] for row in self.order]
+        # earliest[i]: the first row (in sequence order) among the i-th smallest key and all larger ones
+        earliest = list(accumulate(reversed(self.order), min))
+        earliest.reverse()
+        earliest.append(len(keys))
+        self.earliest = earliest
+
+    def position(self, key):
+        """Row before which key belongs"""
+        return self.earliest[bisect_right(self.keys, key)]
+
+
+def sequence_moves(folder, names):
+    """Moves that rename names (in this order) to 1, 2, 3, ... keeping their extensions.
+
+    Leftover temporary names of an interrupted batch are skipped, never numbered as frames.
+    """
+    names = [name for name in names if not name.startswith(TEMP_PREFIX)]
+    return [(os.path.join(folder, name), os.path.join(folder, f"{idx}{os.path.splitext(name)[1]}"))
+            for idx, name in enumerate(names, start=1)]
+
+
+def reload_moves(folder, loaded, on_disk):
+    """Moves for a reload: loaded names (in order) become 1, 2, 3, ... and every other image in
+    the folder becomes generic_000000, generic_000001, ... in natural order.
+
+    on_disk is the folder listing. Names held by files outside the batch are skipped.
+    Returns (moves, sources of the new files).
+    """
+    loaded_set = set(loaded)
+    new_files = [f for f in list_images(folder, on_disk) if f not in loaded_set]
+    taken = {os.path.normcase(f) for f in on_disk} - {os.path.normcase(f) for f in loaded_set | set(new_files)}
+    moves = []
+    counter = 0
+    for f in new_files:
+        ext = os.path.splitext(f)[1]
+        while os.path.normcase(f"generic_{counter:06d}{ext}") in taken:
+            counter += 1
+        new_name = f"generic_{counter:06d}{ext}"
+        taken.add(os.path.normcase(new_name))
+        moves.append((os.path.join(folder, f), os.path.join(folder, new_name)))
+        counter += 1
+    new_sources = [src for src, dst in moves]
+    num_counter = 1
+    for name in loaded:
+        ext = os.path.splitext(name)[1]
+        while os.path.normcase(f"{num_counter}{ext}") in taken:
+            num_counter += 1
+        new_name = f"{num_counter}{ext}"
+        taken.add(os.path.normcase(new_name))
+        moves.append((os.path.join(folder, name), os.path.join(folder, new_name)))
+        num_counter += 1
+    return moves, new_sources
+
+
+def failure_report(failures):
+    return [{"file": os.path.basename(origin), "target": os.path.basename(target), "error": error}
+            for origin, target, error in failures]
+
+
+def renumber_folder(folder, dry_run=False):
+    """Rename the images of folder to 1, 2, 3, ... in natural order; returns a JSON-ready report.
+
+    A journal inside the folder covers the batch while it runs (see recover_folder).
+    """
+    report = {"folder": folder, "dry_run": dry_run}
+    try:
+        on_disk = os.listdir(folder)
+        if os.path.exists(os.path.join(folder, FOLDER_JOURNAL_NAME)):
+            raise RuntimeError("An interrupted rename is pending - run recover first")
+        names = list_images(folder, on_disk)
+        plan = plan_renames(sequence_moves(folder, names), [os.path.join(folder, f) for f in on_disk])
+    except (OSError, ValueError, RuntimeError) as e:
+        report["error"] = str(e)
+        return report
+    report["images"] = len(names)
+    report.update(plan.stats())
+    if dry_run:
+        report["steps"] = [[os.path.basename(src), os.path.basename(dst)] for src, dst, origin in plan.steps]
+        report["failed"] = failure_report(
+            [(origin, target, "Target name is taken by a file outside the batch") for origin, target in plan.blocked])
+        return report
+    journal = RenameJournal(os.path.join(folder, FOLDER_JOURNAL_NAME))
+    try:
+        journal.begin(plan)
+    except OSError as e:
+        report["error"] = f"Could not write the rename journal: {e}"
+        return report
+    locations, failures, cancelled = execute_plan(plan, journal=journal)
+    report["failed"] = failure_report(failures)
+    return report
+
+
+def recover_folder(folder, roll_forward):
+    """Finish (roll_forward) or undo a batch left behind by an interrupted renumber_folder"""
+    report = {"folder": folder, "action": "finish" if roll_forward else "undo"}
+    journal = RenameJournal(os.path.join(folder, FOLDER_JOURNAL_NAME))
+    loaded = journal.load()
+    if loaded is None:
+        report["error"] = "No interrupted rename in this folder"
+        return report
+    plan, done, failed = loaded
+    report["steps"] = len(plan.steps)
+    report["done_before"] = len(done)
+    try:
+        journal.resume()
+    except OSError as e:
+        report["error"] = str(e)
+        return report
+    if roll_forward:
+        locations, failures, cancelled = execute_plan(plan, journal=journal, done=done, failed=failed)
+        report["failed"] = failure_report(failures)
+    else:
+        locations = undo_steps(plan, done, journal=journal)
+        report["failed"] = [{"file": os.path.basename(where), "target": os.path.basename(origin),
+                             "error": "Could not be moved back"}
+                            for origin, where in locations.items() if where != origin]
+    return report
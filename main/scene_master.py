@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Scene Master command line - batch renumbering of many shot folders without a display.
+
+    python scene_master.py renumber DIR [DIR ...] [--jobs N] [--dry-run] [--report FILE]
+    python scene_master.py recover DIR [DIR ...] (--finish | --undo) [--report FILE]
+
+→ Folders are processed in parallel in a process pool (one folder per task)
+→ The JSON report goes to stdout, or to --report FILE
+→ Exit code 0 when every folder succeeded, 1 if any folder or file failed
+→ The packaged app accepts the same commands: SceneMaster.exe renumber DIR ...
+"""
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from scene_core import renumber_folder, recover_folder
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="scene-master", description="Batch sequencing of image folders")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    renumber = commands.add_parser("renumber", help="Rename the images of each folder to 1, 2, 3, ... in natural order")
+    renumber.add_argument("folders", nargs="+", metavar="DIR")
+    renumber.add_argument("--jobs", "-j", type=int, default=os.cpu_count() or 1,
+                          help="Folders processed in parallel (default: CPU count)")
+    renumber.add_argument("--dry-run", action="store_true", help="Plan only; report the renames without touching files")
+    renumber.add_argument("--report", metavar="FILE", help="Write the JSON report here instead of stdout")
+
+    recover = commands.add_parser("recover", help="Finish or undo renames interrupted by a crash")
+    recover.add_argument("folders", nargs="+", metavar="DIR")
+    action = recover.add_mutually_exclusive_group(required=True)
+    action.add_argument("--finish", action="store_true", help="Roll the interrupted batch forward")
+    action.add_argument("--undo", action="store_true", help="Roll the interrupted batch back")
+    recover.add_argument("--report", metavar="FILE", help="Write the JSON report here instead of stdout")
+    return parser
+
+
+def run_parallel(function, folders, jobs, *args):
+    folders = [os.path.abspath(f) for f in folders]
+    if jobs <= 1 or len(folders) <= 1:
+        return [function(folder, *args) for folder in folders]
+    with ProcessPoolExecutor(max_workers=min(jobs, len(folders))) as pool:
+        return list(pool.map(function, folders, *[[a] * len(folders) for a in args]))
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command == "renumber":
+        results = run_parallel(renumber_folder, args.folders, args.jobs, args.dry_run)
+    else:
+        results = run_parallel(recover_folder, args.folders, 1, args.finish)
+    ok = all("error" not in r and not r.get("failed") for r in results)
+    report = {
+        "command": args.command,
+        "ok": ok,
+        "folders": results,
+        "totals": {
+            "folders": len(results),
+            "errors": sum(1 for r in results if "error" in r),
+            "renames": sum(r.get("renames", 0) for r in results),
+            "failed_files": sum(len(r.get("failed", [])) for r in results),
+        },
+    }
+    text = json.dumps(report, indent=2)
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
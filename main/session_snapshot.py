@@ -0,0 +1,46 @@
+"""
+Session snapshot - what the grid showed when the app last closed, for an instant cold start.
+
+→ Folder, row order, thumbnail size, current row and the folder baseline (name → mtime, size)
+→ Restoring paints the grid straight from the snapshot (thumbnails come from the disk cache);
+  the folder is scanned afterwards and only the difference is applied
+→ Written atomically (temp file + replace) so a crash never leaves half a snapshot
+→ No Qt dependency
+"""
+import json
+import os
+
+SNAPSHOT_NAME = "last_session.json"
+SNAPSHOT_VERSION = 1
+
+
+def save_snapshot(path, folder, names, baseline, thumbnail_size, current_row):
+    """Write the session; baseline is {file name: (mtime_ns, size)} as the folder watcher knows it"""
+    data = {
+        "version": SNAPSHOT_VERSION,
+        "folder": folder,
+        "names": names,
+        "baseline": {name: list(signature) for name, signature in baseline.items()},
+        "thumbnail_size": thumbnail_size,
+        "current_row": current_row,
+    }
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def load_snapshot(path, folder):
+    """The saved session for folder, or None if there is none (or it belongs to another folder)"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != SNAPSHOT_VERSION or data.get("folder") != folder:
+            return None
+        data["baseline"] = {name: tuple(signature) for name, signature in data["baseline"].items()}
+        if not isinstance(data["names"], list):
+            return None
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return None
+    return data
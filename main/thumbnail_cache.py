@@ -0,0 +1,205 @@
+"""
+Persistent on-disk thumbnail cache (SQLite, stored in the user cache directory).
+
+→ Entries are keyed by absolute path + thumbnail edge
+→ Each entry remembers the file's mtime and size, so edited/replaced files are
+  re-decoded automatically (stale rows are overwritten on the next store)
+→ Total size is capped; least recently used entries are evicted first
+→ Perceptual hashes and header metadata of each file are kept next to its thumbnails
+  (same validation, evicted together) and count toward the cap; when trimming, rows of
+  files that have no thumbnail left go first
+→ No Qt dependency - thumbnails are stored as already-encoded image bytes
+"""
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_CACHE_LIMIT_MB = 512
+CACHE_DB_NAME = "thumbnails.sqlite3"
+ROW_BYTES = 48  # Rough size of the fixed-width columns of a hash or metadata row
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS thumbs (
+    path      TEXT    NOT NULL,
+    edge      INTEGER NOT NULL,
+    mtime     INTEGER NOT NULL,
+    size      INTEGER NOT NULL,
+    data      BLOB    NOT NULL,
+    bytes     INTEGER NOT NULL,
+    last_used REAL    NOT NULL,
+    PRIMARY KEY (path, edge)
+);
+CREATE INDEX IF NOT EXISTS thumbs_last_used ON thumbs (last_used);
+CREATE TABLE IF NOT EXISTS hashes (
+    path      TEXT    NOT NULL PRIMARY KEY,
+    mtime     INTEGER NOT NULL,
+    size      INTEGER NOT NULL,
+    data      BLOB    NOT NULL
+);
+CREATE TABLE IF NOT EXISTS metadata (
+    path      TEXT    NOT NULL PRIMARY KEY,
+    mtime     INTEGER NOT NULL,
+    size      INTEGER NOT NULL,
+    width     INTEGER NOT NULL,
+    height    INTEGER NOT NULL,
+    format    TEXT    NOT NULL,
+    captured  REAL
+);
+"""
+
+
+def file_signature(path):
+    """(mtime_ns, size) used to validate cache entries, or None if the file is gone"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class ThumbnailDiskCache:
+    """SQLite-backed thumbnail store, safe to read from worker threads"""
+
+    def __init__(self, db_path, max_bytes=DEFAULT_CACHE_LIMIT_MB * 1024 * 1024):
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self.local = threading.local()  # One connection per thread
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        conn = self.connection()
+        conn.executescript(SCHEMA)
+        self.total_bytes = self.stored_bytes()
+
+    def connection(self):
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=10, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")  # Readers never block the writer
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self.local.conn = conn
+        return conn
+
+    def stored_bytes(self):
+        """Thumbnail bytes plus an estimate for the hash and metadata rows"""
+        return self.connection().execute(
+            "SELECT (SELECT COALESCE(SUM(bytes), 0) FROM thumbs)"
+            " + (SELECT COALESCE(SUM(LENGTH(path) + LENGTH(data) + ?), 0) FROM hashes)"
+            " + (SELECT COALESCE(SUM(LENGTH(path) + LENGTH(format) + ?), 0) FROM metadata)",
+            (ROW_BYTES, ROW_BYTES)).fetchone()[0]
+
+    def get(self, path, edge, mtime, size):
+        """Return encoded thumbnail bytes, or None if missing or stale"""
+        row = self.connection().execute(
+            "SELECT mtime, size, data FROM thumbs WHERE path = ? AND edge = ?", (path, edge)).fetchone()
+        if row is None or row[0] != mtime or row[1] != size:
+            return None
+        return row[2]
+
+    def put_many(self, entries):
+        """Store [(path, edge, mtime, size, data), ...] in one transaction"""
+        if not entries:
+            return
+        now = time.time()
+        conn = self.connection()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO thumbs (path, edge, mtime, size, data, bytes, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(p, e, m, s, d, len(d), now) for p, e, m, s, d in entries])
+        # Replacements make this an over-estimate; trim() recounts before evicting
+        self.total_bytes += sum(len(e[4]) for e in entries)
+        if self.total_bytes > self.max_bytes:
+            self.trim()
+
+    def get_hashes(self, path, mtime, size):
+        """Return the packed hashes of path, or None if missing or stale"""
+        row = self.connection().execute("SELECT mtime, size, data FROM hashes WHERE path = ?", (path,)).fetchone()
+        if row is None or row[0] != mtime or row[1] != size:
+            return None
+        return row[2]
+
+    def put_hashes_many(self, entries):
+        """Store [(path, mtime, size, data), ...] in one transaction"""
+        if not entries:
+            return
+        conn = self.connection()
+        with conn:
+            conn.executemany("INSERT OR REPLACE INTO hashes (path, mtime, size, data) VALUES (?, ?, ?, ?)", entries)
+        self.total_bytes += sum(len(e[0]) + len(e[3]) + ROW_BYTES for e in entries)
+        if self.total_bytes > self.max_bytes:
+            self.trim()
+
+    def get_metadata_many(self, paths):
+        """{path: (mtime, size, width, height, format, captured)} for the paths that have a row.
+
+        Rows are not validated here - compare mtime and size with the file. At most 999 paths.
+        """
+        if not paths:
+            return {}
+        rows = self.connection().execute(
+            "SELECT path, mtime, size, width, height, format, captured FROM metadata "
+            f"WHERE path IN ({', '.join('?' * len(paths))})", list(paths))
+        return {row[0]: row[1:] for row in rows}
+
+    def put_metadata_many(self, entries):
+        """Store [(path, mtime, size, width, height, format, captured), ...] in one transaction"""
+        if not entries:
+            return
+        conn = self.connection()
+        with conn:
+            conn.executemany("INSERT OR REPLACE INTO metadata (path, mtime, size, width, height, format, captured) "
+                             "VALUES (?, ?, ?, ?, ?, ?, ?)", entries)
+        self.total_bytes += sum(len(e[0]) + len(e[5]) + ROW_BYTES for e in entries)
+        if self.total_bytes > self.max_bytes:
+            self.trim()
+
+    def touch(self, keys):
+        """Mark [(path, edge), ...] as recently used so they survive eviction"""
+        if not keys:
+            return
+        now = time.time()
+        conn = self.connection()
+        with conn:
+            conn.executemany("UPDATE thumbs SET last_used = ? WHERE path = ? AND edge = ?",
+                             [(now, p, e) for p, e in keys])
+
+    def trim(self):
+        """Evict least recently used entries until the cache is below 90% of its cap.
+
+        Hashes and metadata of files with no cached thumbnail are dropped first.
+        """
+        self.total_bytes = self.stored_bytes()
+        if self.total_bytes <= int(self.max_bytes * 0.9):
+            return
+        conn = self.connection()
+        with conn:
+            conn.execute("DELETE FROM hashes WHERE path NOT IN (SELECT path FROM thumbs)")
+            conn.execute("DELETE FROM metadata WHERE path NOT IN (SELECT path FROM thumbs)")
+        self.total_bytes = self.stored_bytes()
+        excess = self.total_bytes - int(self.max_bytes * 0.9)
+        if excess <= 0:
+            return
+        victims = []
+        freed = 0
+        for path, edge, nbytes in conn.execute("SELECT path, edge, bytes FROM thumbs ORDER BY last_used"):
+            victims.append((path, edge))
+            freed += nbytes
+            if freed >= excess:
+                break
+        with conn:
+            conn.executemany("DELETE FROM thumbs WHERE path = ? AND edge = ?", victims)
+            conn.executemany("DELETE FROM hashes WHERE path = ?", [(path,) for path, edge in victims])
+            conn.executemany("DELETE FROM metadata WHERE path = ?", [(path,) for path, edge in victims])
+        self.total_bytes = self.stored_bytes()  # Thumbnail bytes freed plus the rows that went with them
+
+    def purge(self):
+        """Delete every cached thumbnail and shrink the database file; returns bytes freed"""
+        freed = self.stored_bytes()
+        conn = self.connection()
+        with conn:
+            conn.execute("DELETE FROM thumbs")
+            conn.execute("DELETE FROM hashes")
+            conn.execute("DELETE FROM metadata")
+        conn.execute("VACUUM")
+        self.total_bytes = 0
+        return freed
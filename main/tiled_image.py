@@ -0,0 +1,305 @@
+"""
+Region reads from TIFF scans without decoding the whole image.
+
+→ Reads only the strips / tiles under a rectangle, every step-th pixel, so a view of a
+  500 MP scan costs about as many bytes as the view itself
+→ Reduced-resolution pages (pyramid pages and SubIFDs) serve the coarse zoom levels
+→ Uncompressed data is read row by row with seeks; Deflate, LZW and PackBits chunks are
+  decompressed only when one of their rows is needed
+→ Baseline layouts only: 8 / 16-bit gray, gray + alpha, RGB and RGBA, chunky, no JPEG compression;
+  open_tiff() returns None for anything else (callers fall back to a full decode)
+→ No Qt dependency
+"""
+import struct
+import zlib
+from itertools import accumulate
+
+TIFF_EXTENSIONS = (".tif", ".tiff")
+
+# Tags
+NEW_SUBFILE_TYPE, IMAGE_WIDTH, IMAGE_LENGTH, BITS_PER_SAMPLE, COMPRESSION = 254, 256, 257, 258, 259
+PHOTOMETRIC, STRIP_OFFSETS, ORIENTATION, SAMPLES_PER_PIXEL, ROWS_PER_STRIP = 262, 273, 274, 277, 278
+STRIP_BYTE_COUNTS, PLANAR_CONFIG, PREDICTOR, TILE_WIDTH, TILE_LENGTH = 279, 284, 317, 322, 323
+TILE_OFFSETS, TILE_BYTE_COUNTS, SUB_IFDS, EXTRA_SAMPLES = 324, 325, 330, 338
+
+NO_COMPRESSION, LZW, DEFLATE, ADOBE_DEFLATE, PACKBITS = 1, 5, 8, 32946, 32773
+SUPPORTED_COMPRESSION = {NO_COMPRESSION, LZW, DEFLATE, ADOBE_DEFLATE, PACKBITS}
+WHITE_IS_ZERO, BLACK_IS_ZERO, RGB = 0, 1, 2
+MAX_PAGES = 64
+# What a corrupt or truncated file raises from open_tiff() / read_region() (bad codes, cut streams, bad offsets)
+READ_ERRORS = (zlib.error, IndexError, ValueError, OSError, struct.error)
+
+# (type size, struct code) per TIFF field type
+FIELD_TYPES = {1: (1, "B"), 2: (1, "B"), 3: (2, "H"), 4: (4, "I"), 6: (1, "b"), 7: (1, "B"), 8: (2, "h"),
+               9: (4, "i"), 13: (4, "I"), 16: (8, "Q"), 17: (8, "q"), 18: (8, "Q")}
+
+
+def lzw_decode(data):
+    """TIFF LZW (MSB-first codes, early change)"""
+    out = bytearray()
+    table = [bytes([i]) for i in range(256)] + [b"", b""]  # 256 = clear, 257 = end of information
+    width = 9
+    bits = 0
+    count = 0
+    previous = None
+    for byte in data:
+        bits = bits << 8 | byte
+        count += 8
+        while count >= width:
+            count -= width
+            code = bits >> count & ((1 << width) - 1)
+            if code == 256:
+                del table[258:]
+                width = 9
+                previous = None
+                continue
+            if code == 257:
+                return bytes(out)
+            if previous is None:
+                entry = table[code]
+            else:
+                entry = table[code] if code < len(table) else previous + previous[:1]
+                table.append(previous + entry[:1])
+            out += entry
+            previous = entry
+            if len(table) + 1 >= 1 << width and width < 12:
+                width += 1
+        bits &= (1 << count) - 1
+    return bytes(out)
+
+
+def packbits_decode(data):
+    out = bytearray()
+    i = 0
+    while i < len(data):
+        n = data[i]
+        i += 1
+        if n < 128:
+            out += data[i:i + n + 1]
+            i += n + 1
+        elif n > 128:
+            out += data[i:i + 1] * (257 - n)
+            i += 1
+    return bytes(out)
+
+
+def undo_predictor(data, row_bytes, samples):
+    """Reverse horizontal differencing (predictor 2) of 8-bit samples, row by row"""
+    out = bytearray(data)
+    mask = (255).__and__
+    for start in range(0, len(out) - row_bytes + 1, row_bytes):
+        for channel in range(samples):
+            part = slice(start + channel, start + row_bytes, samples)
+            out[part] = bytes(map(mask, accumulate(out[part])))
+    return bytes(out)
+
+
+class TiffPage:
+    """One image directory: its size and where its strips or tiles are"""
+
+    def __init__(self, tags):
+        self.width = tags[IMAGE_WIDTH][0]
+        self.height = tags[IMAGE_LENGTH][0]
+        self.samples = tags.get(SAMPLES_PER_PIXEL, (1,))[0]
+        bits = tags.get(BITS_PER_SAMPLE, (1,))
+        self.bits = bits[0]
+        self.compression = tags.get(COMPRESSION, (NO_COMPRESSION,))[0]
+        self.photometric = tags.get(PHOTOMETRIC, (BLACK_IS_ZERO,))[0]
+        self.predictor = tags.get(PREDICTOR, (1,))[0]
+        self.reduced = bool(tags.get(NEW_SUBFILE_TYPE, (0,))[0] & 1)  # A lower-resolution copy of the image
+        self.premultiplied = tags.get(EXTRA_SAMPLES, (0,))[0] == 1  # Associated alpha: colour already scaled by it
+        self.supported = (
+            all(b == self.bits for b in bits) and self.bits in (8, 16)
+            and self.compression in SUPPORTED_COMPRESSION
+            and tags.get(PLANAR_CONFIG, (1,))[0] == 1 and tags.get(ORIENTATION, (1,))[0] == 1
+            and (self.photometric == RGB and self.samples in (3, 4)
+                 or self.photometric in (WHITE_IS_ZERO, BLACK_IS_ZERO) and self.samples in (1, 2))
+            and (self.predictor == 1 or self.predictor == 2 and self.bits == 8))
+        if TILE_OFFSETS in tags:
+            self.chunk_width = tags[TILE_WIDTH][0]
+            self.chunk_height = tags[TILE_LENGTH][0]
+            self.offsets, self.byte_counts = tags[TILE_OFFSETS], tags.get(TILE_BYTE_COUNTS, ())
+        else:
+            self.chunk_width = self.width
+            self.chunk_height = min(tags.get(ROWS_PER_STRIP, (self.height,))[0], self.height) or self.height
+            self.offsets, self.byte_counts = tags.get(STRIP_OFFSETS, ()), tags.get(STRIP_BYTE_COUNTS, ())
+        self.chunks_across = -(-self.width // self.chunk_width)
+        self.pixel_bytes = self.samples * self.bits // 8
+        self.supported = self.supported and len(self.offsets) == len(self.byte_counts) == \
+            self.chunks_across * -(-self.height // self.chunk_height)
+
+    @property
+    def channels(self):
+        """Samples kept per output pixel: 1 (gray), 3 (RGB) or 4 (RGBA)"""
+        return 1 if self.samples <= 2 else self.samples
+
+
+class TiffImage:
+    """A TIFF file opened for region reads; levels[0] is the full image, then ever smaller pages.
+
+    Every read opens the file on its own, so reads can run on several threads at once.
+    """
+
+    def __init__(self, path, levels, order):
+        self.path = path
+        self.levels = levels
+        self.order = order  # "<" or ">"
+
+    @property
+    def size(self):
+        return self.levels[0].width, self.levels[0].height
+
+    @property
+    def premultiplied(self):
+        """RGBA regions carry associated (premultiplied) alpha"""
+        return self.levels[0].channels == 4 and self.levels[0].premultiplied
+
+    def level_for(self, step):
+        """Smallest page that still has at least 1 / step of the full resolution, and the step within it"""
+        width = self.levels[0].width
+        for index in range(len(self.levels) - 1, -1, -1):
+            factor = width / self.levels[index].width
+            if factor <= step:
+                return index, max(1, int(step / factor))
+        return 0, step
+
+    def read_region(self, x, y, width, height, step=1):
+        """Every step-th pixel of a full-resolution rectangle: (columns, rows, channels, bytes)
+
+        Rows are packed without padding; samples are 8-bit (16-bit data keeps its high byte).
+        """
+        index, level_step = self.level_for(step)
+        page = self.levels[index]
+        scale = page.width / self.levels[0].width
+        x0 = min(page.width - 1, int(x * scale))
+        y0 = min(page.height - 1, int(y * scale))
+        x1 = min(page.width, max(x0 + 1, int((x + width) * scale)))
+        y1 = min(page.height, max(y0 + 1, int((y + height) * scale)))
+        columns = len(range(x0, x1, level_step))
+        rows = range(y0, y1, level_step)
+        chunks = {}  # Decompressed chunks of the current band
+        out = bytearray()
+        with open(self.path, "rb") as f:
+            for row in rows:
+                out += self.sample_row(f, chunks, page, row, x0, x1, level_step, columns)
+        if page.photometric == WHITE_IS_ZERO:
+            out = out.translate(bytes(range(255, -1, -1)))
+        return columns, len(rows), page.channels, bytes(out)
+
+    def sample_row(self, f, chunks, page, row, x0, x1, step, columns):
+        """Every step-th pixel of one row of a page, as 8-bit output channels"""
+        pixel = page.pixel_bytes
+        chunk_row = row // page.chunk_height
+        segments = []
+        for chunk_column in range(x0 // page.chunk_width, (x1 - 1) // page.chunk_width + 1):
+            left = chunk_column * page.chunk_width
+            segments.append(self.chunk_row(f, chunks, page, chunk_row * page.chunks_across + chunk_column,
+                                           row - chunk_row * page.chunk_height,
+                                           max(x0, left) - left, min(x1, left + page.chunk_width) - left))
+        data = b"".join(segments)
+        if step > 1:
+            out = bytearray(columns * pixel)
+            for p in range(pixel):
+                out[p::pixel] = data[p::step * pixel][:columns]
+            data = bytes(out)
+        return to_8bit(data, page, self.order)
+
+    def chunk_row(self, f, chunks, page, chunk, row, start, end):
+        """Bytes of pixels start..end of one row inside a strip / tile"""
+        pixel = page.pixel_bytes
+        row_bytes = page.chunk_width * pixel
+        if page.compression == NO_COMPRESSION:
+            f.seek(page.offsets[chunk] + row * row_bytes + start * pixel)
+            return f.read((end - start) * pixel).ljust((end - start) * pixel, b"\0")
+        data = chunks.get(chunk)
+        if data is None:
+            if len(chunks) > 2 * page.chunks_across:
+                chunks.clear()  # Rows are read top-down: earlier bands are done with
+            f.seek(page.offsets[chunk])
+            data = decompress(f.read(page.byte_counts[chunk]), page.compression)
+            if page.predictor == 2:
+                data = undo_predictor(data, row_bytes, page.samples)
+            chunks[chunk] = data
+        return data[row * row_bytes + start * pixel:row * row_bytes + end * pixel].ljust((end - start) * pixel, b"\0")
+
+
+def to_8bit(data, page, order):
+    """Output channels of packed pixels: 16-bit samples keep their high byte, gray + alpha keeps gray"""
+    if page.bits == 16:
+        data = data[1::2] if order == "<" else data[0::2]
+    if page.samples == 2:
+        data = data[0::2]
+    return data
+
+
+def decompress(data, compression):
+    if compression in (DEFLATE, ADOBE_DEFLATE):
+        return zlib.decompress(data)
+    if compression == LZW:
+        return lzw_decode(data)
+    if compression == PACKBITS:
+        return packbits_decode(data)
+    return data
+
+
+def read_directory(f, order, offset, big):
+    """(tags, next directory offset) of the directory at offset; tag values are tuples"""
+    f.seek(offset)
+    count_format, entry_format, entry_size = (order + "Q", order + "HHQ", 20) if big else (order + "H", order + "HHI", 12)
+    count = struct.unpack(count_format, f.read(struct.calcsize(count_format)))[0]
+    raw = f.read(count * entry_size + (8 if big else 4))
+    inline = 8 if big else 4
+    tags = {}
+    for i in range(count):
+        entry = raw[i * entry_size:(i + 1) * entry_size]
+        tag, type_, n = struct.unpack_from(entry_format, entry)
+        if type_ not in FIELD_TYPES:
+            continue
+        size, code = FIELD_TYPES[type_]
+        value = entry[entry_size - inline:]
+        if size * n > inline:
+            here = f.tell()
+            f.seek(struct.unpack(order + ("Q" if big else "I"), value)[0])
+            value = f.read(size * n)
+            f.seek(here)
+        tags[tag] = struct.unpack(f"{order}{n}{code}", value[:size * n])
+    next_offset = struct.unpack_from(order + ("Q" if big else "I"), raw, count * entry_size)[0]
+    return tags, next_offset
+
+
+def open_tiff(path):
+    """TiffImage for region reads, or None if the file isn't a TIFF this reader supports"""
+    try:
+        with open(path, "rb") as f:
+            header = f.read(16)
+            order = {b"II": "<", b"MM": ">"}.get(header[:2])
+            if order is None:
+                return None
+            version = struct.unpack_from(order + "H", header, 2)[0]
+            big = version == 43
+            if version not in (42, 43):
+                return None
+            offset = struct.unpack_from(order + "Q", header, 8)[0] if big else struct.unpack_from(order + "I", header, 4)[0]
+            pages = []
+            sub_offsets = []
+            seen = set()
+            while offset and offset not in seen and len(pages) < MAX_PAGES:
+                seen.add(offset)
+                tags, offset = read_directory(f, order, offset, big)
+                if not pages:
+                    sub_offsets = list(tags.get(SUB_IFDS, ()))
+                pages.append(TiffPage(tags))
+            for sub_offset in sub_offsets[:MAX_PAGES]:
+                pages.append(TiffPage(read_directory(f, order, sub_offset, big)[0]))
+    except READ_ERRORS + (KeyError,):
+        return None
+    if not pages or not pages[0].supported:
+        return None
+    full = pages[0]
+    # Pyramid pages: reduced-resolution copies with the aspect ratio and pixel layout of the full image
+    levels = [full] + sorted((page for page in pages[1:]
+                              if page.reduced and page.supported and page.width < full.width and page.channels == full.channels
+                              and page.premultiplied == full.premultiplied
+                              and abs(page.height / page.width - full.height / full.width) < 0.02),
+                             key=lambda page: -page.width)
+    return TiffImage(path, levels, order)
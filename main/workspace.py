@@ -0,0 +1,152 @@
+"""
+Workspaces - many shot folders opened together: a root scanned recursively, or a saved list of folders.
+
+→ Every folder that directly holds images is a shard: listed, watched and ordered on its own,
+  and only the shard on screen holds rows and decoded thumbnails
+→ Folders are listed concurrently on a thread pool (listing is I/O bound, the GIL is released)
+→ Workspace files are JSON ({"version": 1, "folders": [...]}); folders are stored relative to the file
+→ Moving frames to another shard keeps their names; a name already taken there gets _2, _3, ...
+→ No Qt dependency
+"""
+import json
+import os
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from rename_planner import path_key
+from scene_core import is_image, name_tokens
+
+WORKSPACE_SUFFIX = ".sceneworkspace"
+WORKSPACE_VERSION = 1
+SCAN_WORKERS = 8
+
+Shard = namedtuple("Shard", "folder images")
+
+
+def scan_directory(folder):
+    """(folder, image count, subfolders) of one directory; hidden entries and symlinked folders are skipped"""
+    images = 0
+    subfolders = []
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            if entry.name.startswith("."):
+                continue
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    subfolders.append(entry.path)
+                    continue
+            except OSError:
+                continue
+            if is_image(entry.name):
+                images += 1
+    return folder, images, subfolders
+
+
+def folder_key(folder):
+    """Natural order of folder paths, component by component ("shot_2" before "shot_10")"""
+    return [name_tokens(part) for part in os.path.normpath(folder).split(os.sep)]
+
+
+def scan_workspace(folders, recursive=True, workers=SCAN_WORKERS, cancelled=lambda: False):
+    """Shards (folders holding images, with their image counts) under folders, in natural path order.
+
+    With recursive the subfolders are scanned too; each directory is one job on the pool, so
+    wide trees are listed in parallel. Unreadable folders are skipped.
+    """
+    shards = []
+    seen = set()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        for folder in folders:
+            if path_key(folder) not in seen:
+                seen.add(path_key(folder))
+                pending.add(pool.submit(scan_directory, folder))
+        while pending and not cancelled():
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    folder, images, subfolders = future.result()
+                except OSError:
+                    continue
+                if images:
+                    shards.append(Shard(folder, images))
+                if not recursive:
+                    continue
+                for subfolder in subfolders:
+                    if path_key(subfolder) not in seen:
+                        seen.add(path_key(subfolder))
+                        pending.add(pool.submit(scan_directory, subfolder))
+        for future in pending:
+            future.cancel()
+    shards.sort(key=lambda shard: folder_key(shard.folder))
+    return shards
+
+
+def count_images(folders):
+    """{folder: image count} for a few folders (a shard changed on disk); missing folders count 0"""
+    counts = {}
+    for folder in folders:
+        try:
+            counts[folder] = scan_directory(folder)[1]
+        except OSError:
+            counts[folder] = 0
+    return counts
+
+
+def shard_label(folder, roots):
+    """Folder relative to the first root that holds it, else its full path"""
+    for root in roots:
+        try:
+            relative = os.path.relpath(folder, root)
+        except ValueError:
+            continue  # Another drive (Windows)
+        if relative == os.curdir:
+            return os.path.basename(os.path.normpath(root)) or folder
+        if relative.split(os.sep)[0] != os.pardir:
+            return relative
+    return folder
+
+
+def save_workspace(path, folders):
+    """Write a workspace file listing folders (relative to the file where possible)"""
+    base = os.path.dirname(os.path.abspath(path))
+    stored = []
+    for folder in folders:
+        try:
+            stored.append(os.path.relpath(folder, base).replace(os.sep, "/"))
+        except ValueError:
+            stored.append(folder)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"version": WORKSPACE_VERSION, "folders": stored}, f, indent=1)
+    os.replace(tmp, path)
+
+
+def load_workspace(path):
+    """Absolute folders listed by a workspace file, or None if it is unreadable"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != WORKSPACE_VERSION or not isinstance(data["folders"], list):
+            return None
+        base = os.path.dirname(os.path.abspath(path))
+        return [os.path.normpath(os.path.join(base, folder)) for folder in data["folders"] if isinstance(folder, str)]
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return None
+
+
+def transfer_moves(names, source, target, target_listing):
+    """Moves that take names from source into target under the same names; names taken in the
+    target folder (target_listing) get _2, _3, ... before the extension"""
+    taken = {os.path.normcase(f) for f in target_listing}
+    moves = []
+    for name in names:
+        stem, ext = os.path.splitext(name)
+        new_name = name
+        counter = 2
+        while os.path.normcase(new_name) in taken:
+            new_name = f"{stem}_{counter}{ext}"
+            counter += 1
+        taken.add(os.path.normcase(new_name))
+        moves.append((os.path.join(source, name), os.path.join(target, new_name)))
+    return moves
@@ -0,0 +1,75 @@
+import random
+
+import pytest
+
+from frame_hash import DEFAULT_MAX_DISTANCE, MAX_DISTANCE, group_near_duplicates, hamming
+
+BASE = 0x0123456789ABCDEF
+
+
+def flip(value, bits):
+    """value with the given bit positions inverted"""
+    for bit in bits:
+        value ^= 1 << bit
+    return value
+
+
+def spread(count):
+    """count bit positions spread over the whole 64-bit hash"""
+    return [bit * 64 // count for bit in range(count)]
+
+
+def brute_force_groups(hashes, max_distance):
+    """Reference grouping: compare every pair, then join linked frames"""
+    parent = list(range(len(hashes)))
+
+    def find(i):
+        while parent[i] != i:
+            i = parent[i]
+        return i
+
+    for i in range(len(hashes)):
+        for j in range(i + 1, len(hashes)):
+            if hamming(hashes[i], hashes[j]) <= max_distance:
+                parent[find(j)] = find(i)
+    groups = {}
+    for i in range(len(hashes)):
+        groups.setdefault(find(i), []).append(i)
+    return sorted(group for group in groups.values() if len(group) > 1)
+
+
+@pytest.mark.parametrize("max_distance", [1, 4, DEFAULT_MAX_DISTANCE, MAX_DISTANCE])
+@pytest.mark.parametrize("placement", ["spread", "one chunk"])
+def test_threshold_is_inclusive(max_distance, placement):
+    for distance, grouped in ((max_distance - 1, True), (max_distance, True), (max_distance + 1, False)):
+        bits = spread(distance) if placement == "spread" else list(range(distance))  # All in the low chunk
+        other = flip(BASE, bits)
+        assert hamming(BASE, other) == distance
+        assert group_near_duplicates([BASE, other], max_distance) == ([[0, 1]] if grouped else [])
+
+
+def test_identical_hashes_group_even_at_distance_zero():
+    assert group_near_duplicates([BASE, 7, BASE, BASE], 0) == [[0, 2, 3]]
+
+
+def test_groups_are_transitive():
+    # a - b and b - c are within reach, a - c is not: all three still form one group
+    a = BASE
+    b = flip(a, spread(DEFAULT_MAX_DISTANCE))
+    c = flip(b, [bit + 1 for bit in spread(DEFAULT_MAX_DISTANCE)])
+    far = ~BASE & (1 << 64) - 1
+    assert hamming(a, c) > DEFAULT_MAX_DISTANCE
+    assert group_near_duplicates([c, far, a, b], DEFAULT_MAX_DISTANCE) == [[0, 2, 3]]
+
+
+@pytest.mark.parametrize("count", [10, 300, 2000])  # 2000 frames switch from 8 to 4 chunks per hash
+def test_matches_comparing_every_pair(count):
+    rng = random.Random(count)
+    hashes = []
+    for _ in range(count):
+        if hashes and rng.random() < 0.5:
+            # A near copy of an earlier frame, sometimes just past the threshold
+            hashes.append(flip(rng.choice(hashes), rng.sample(range(64), rng.randint(0, DEFAULT_MAX_DISTANCE + 2))))
+        else:
+            hashes.append(rng.getrandbits(64))
+    assert group_near_duplicates(hashes, DEFAULT_MAX_DISTANCE) == brute_force_groups(hashes, DEFAULT_MAX_DISTANCE)
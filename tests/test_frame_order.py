@@ -0,0 +1,44 @@
+import random
+
+from frame_order import chain_length, nearest_neighbour_chain, similarity_chain, two_opt
+
+
+def random_features(count, seed):
+    rng = random.Random(seed)
+    return [rng.getrandbits(192) for _ in range(count)]
+
+
+def drifting_features(count, seed):
+    """A shot: every frame differs from the previous one in a few bits"""
+    rng = random.Random(seed)
+    feature = rng.getrandbits(192)
+    features = [feature]
+    for _ in range(count - 1):
+        for _ in range(rng.randint(1, 6)):
+            feature ^= 1 << rng.randrange(192)
+        features.append(feature)
+    return features
+
+
+def test_two_opt_never_makes_the_chain_longer():
+    for seed in range(20):
+        features = random_features(60, seed)
+        greedy = nearest_neighbour_chain(features)
+        before = chain_length(greedy, features)
+        improved = two_opt(list(greedy), features)
+        assert chain_length(improved, features) <= before
+        assert sorted(improved) == list(range(len(features)))
+        assert improved[0] == 0
+
+
+def test_similarity_chain_recovers_a_shuffled_shot():
+    features = drifting_features(40, seed=3)
+    shuffled = list(range(1, len(features)))
+    random.Random(3).shuffle(shuffled)
+    order = [0] + shuffled  # The first frame stays first
+    chain = similarity_chain([features[i] for i in order])
+    assert chain_length(chain, [features[i] for i in order]) <= chain_length(list(range(len(features))), features)
+
+
+def test_similarity_chain_of_nothing_is_empty():
+    assert similarity_chain([]) == []
@@ -0,0 +1,106 @@
+import struct
+from datetime import datetime
+
+import pytest
+
+from image_metadata import (EXIF_HEADER, TAG_DATETIME, TAG_DATETIME_DIGITIZED, TAG_DATETIME_ORIGINAL, TAG_EXIF_IFD,
+                            capture_time)
+
+ORIGINAL = "2024:03:05 14:07:09"
+DIGITIZED = "2024:03:05 14:08:00"
+MODIFIED = "2025:01:01 00:00:00"
+BLANK = "    :  :     :  :  "
+TAG_MAKE = 0x010F
+
+
+def stamp(text):
+    return datetime.strptime(text, "%Y:%m:%d %H:%M:%S").timestamp()
+
+
+def tiff_block(order, ifd0, exif=None):
+    """TIFF header + IFD0 (+ Exif IFD); ifd0 / exif are {tag: ASCII text}"""
+    fmt = {"II": "<", "MM": ">"}[order]
+    ifds = [dict(ifd0)]
+    if exif is not None:
+        ifds.append(dict(exif))
+    sizes = [2 + 12 * (len(ifd) + (i == 0 and exif is not None)) + 4 for i, ifd in enumerate(ifds)]
+    offsets = [8, 8 + sizes[0]]
+    data_at = 8 + sum(sizes)
+    payload = b""
+    tables = []
+    for index, ifd in enumerate(ifds):
+        entries = []
+        if index == 0 and exif is not None:
+            entries.append((TAG_EXIF_IFD, 4, 1, offsets[1]))
+        for tag, text in sorted(ifd.items()):
+            value = text.encode("ascii") + b"\x00"
+            entries.append((tag, 2, len(value), data_at + len(payload)))
+            payload += value
+        entries.sort()
+        table = struct.pack(fmt + "H", len(entries))
+        table += b"".join(struct.pack(fmt + "HHII", *entry) for entry in entries)
+        tables.append(table + struct.pack(fmt + "I", 0))
+    return order.encode() + struct.pack(fmt + "HI", 42, 8) + b"".join(tables) + payload
+
+
+def jpeg(app1=None, before=b""):
+    """SOI, optional segments, the Exif APP1, then a start of scan"""
+    data = b"\xff\xd8" + before
+    if app1 is not None:
+        data += b"\xff\xe1" + struct.pack(">H", len(app1) + 2) + app1
+    return data + b"\xff\xda\x00\x02" + b"\x00" * 16
+
+
+def write(tmp_path, name, data):
+    path = tmp_path / name
+    path.write_bytes(data)
+    return str(path)
+
+
+@pytest.mark.parametrize("order", ["II", "MM"])
+def test_original_time_wins_in_both_byte_orders(tmp_path, order):
+    block = tiff_block(order, {TAG_DATETIME: MODIFIED, TAG_MAKE: "Camera"},
+                       {TAG_DATETIME_ORIGINAL: ORIGINAL, TAG_DATETIME_DIGITIZED: DIGITIZED})
+    assert capture_time(write(tmp_path, "a.tif", block)) == stamp(ORIGINAL)
+    assert capture_time(write(tmp_path, "a.jpg", jpeg(EXIF_HEADER + block))) == stamp(ORIGINAL)
+
+
+@pytest.mark.parametrize("order", ["II", "MM"])
+def test_falls_back_to_digitized_then_modified(tmp_path, order):
+    digitized = tiff_block(order, {TAG_DATETIME: MODIFIED}, {TAG_DATETIME_DIGITIZED: DIGITIZED})
+    assert capture_time(write(tmp_path, "d.tif", digitized)) == stamp(DIGITIZED)
+    modified = tiff_block(order, {TAG_DATETIME: MODIFIED})
+    assert capture_time(write(tmp_path, "m.tif", modified)) == stamp(MODIFIED)
+
+
+def test_blank_stamps_are_skipped(tmp_path):
+    block = tiff_block("II", {TAG_DATETIME: MODIFIED}, {TAG_DATETIME_ORIGINAL: BLANK})
+    assert capture_time(write(tmp_path, "b.tif", block)) == stamp(MODIFIED)
+    all_blank = tiff_block("MM", {TAG_DATETIME: BLANK}, {TAG_DATETIME_ORIGINAL: BLANK})
+    assert capture_time(write(tmp_path, "c.tif", all_blank)) is None
+
+
+def test_exif_segment_after_other_segments(tmp_path):
+    block = tiff_block("II", {}, {TAG_DATETIME_ORIGINAL: ORIGINAL})
+    jfif = b"\xff\xe0" + struct.pack(">H", 16) + b"JFIF\x00" + b"\x00" * 9
+    xmp = b"\xff\xe1" + struct.pack(">H", 12) + b"http://x\x00\x00"  # APP1 that is not Exif
+    assert capture_time(write(tmp_path, "s.jpg", jpeg(EXIF_HEADER + block, before=jfif + xmp))) == stamp(ORIGINAL)
+
+
+def test_files_without_a_capture_time(tmp_path):
+    assert capture_time(write(tmp_path, "n.jpg", jpeg())) is None  # Scan starts before any Exif
+    assert capture_time(write(tmp_path, "n.tif", tiff_block("II", {TAG_MAKE: "Camera"}))) is None
+    assert capture_time(write(tmp_path, "n.png", b"\x89PNG\r\n\x1a\n")) is None
+    assert capture_time(str(tmp_path / "missing.jpg")) is None
+
+
+def test_truncated_and_malformed_files_give_none(tmp_path):
+    block = tiff_block("MM", {TAG_DATETIME: MODIFIED}, {TAG_DATETIME_ORIGINAL: ORIGINAL})
+    whole = jpeg(EXIF_HEADER + block)
+    for cut in range(len(whole)):
+        result = capture_time(write(tmp_path, "t.jpg", whole[:cut]))
+        assert result is None or result in (stamp(ORIGINAL), stamp(MODIFIED))
+    bad_order = b"XX" + block[2:]
+    assert capture_time(write(tmp_path, "o.jpg", jpeg(EXIF_HEADER + bad_order))) is None
+    bad_offset = block[:4] + struct.pack(">I", 10 ** 6) + block[8:]  # IFD0 far past the end
+    assert capture_time(write(tmp_path, "f.tif", bad_offset)) is None
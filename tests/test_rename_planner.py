@@ -0,0 +1,165 @@
+import os
+
+import pytest
+
+from rename_planner import TEMP_PREFIX, RenameJournal, execute_plan, plan_renames, undo_steps
+
+
+class Crash(Exception):
+    """Stands in for the process dying in the middle of a batch"""
+
+
+def make_files(folder, names):
+    """Files whose content is their own name, so a file can be recognised wherever it ends up"""
+    for name in names:
+        with open(os.path.join(folder, name), "w") as f:
+            f.write(name)
+    return [os.path.join(folder, name) for name in names]
+
+
+def contents(folder):
+    """{name on disk: original name}"""
+    result = {}
+    for name in os.listdir(folder):
+        with open(os.path.join(folder, name)) as f:
+            result[name] = f.read()
+    return result
+
+
+def failing_rename(fail_at, error):
+    """os.rename that raises error on call number fail_at (0-based)"""
+    calls = []
+
+    def rename(src, dst):
+        calls.append((src, dst))
+        if len(calls) - 1 == fail_at:
+            raise error
+        os.rename(src, dst)
+    return rename
+
+
+def test_files_already_in_place_are_skipped(tmp_path):
+    a, b = make_files(tmp_path, ["a.png", "b.png"])
+    plan = plan_renames([(a, a), (b, b)], occupied=[a, b])
+    assert plan.steps == []
+    assert plan.stats() == {"renames": 0, "temps": 0, "skipped": 2, "blocked": 0}
+
+
+def test_chain_is_ordered_onto_free_names(tmp_path):
+    a, b = make_files(tmp_path, ["a.png", "b.png"])
+    c = os.path.join(tmp_path, "c.png")
+    plan = plan_renames([(a, b), (b, c)], occupied=[a, b])
+    assert [(src, dst) for src, dst, origin in plan.steps] == [(b, c), (a, b)]
+    assert plan.temps == 0
+
+    locations, failures, cancelled = execute_plan(plan)
+    assert (failures, cancelled) == ([], False)
+    assert locations == {a: b, b: c}
+    assert contents(tmp_path) == {"b.png": "a.png", "c.png": "b.png"}
+
+
+def test_two_cycle_uses_one_temporary_name(tmp_path):
+    one, two = make_files(tmp_path, ["1.png", "2.png"])
+    plan = plan_renames([(one, two), (two, one)], occupied=[one, two])
+    assert plan.stats() == {"renames": 3, "temps": 1, "skipped": 0, "blocked": 0}
+
+    execute_plan(plan)
+    assert contents(tmp_path) == {"1.png": "2.png", "2.png": "1.png"}
+
+
+def test_longer_cycle_uses_one_temporary_name(tmp_path):
+    names = ["1.png", "2.png", "3.png", "4.png", "5.png"]
+    paths = make_files(tmp_path, names)
+    moves = list(zip(paths, paths[1:] + paths[:1]))  # Every file takes the next one's name
+    plan = plan_renames(moves, occupied=paths)
+    assert plan.stats() == {"renames": 6, "temps": 1, "skipped": 0, "blocked": 0}
+
+    execute_plan(plan)
+    assert contents(tmp_path) == {"1.png": "5.png", "2.png": "1.png", "3.png": "2.png",
+                                  "4.png": "3.png", "5.png": "4.png"}
+
+
+def test_target_held_outside_the_batch_is_blocked(tmp_path):
+    a, b, taken = make_files(tmp_path, ["a.png", "b.png", "taken.png"])
+    plan = plan_renames([(a, taken), (b, b)], occupied=[a, b, taken])
+    assert plan.steps == []
+    assert plan.blocked == [(a, taken)]
+    assert a not in plan.targets
+
+    locations, failures, cancelled = execute_plan(plan)
+    assert locations == {a: a}
+    assert [(origin, target) for origin, target, error in failures] == [(a, taken)]
+    assert contents(tmp_path) == {"a.png": "a.png", "b.png": "b.png", "taken.png": "taken.png"}
+
+
+def test_two_files_with_one_target_are_rejected(tmp_path):
+    a, b = make_files(tmp_path, ["a.png", "b.png"])
+    with pytest.raises(ValueError):
+        plan_renames([(a, os.path.join(tmp_path, "c.png")), (b, os.path.join(tmp_path, "c.png"))])
+
+
+def test_failed_step_never_overwrites_the_file_left_behind(tmp_path):
+    paths = make_files(tmp_path, ["1.png", "2.png", "3.png"])
+    plan = plan_renames(list(zip(paths, paths[1:] + paths[:1])), occupied=paths)
+    rename = failing_rename(1, PermissionError(13, "Permission denied"))
+
+    locations, failures, cancelled = execute_plan(plan, rename=rename)
+    assert not cancelled
+    assert failures
+    # Every file still exists under exactly one name, and locations says where
+    assert sorted(contents(tmp_path).values()) == ["1.png", "2.png", "3.png"]
+    for origin, where in locations.items():
+        with open(where) as f:
+            assert f.read() == os.path.basename(origin)
+    assert not [name for name in os.listdir(tmp_path) if name.startswith(TEMP_PREFIX)]
+
+
+def interrupted_swap(tmp_path):
+    """A 1.png <-> 2.png swap that crashes after its first step; returns (journal, paths)"""
+    folder = tmp_path / "frames"
+    folder.mkdir()
+    one, two = make_files(folder, ["1.png", "2.png"])
+    plan = plan_renames([(one, two), (two, one)], occupied=[one, two])
+    journal = RenameJournal(os.path.join(tmp_path, "journal.jsonl"))
+    journal.begin(plan)
+    with pytest.raises(Crash):
+        execute_plan(plan, rename=failing_rename(1, Crash()), journal=journal)
+    journal.file.close()
+    return journal, folder
+
+
+def test_journal_records_the_plan_and_completed_steps(tmp_path):
+    journal, folder = interrupted_swap(tmp_path)
+    with open(journal.path) as f:
+        lines = f.read().splitlines()
+    assert len(lines) == 2  # Plan header, then step 0 done
+    assert lines[1] == "0"
+
+    plan, done, failed = journal.load()
+    assert len(plan.steps) == 3
+    assert (done, failed) == ({0}, set())
+    # 1.png is parked under its temporary name
+    assert sorted(contents(folder).values()) == ["1.png", "2.png"]
+    assert "1.png" not in os.listdir(folder)
+
+
+def test_interrupted_batch_rolls_forward(tmp_path):
+    journal, folder = interrupted_swap(tmp_path)
+    plan, done, failed = journal.load()
+    journal.resume()
+
+    locations, failures, cancelled = execute_plan(plan, journal=journal, done=done, failed=failed)
+    assert (failures, cancelled) == ([], False)
+    assert contents(folder) == {"1.png": "2.png", "2.png": "1.png"}
+    assert journal.load() is None
+
+
+def test_interrupted_batch_rolls_back(tmp_path):
+    journal, folder = interrupted_swap(tmp_path)
+    plan, done, failed = journal.load()
+    journal.resume()
+
+    locations = undo_steps(plan, done, journal=journal)
+    assert all(origin == where for origin, where in locations.items())
+    assert contents(folder) == {"1.png": "1.png", "2.png": "2.png"}
+    assert journal.load() is None
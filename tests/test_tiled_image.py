@@ -0,0 +1,184 @@
+import random
+import struct
+import zlib
+from types import SimpleNamespace
+
+import pytest
+from PyQt5 import QtGui
+
+from image_io import tiff_region
+from tiled_image import (ADOBE_DEFLATE, LZW, NO_COMPRESSION, PACKBITS, READ_ERRORS, WHITE_IS_ZERO, lzw_decode,
+                         open_tiff, packbits_decode, to_8bit, undo_predictor)
+
+BLACK_IS_ZERO, RGB = 1, 2
+
+
+def noise_image(width, height, image_format=QtGui.QImage.Format_RGB888, seed=1):
+    """Random pixels - defeats compression, so LZW runs through every code width and clears its table"""
+    rng = random.Random(seed)
+    image = QtGui.QImage(width, height, image_format)
+    for y in range(height):
+        for x in range(width):
+            image.setPixel(x, y, rng.getrandbits(24) | 0xFF000000)
+    return image
+
+
+def write_qt_tiff(path, image, compression):
+    writer = QtGui.QImageWriter(str(path), b"tiff")
+    writer.setCompression(compression)  # 0 = none, 1 = LZW
+    assert writer.write(image)
+    return str(path)
+
+
+def expected_region(image, x, y, width, height, step):
+    """RGB bytes of every step-th pixel of a rectangle, straight from QImage.pixel"""
+    out = bytearray()
+    for row in range(y, y + height, step):
+        for column in range(x, x + width, step):
+            color = QtGui.QColor(image.pixel(column, row))
+            out += bytes((color.red(), color.green(), color.blue()))
+    return bytes(out)
+
+
+def build_tiff(path, pages):
+    """Little-endian TIFF with one strip per page.
+
+    pages: [{"width", "height", "samples", "strip", and optional "bits", "compression",
+    "predictor", "photometric", "reduced"}, ...] where strip is the already encoded data.
+    """
+    out = bytearray(b"II*\x00\x00\x00\x00\x00")
+    link = 4  # Where the offset of the next directory goes
+    for page in pages:
+        samples = page["samples"]
+        strip_offset = len(out)
+        out += page["strip"]
+        tags = {
+            254: (4, [1 if page.get("reduced") else 0]),
+            256: (4, [page["width"]]),
+            257: (4, [page["height"]]),
+            258: (3, [page.get("bits", 8)] * samples),
+            259: (3, [page.get("compression", NO_COMPRESSION)]),
+            262: (3, [page.get("photometric", RGB if samples >= 3 else BLACK_IS_ZERO)]),
+            273: (4, [strip_offset]),
+            277: (3, [samples]),
+            278: (4, [page["height"]]),
+            279: (4, [len(page["strip"])]),
+            317: (3, [page.get("predictor", 1)]),
+        }
+        entries = b""
+        for tag in sorted(tags):
+            type_, values = tags[tag]
+            raw = struct.pack(f"<{len(values)}{'H' if type_ == 3 else 'I'}", *values)
+            if len(raw) > 4:
+                value = struct.pack("<I", len(out))
+                out += raw
+            else:
+                value = raw.ljust(4, b"\x00")
+            entries += struct.pack("<HHI", tag, type_, len(values)) + value
+        if len(out) % 2:
+            out += b"\x00"
+        struct.pack_into("<I", out, link, len(out))
+        out += struct.pack("<H", len(tags)) + entries
+        link = len(out)
+        out += b"\x00\x00\x00\x00"
+    path.write_bytes(bytes(out))
+    return str(path)
+
+
+def read_all(path, step=1):
+    tiff = open_tiff(path)
+    width, height = tiff.size
+    return tiff.read_region(0, 0, width, height, step)
+
+
+@pytest.mark.parametrize("compression", [0, 1], ids=["none", "lzw"])
+@pytest.mark.parametrize("step", [1, 3])
+@pytest.mark.parametrize("origin", [(0, 0), (7, 5)])
+def test_qt_written_tiffs_match_qimage(tmp_path, compression, step, origin):
+    image = noise_image(61, 47)
+    path = write_qt_tiff(tmp_path / "noise.tif", image, compression)
+    x, y = origin
+    width, height = 61 - x, 40 - y
+    columns, rows, channels, data = open_tiff(path).read_region(x, y, width, height, step)
+    assert (columns, rows, channels) == (len(range(0, width, step)), len(range(0, height, step)), 3)
+    assert data == expected_region(image, x, y, width, height, step)
+
+
+def test_packbits_strip(tmp_path):
+    # Literal run of 3, repeat run of 5 (0xFC = -4), a no-op byte (-128), literal run of 2
+    encoded = b"\x02\x01\x02\x03\xfc\x09\x80\x01\x07\x08"
+    assert packbits_decode(encoded) == b"\x01\x02\x03" + b"\x09" * 5 + b"\x07\x08"
+    path = build_tiff(tmp_path / "p.tif", [{"width": 5, "height": 2, "samples": 1, "strip": encoded,
+                                            "compression": PACKBITS}])
+    assert read_all(path) == (5, 2, 1, b"\x01\x02\x03\x09\x09\x09\x09\x09\x07\x08")
+
+
+def test_predictor_on_deflate_strip(tmp_path):
+    pixels = bytes([10, 20, 30, 15, 25, 35, 250, 5, 0,
+                    0, 0, 0, 1, 1, 1, 255, 255, 255])  # 3 x 2 RGB, with wrap-around differences
+    differenced = bytearray(pixels)
+    for row in range(2):
+        for i in range(row * 9 + 8, row * 9 + 2, -1):
+            differenced[i] = (pixels[i] - pixels[i - 3]) & 255
+    assert undo_predictor(bytes(differenced), 9, 3) == pixels
+    path = build_tiff(tmp_path / "d.tif", [{"width": 3, "height": 2, "samples": 3, "predictor": 2,
+                                            "strip": zlib.compress(bytes(differenced)),
+                                            "compression": ADOBE_DEFLATE}])
+    assert read_all(path) == (3, 2, 3, pixels)
+
+
+def test_sixteen_bit_keeps_the_high_byte(tmp_path):
+    samples = [0x0000, 0x12FF, 0xAB01, 0xFFFF]
+    path = build_tiff(tmp_path / "w.tif", [{"width": 4, "height": 1, "samples": 1, "bits": 16,
+                                            "strip": struct.pack("<4H", *samples)}])
+    assert read_all(path) == (4, 1, 1, bytes([0x00, 0x12, 0xAB, 0xFF]))
+    page = SimpleNamespace(bits=16, samples=1)
+    assert to_8bit(struct.pack(">4H", *samples), page, ">") == bytes([0x00, 0x12, 0xAB, 0xFF])
+
+
+def test_gray_alpha_keeps_gray_and_white_is_zero_is_inverted(tmp_path):
+    gray_alpha = build_tiff(tmp_path / "ga.tif", [{"width": 2, "height": 1, "samples": 2,
+                                                   "strip": bytes([40, 255, 200, 0])}])
+    assert read_all(gray_alpha) == (2, 1, 1, bytes([40, 200]))
+    inverted = build_tiff(tmp_path / "wz.tif", [{"width": 3, "height": 1, "samples": 1, "strip": bytes([0, 100, 255]),
+                                                 "photometric": WHITE_IS_ZERO}])
+    assert read_all(inverted) == (3, 1, 1, bytes([255, 155, 0]))
+
+
+def read_flat(tiff, step):
+    """(columns, rows, pixel value) of a flat 64 x 32 image read at step"""
+    columns, rows, channels, data = tiff.read_region(0, 0, 64, 32, step)
+    assert len(set(data)) == 1
+    return columns, rows, data[0]
+
+
+def test_pyramid_pages_serve_coarse_steps(tmp_path):
+    # Each level is a flat gray of its own value, so a read shows which page served it
+    pages = [{"width": 64 // factor, "height": 32 // factor, "samples": 1, "reduced": factor > 1,
+              "strip": bytes([factor]) * (64 // factor * 32 // factor)} for factor in (1, 2, 4)]
+    tiff = open_tiff(build_tiff(tmp_path / "pyramid.tif", pages))
+    assert [level.width for level in tiff.levels] == [64, 32, 16]
+    assert [tiff.level_for(step) for step in (1, 2, 3, 4, 8)] == [(0, 1), (1, 1), (1, 1), (2, 1), (2, 2)]
+    assert read_flat(tiff, 1) == (64, 32, 1)
+    assert read_flat(tiff, 2) == (32, 16, 2)
+    assert read_flat(tiff, 8) == (8, 4, 4)
+
+
+def test_truncated_deflate_strip_reads_as_null_image(tmp_path):
+    pixels = bytes(random.Random(2).getrandbits(8) for _ in range(32 * 32 * 3))
+    strip = zlib.compress(pixels)[:-40]  # A file still being copied in
+    path = build_tiff(tmp_path / "cut.tif", [{"width": 32, "height": 32, "samples": 3, "strip": strip,
+                                              "compression": ADOBE_DEFLATE}])
+    tiff = open_tiff(path)
+    with pytest.raises(READ_ERRORS):
+        tiff.read_region(0, 0, 32, 32, 1)
+    assert tiff_region(tiff, 0, 0, 32, 32, 1).isNull()
+
+
+def test_invalid_lzw_code_reads_as_null_image(tmp_path):
+    strip = bytes([0x80, 0x7F, 0xC0])  # Clear (256), then code 511 - not in the table yet
+    with pytest.raises(IndexError):
+        lzw_decode(strip)
+    path = build_tiff(tmp_path / "bad.tif", [{"width": 4, "height": 4, "samples": 1, "strip": strip,
+                                              "compression": LZW}])
+    assert tiff_region(open_tiff(path), 0, 0, 4, 4, 1).isNull()